@@ -0,0 +1,51 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, TypeVar
+
+T = TypeVar("T")
+
+class CpuPool:
+    """Worker processes for CPU-bound steps such as splitting and tokenizing.
+
+    At most ``max_pending`` calls are submitted at once; further callers
+    wait for a slot, so a bulk ingestion cannot queue unbounded work (and
+    pickled documents) behind the executor. Callables and arguments must be
+    picklable.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        # spawn: children must not inherit the event loop or open connections
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+        self._slots = asyncio.Semaphore(max_pending)
+        self._in_flight = 0
+        self._waiting = 0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        self._in_flight += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._in_flight -= 1
+            self._slots.release()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "in_flight": self._in_flight,
+            "waiting": self._waiting,
+        }
@@ -1,14 +1,15 @@
 import httpx
 import json
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator
 from core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
 class DifyAdapter:
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, client: httpx.AsyncClient | None = None):
         self.base_url = "https://api.dify.ai/v1"
+        self.client = client or httpx.AsyncClient(timeout=settings.DIFY_TIMEOUT)
         self.api_key = api_key or settings.DIFY_API_KEY
         if not self.api_key:
             raise ValueError("Dify API key is required")
@@ -25,10 +26,9 @@ class DifyAdapter:
             "response_mode": response_mode
         }
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, headers=self.headers, json=data, timeout=120) # Increased timeout
-                response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
-                return response.json()
+            response = await self.client.post(url, headers=self.headers, json=data)
+            response.raise_for_status()  # Raise HTTPError for bad responses (4xx or 5xx)
+            return response.json()
         except httpx.HTTPStatusError as e:
             logger.error(f"Dify API request failed: {e.response.status_code} - {e.response.text}")
             raise Exception(f"Dify API request failed: {e.response.status_code} - {e.response.text}")
@@ -37,4 +37,38 @@ class DifyAdapter:
             raise Exception(f"Dify API request failed: {e}")
         except Exception as e:
             logger.error(f"An unexpected error occurred: {e}")
-            raise
\ No newline at end of file
+            raise
+
+    async def stream_workflow(self, inputs: Dict[str, Any], user: str) -> AsyncIterator[Dict[str, Any]]:
+        """Run the workflow in streaming mode, yielding each SSE event as it arrives"""
+        url = f"{self.base_url}/workflows/run"
+        data = {
+            "inputs": inputs,
+            "user": user,
+            "response_mode": "streaming"
+        }
+        try:
+            async with self.client.stream("POST", url, headers=self.headers, json=data) as response:
+                if response.is_error:
+                    await response.aread()
+                    response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    payload = line[len("data:"):].strip()
+                    if not payload:
+                        continue
+                    try:
+                        event = json.loads(payload)
+                    except json.JSONDecodeError:
+                        logger.warning(f"Skipping malformed Dify stream event: {payload[:200]}")
+                        continue
+                    if event.get("event") == "ping":
+                        continue
+                    yield event
+        except httpx.HTTPStatusError as e:
+            logger.error(f"Dify API request failed: {e.response.status_code} - {e.response.text}")
+            raise Exception(f"Dify API request failed: {e.response.status_code} - {e.response.text}")
+        except httpx.RequestError as e:
+            logger.error(f"Dify API request failed: {e}")
+            raise Exception(f"Dify API request failed: {e}")
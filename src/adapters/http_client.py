@@ -0,0 +1,101 @@
+import asyncio
+import logging
+import random
+from typing import Iterable
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# Methods safe to resend after the server may have acted on the request
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+
+class RetryTransport(httpx.AsyncBaseTransport):
+    """Retries failed requests with full-jitter backoff.
+
+    A request that never reached the server (connect error or timeout) is
+    retried whatever its method. Dropped connections and retryable status
+    codes are retried only for ``retry_methods``, since the server may
+    already have acted on the request; callers whose POSTs are safe to
+    repeat (e.g. embeddings) opt in by adding "POST".
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 10.0,
+        retry_statuses: Iterable[int] = RETRYABLE_STATUS_CODES,
+        retry_methods: Iterable[str] = IDEMPOTENT_METHODS
+    ):
+        self.transport = transport
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(method.upper() for method in retry_methods)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        repeatable = request.method in self.retry_methods
+        for attempt in range(1, self.max_attempts + 1):
+            last_attempt = attempt == self.max_attempts
+            try:
+                response = await self.transport.handle_async_request(request)
+            except (httpx.ConnectError, httpx.ConnectTimeout, httpx.RemoteProtocolError) as e:
+                sent = isinstance(e, httpx.RemoteProtocolError)
+                if last_attempt or (sent and not repeatable):
+                    raise
+                logger.warning(f"{request.method} {request.url} failed ({e}), retrying")
+                await asyncio.sleep(self._delay(attempt, None))
+                continue
+
+            if response.status_code not in self.retry_statuses or last_attempt or not repeatable:
+                return response
+
+            retry_after = response.headers.get("retry-after")
+            await response.aclose()
+            logger.warning(
+                f"{request.method} {request.url} returned {response.status_code}, retrying"
+            )
+            await asyncio.sleep(self._delay(attempt, retry_after))
+        raise RuntimeError("unreachable")
+
+    def _delay(self, attempt: int, retry_after: str | None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        cap = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return random.uniform(0, cap)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+def create_http_client(
+    timeout: float,
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 30.0,
+    http2: bool = False,
+    retry_attempts: int = 3,
+    retry_backoff: float = 0.5,
+    retry_statuses: Iterable[int] = RETRYABLE_STATUS_CODES,
+    retry_methods: Iterable[str] = IDEMPOTENT_METHODS
+) -> httpx.AsyncClient:
+    """Build a long-lived client with keep-alive pooling and retries"""
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+        keepalive_expiry=keepalive_expiry
+    )
+    transport = RetryTransport(
+        httpx.AsyncHTTPTransport(limits=limits, http2=http2),
+        max_attempts=retry_attempts,
+        backoff_base=retry_backoff,
+        retry_statuses=retry_statuses,
+        retry_methods=retry_methods
+    )
+    return httpx.AsyncClient(transport=transport, timeout=timeout)
@@ -0,0 +1,137 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from adapters.repositories.sqlalchemy.job_repository import SQLAlchemyJobRepository
+from domain.entities.job import IngestionJob
+from ports.repositories.job_repository import JobRepository
+
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+# Returns a warning for partially failed runs, or None on full success
+JobHandler = Callable[[IngestionJob, ProgressCallback], Awaitable[str | None]]
+
+class JobWorkerPool:
+    """Bounded pool of workers that claim queued jobs from the jobs table.
+
+    Claiming goes through the database, so pools in several processes can
+    share one queue. In-process submitters call ``notify`` to skip the poll
+    delay. Running jobs heartbeat; any pool requeues jobs whose heartbeat
+    stopped for ``stale_after`` seconds, so a crashed process's jobs are
+    picked up again while live ones are left alone.
+    """
+
+    def __init__(
+        self,
+        session_factory: sessionmaker,
+        handler: JobHandler,
+        concurrency: int = 2,
+        poll_interval: float = 2.0,
+        heartbeat_interval: float = 60.0,
+        stale_after: float = 600.0,
+        repository: Callable[[AsyncSession], JobRepository] = SQLAlchemyJobRepository
+    ):
+        if stale_after <= heartbeat_interval:
+            raise ValueError("stale_after must be longer than heartbeat_interval")
+        self.session_factory = session_factory
+        self.handler = handler
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.stale_after = stale_after
+        self.repository = repository
+        self._wakeup = asyncio.Event()
+        self._tasks: List[asyncio.Task] = []
+        self._last_requeue = float("-inf")
+
+    async def start(self):
+        await self._requeue_stale()
+        self._tasks = [
+            asyncio.create_task(self._work(), name=f"job-worker-{i}")
+            for i in range(self.concurrency)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self):
+        self._wakeup.set()
+
+    async def _work(self):
+        while True:
+            try:
+                if time.monotonic() - self._last_requeue >= self.heartbeat_interval:
+                    await self._requeue_stale()
+                job = await self._claim()
+            except Exception as e:
+                logger.error(f"Failed to claim ingestion job: {e}")
+                job = None
+            if job is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+            try:
+                await self._run(job)
+            except Exception as e:
+                # The job stays running; its heartbeat has stopped, so it is
+                # requeued once stale instead of costing the pool a worker
+                logger.error(f"Ingestion job {job.id} could not be recorded: {e}")
+
+    async def _requeue_stale(self):
+        # Set first, so workers sharing the pool don't all requeue at once
+        self._last_requeue = time.monotonic()
+        async with self.session_factory() as session:
+            requeued = await self.repository(session).requeue_stale(self.stale_after)
+        if requeued:
+            logger.info(f"Requeued {requeued} stale ingestion jobs")
+
+    async def _claim(self) -> IngestionJob | None:
+        async with self.session_factory() as session:
+            return await self.repository(session).claim_next()
+
+    async def _heartbeat(self, job: IngestionJob):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                async with self.session_factory() as session:
+                    await self.repository(session).heartbeat(job.id)
+            except Exception as e:
+                logger.warning(f"Heartbeat for ingestion job {job.id} failed: {e}")
+
+    async def _run(self, job: IngestionJob):
+        logger.info(f"Running ingestion job {job.id}")
+
+        # Each write takes a short session, so a running job holds no connection
+        async def report_progress(documents_processed: int, chunks_processed: int):
+            try:
+                async with self.session_factory() as session:
+                    await self.repository(session).update_progress(job.id, documents_processed, chunks_processed)
+            except Exception as e:
+                # Progress is informational; losing one update must not fail the job
+                logger.warning(f"Progress update for ingestion job {job.id} failed: {e}")
+
+        heartbeat = asyncio.create_task(self._heartbeat(job))
+        try:
+            warning = await self.handler(job, report_progress)
+        except Exception as e:
+            logger.error(f"Ingestion job {job.id} failed: {e}")
+            status, error = "failed", str(e)
+        else:
+            status = "completed_with_errors" if warning else "succeeded"
+            error = warning
+        finally:
+            heartbeat.cancel()
+        async with self.session_factory() as session:
+            await self.repository(session).finish(job.id, status, error=error)
+        logger.info(f"Ingestion job {job.id} {status}")
@@ -0,0 +1,177 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Mapping
+
+def retry_after_seconds(headers: Mapping[str, str]) -> float | None:
+    if headers.get("retry-after-ms"):
+        try:
+            return float(headers["retry-after-ms"]) / 1000
+        except ValueError:
+            pass
+    if headers.get("retry-after"):
+        try:
+            return float(headers["retry-after"])
+        except ValueError:
+            pass
+    return None
+
+class TokenBucket:
+    """Refills continuously at ``per_minute / 60`` units per second up to ``per_minute``"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def delay(self, amount: float) -> float:
+        """Seconds until ``amount`` is available; 0 if it is now"""
+        self._refill()
+        # Requests larger than the bucket would otherwise never fit
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) * 60.0 / self.capacity
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= min(amount, self.capacity)
+
+    def sync(self, limit: float | None, remaining: float | None):
+        # The provider's view wins when it is stricter than ours
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self._refill()
+            self.level = min(self.level, float(remaining))
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.capacity / 60.0)
+        self._updated = now
+
+class AdaptiveConcurrency:
+    """AIMD limit on in-flight calls: +1 per window of successes, halved when throttled"""
+
+    def __init__(self, initial: int = 4, minimum: int = 1, maximum: int = 32):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(max(minimum, min(initial, maximum)))
+        self.in_flight = 0
+        self._resume_at = 0.0
+        self._changed = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._changed:
+            while self.in_flight >= int(self.limit) or time.monotonic() < self._resume_at:
+                pause = self._resume_at - time.monotonic()
+                if pause > 0:
+                    # Everyone holds off until the provider's Retry-After has passed
+                    try:
+                        await asyncio.wait_for(self._changed.wait(), pause)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await self._changed.wait()
+            self.in_flight += 1
+
+    async def release(self, throttled: bool = False, retry_after: float | None = None):
+        async with self._changed:
+            self.in_flight -= 1
+            if throttled:
+                self.limit = max(self.minimum, self.limit / 2)
+                if retry_after:
+                    self._resume_at = max(self._resume_at, time.monotonic() + retry_after)
+            else:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            self._changed.notify_all()
+
+class RateLimiter:
+    """Client-side RPM/TPM budget plus adaptive concurrency for one provider.
+
+    Callers reserve a request and its token count before sending; the
+    buckets are corrected from ``x-ratelimit-*`` response headers, and 429s
+    shrink concurrency and pause everyone for the Retry-After interval.
+    A limit of 0 disables that bucket.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 0,
+        tokens_per_minute: int = 0,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32
+    ):
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.concurrency = AdaptiveConcurrency(initial_concurrency, min_concurrency, max_concurrency)
+        self._reserve_lock = asyncio.Lock()
+        self.throttled = 0
+        self.waited = 0.0
+
+    @asynccontextmanager
+    async def acquire(self, tokens: int) -> AsyncIterator["_Permit"]:
+        await self._reserve(tokens)
+        await self.concurrency.acquire()
+        permit = _Permit()
+        try:
+            yield permit
+        finally:
+            if permit.throttled:
+                self.throttled += 1
+            await self.concurrency.release(permit.throttled, permit.retry_after)
+
+    def observe(self, headers: Mapping[str, str]):
+        """Align the buckets with the provider's rate-limit headers"""
+        for bucket, kind in ((self.requests, "requests"), (self.tokens, "tokens")):
+            if bucket is None:
+                continue
+            bucket.sync(
+                _number(headers.get(f"x-ratelimit-limit-{kind}")),
+                _number(headers.get(f"x-ratelimit-remaining-{kind}"))
+            )
+
+    async def _reserve(self, tokens: int):
+        # One reservation at a time keeps waiting callers in FIFO order
+        async with self._reserve_lock:
+            while True:
+                wait = max(
+                    self.requests.delay(1) if self.requests else 0.0,
+                    self.tokens.delay(tokens) if self.tokens else 0.0
+                )
+                if wait <= 0:
+                    break
+                self.waited += wait
+                await asyncio.sleep(wait)
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(tokens)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "requests_available": round(self.requests.level, 1) if self.requests else None,
+            "tokens_available": round(self.tokens.level, 1) if self.tokens else None,
+            "throttled": self.throttled,
+            "seconds_waited": round(self.waited, 2),
+        }
+
+class _Permit:
+    """Lets the caller report how its call went back to the limiter"""
+
+    def __init__(self):
+        self.throttled = False
+        self.retry_after: float | None = None
+
+    def mark_throttled(self, retry_after: float | None):
+        self.throttled = True
+        self.retry_after = retry_after
+
+def _number(value: str | None) -> float | None:
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
@@ -1,41 +1,540 @@
-from typing import Dict, List, Optional
+import json
+import os
+import re
+from contextlib import contextmanager
+from dataclasses import replace
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from uuid import UUID
+import numpy as np
 from domain.entities.source import Source
 from domain.entities.content import Content
 from domain.entities.chunk import Chunk
+from domain.entities.job import IngestionJob
+from domain.value_objects.embedding import Embedding
+from domain.value_objects.search_filter import SearchFilter
 from ports.repositories.source_repository import SourceRepository
 from ports.repositories.content_repository import ContentRepository
 from ports.repositories.chunk_repository import ChunkRepository
+from ports.repositories.job_repository import JobRepository
 
 class InMemorySourceRepository(SourceRepository):
     def __init__(self):
         self.sources: Dict[UUID, Source] = {}
-    
-    async def save(self, source: Source) -> Source:
+
+    async def create(self, source: Source) -> Source:
         self.sources[source.id] = source
         return source
-    
+
     async def get_by_id(self, id: UUID) -> Optional[Source]:
         return self.sources.get(id)
-    
-    # ... implement other methods
+
+    async def get_by_domain(self, domain: str) -> Optional[Source]:
+        return next((s for s in self.sources.values() if s.domain == domain), None)
+
+    async def update(self, source: Source) -> Source:
+        if source.id not in self.sources:
+            return None
+        self.sources[source.id] = source
+        return source
+
+    async def list_active(self) -> List[Source]:
+        return [s for s in self.sources.values() if s.is_active]
+
+    async def get_active_sources(self) -> List[Source]:
+        return await self.list_active()
+
+    async def upsert(self, source: Source) -> Source:
+        existing = await self.get_by_domain(source.domain)
+        if existing:
+            existing.is_active = source.is_active
+            existing.last_crawled = source.last_crawled
+            return existing
+        return await self.create(source)
+
+    async def upsert_many(self, sources: List[Source]) -> List[Source]:
+        return [await self.upsert(source) for source in sources]
 
 class InMemoryContentRepository(ContentRepository):
     def __init__(self):
         self.contents: Dict[UUID, Content] = {}
-    
+
     async def save(self, content: Content) -> Content:
-        self.contents[content.id] = content
+        stored = content
+        existing = self._find(lambda c: c.url_hash == content.url_hash)
+        if existing:
+            del self.contents[existing.id]
+            content.id = existing.id
+            # None means "not loaded" (see the port), not "clear it"
+            if content.raw_content is None:
+                stored = replace(content, raw_content=existing.raw_content)
+        self.contents[content.id] = stored
         return content
-    
-    # ... implement other methods
 
-class InMemoryChunkRepository(ChunkRepository):
+    async def get_by_id(self, id: UUID, with_raw_content: bool = False) -> Optional[Content]:
+        return self._project(self.contents.get(id), with_raw_content)
+
+    async def get_by_url(self, url: str, with_raw_content: bool = False) -> Optional[Content]:
+        return self._project(self._find(lambda c: c.url == url), with_raw_content)
+
+    async def get_by_url_hash(self, url_hash: str, with_raw_content: bool = False) -> Optional[Content]:
+        return self._project(self._find(lambda c: c.url_hash == url_hash), with_raw_content)
+
+    async def get_by_source_id(
+        self,
+        source_id: UUID,
+        limit: Optional[int] = None,
+        after: Optional[UUID] = None,
+        with_raw_content: bool = False
+    ) -> List[Content]:
+        contents = sorted(
+            (c for c in self.contents.values() if c.source_id == source_id and (after is None or c.id > after)),
+            key=lambda c: c.id
+        )
+        if limit is not None:
+            contents = contents[:limit]
+        return [self._project(c, with_raw_content) for c in contents]
+
+    async def stream_by_source_id(
+        self,
+        source_id: UUID,
+        batch_size: int = 500,
+        with_raw_content: bool = False
+    ) -> AsyncIterator[Content]:
+        for content in await self.get_by_source_id(source_id, with_raw_content=with_raw_content):
+            yield content
+
+    async def update_status(self, id: UUID, status: str) -> Optional[Content]:
+        content = self.contents.get(id)
+        if content:
+            content.status = status
+        return self._project(content, with_raw_content=False)
+
+    async def upsert(self, content: Content) -> Content:
+        return await self.save(content)
+
+    async def upsert_many(self, contents: List[Content]) -> List[Content]:
+        results = []
+        for content in contents:
+            existing = self._find(lambda c: c.url_hash == content.url_hash)
+            if existing:
+                existing.url = content.url
+                existing.source_id = content.source_id
+                if content.raw_content is not None:
+                    existing.raw_content = content.raw_content
+                results.append(self._project(existing, with_raw_content=False))
+            else:
+                results.append(self._project(await self.save(content), with_raw_content=False))
+        return results
+
+    def _find(self, predicate) -> Optional[Content]:
+        return next((c for c in self.contents.values() if predicate(c)), None)
+
+    def _project(self, content: Optional[Content], with_raw_content: bool) -> Optional[Content]:
+        # Same contract as the SQL store: raw_content only when asked for
+        if content is None or with_raw_content:
+            return content
+        return replace(content, raw_content=None)
+
+    async def mark_ingested(self, id: UUID, content_hash: str) -> None:
+        content = self.contents.get(id)
+        if content:
+            content.content_hash = content_hash
+            content.status = "processed"
+
+class InMemoryJobRepository(JobRepository):
     def __init__(self):
+        self.jobs: Dict[UUID, IngestionJob] = {}
+        # Last heartbeat or progress write of each job, like updated_at
+        self.updated_at: Dict[UUID, datetime] = {}
+
+    async def create(self, job: IngestionJob) -> IngestionJob:
+        self.jobs[job.id] = job
+        self.updated_at[job.id] = datetime.utcnow()
+        return job
+
+    async def get_by_id(self, id: UUID) -> Optional[IngestionJob]:
+        return self.jobs.get(id)
+
+    async def claim_next(self) -> Optional[IngestionJob]:
+        queued = [job for job in self.jobs.values() if job.status == 'queued']
+        if not queued:
+            return None
+        job = min(queued, key=lambda job: job.created_at)
+        job.status, job.started_at = 'running', datetime.utcnow()
+        self.updated_at[job.id] = job.started_at
+        return job
+
+    async def update_progress(self, id: UUID, documents_processed: int, chunks_processed: int) -> None:
+        job = self.jobs[id]
+        job.documents_processed, job.chunks_processed = documents_processed, chunks_processed
+        self.updated_at[id] = datetime.utcnow()
+
+    async def heartbeat(self, id: UUID) -> None:
+        if self.jobs[id].status == 'running':
+            self.updated_at[id] = datetime.utcnow()
+
+    async def finish(self, id: UUID, status: str, error: Optional[str] = None) -> None:
+        job = self.jobs[id]
+        job.status, job.error, job.finished_at = status, error, datetime.utcnow()
+        self.updated_at[id] = job.finished_at
+
+    async def requeue_stale(self, stale_after_seconds: float) -> int:
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after_seconds)
+        stale = [
+            job for job in self.jobs.values()
+            if job.status == 'running' and self.updated_at[job.id] < cutoff
+        ]
+        for job in stale:
+            job.status, job.started_at = 'queued', None
+            self.updated_at[job.id] = datetime.utcnow()
+        return len(stale)
+
+class _VectorMatrix:
+    """Unit-normalized float32 rows for one embedding model.
+
+    Rows live in one contiguous matrix, so a search is a single
+    matrix-vector product plus an argpartition top-k.
+    """
+
+    def __init__(self, dimension: int, matrix: Optional[np.ndarray] = None, row_ids: Optional[List[UUID]] = None):
+        self.dimension = dimension
+        self.matrix = matrix if matrix is not None else np.empty((0, dimension), dtype=np.float32)
+        self.row_ids: List[UUID] = row_ids or []
+        self.rows: Dict[UUID, int] = {id: row for row, id in enumerate(self.row_ids)}
+        self.size = len(self.row_ids)
+
+    def put(self, id: UUID, vector: np.ndarray):
+        row = self.rows.get(id)
+        if row is None:
+            self.reserve(self.size + 1)
+            row = self.size
+            self.size += 1
+            self.rows[id] = row
+            self.row_ids.append(id)
+        else:
+            self.reserve(self.size)
+        self.matrix[row] = _normalize(vector)
+
+    def get(self, id: UUID) -> Optional[np.ndarray]:
+        row = self.rows.get(id)
+        return np.array(self.matrix[row]) if row is not None else None
+
+    def remove(self, id: UUID):
+        # Swap the last row into the freed slot to keep the matrix dense
+        row = self.rows.pop(id, None)
+        if row is None:
+            return
+        last = self.size - 1
+        if row != last:
+            self.reserve(self.size)
+            moved = self.row_ids[last]
+            self.matrix[row] = self.matrix[last]
+            self.row_ids[row] = moved
+            self.rows[moved] = row
+        self.row_ids.pop()
+        self.size -= 1
+
+    def search(self, vector: np.ndarray, limit: int) -> List[Tuple[UUID, float]]:
+        if self.size == 0 or limit <= 0:
+            return []
+        scores = self.matrix[:self.size] @ _normalize(vector)
+        k = min(limit, self.size)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.row_ids[row], float(scores[row])) for row in top]
+
+    def search_many(self, vectors: np.ndarray, limit: int) -> List[List[Tuple[UUID, float]]]:
+        """Top-k for each row of ``vectors`` from one matrix-matrix product"""
+        if self.size == 0 or limit <= 0:
+            return [[] for _ in vectors]
+        queries = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+        scores = queries @ self.matrix[:self.size].T
+        k = min(limit, self.size)
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row_scores, row_top in zip(scores, top):
+            row_top = row_top[np.argsort(-row_scores[row_top])]
+            results.append([(self.row_ids[row], float(row_scores[row])) for row in row_top])
+        return results
+
+    def reserve(self, capacity: int):
+        # Geometric growth keeps appends amortized O(1); also copies a
+        # read-only memory-mapped matrix into a writable buffer
+        if capacity <= self.matrix.shape[0] and self.matrix.flags.writeable:
+            return
+        new_capacity = max(capacity, 2 * self.matrix.shape[0], 64)
+        matrix = np.empty((new_capacity, self.dimension), dtype=np.float32)
+        matrix[:self.size] = self.matrix[:self.size]
+        self.matrix = matrix
+
+@contextmanager
+def _replacing(path: str, mode: str, **kwargs):
+    """Open a temporary file that atomically replaces ``path`` once written"""
+    tmp = f"{path}.tmp"
+    try:
+        with open(tmp, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    vector = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+class InMemoryChunkRepository(ChunkRepository):
+    """In-process vector store for small and medium corpora.
+
+    Each embedding model gets its own float32 matrix (see _VectorMatrix):
+    a chunk's primary embedding is filed under its ``embedding_model`` and
+    extra-model vectors under their labels. Chunk metadata is kept
+    alongside, without embeddings, and the store can be persisted to and
+    memory-mapped back from ``<path>.json`` plus one ``.npy`` per model.
+    """
+
+    def __init__(self, dimension: int = 1536):
+        self.dimension = dimension
         self.chunks: Dict[UUID, Chunk] = {}
-    
-    async def save(self, chunk: Chunk) -> Chunk:
+        self._by_content: Dict[UUID, List[UUID]] = {}
+        self._matrices: Dict[Optional[str], _VectorMatrix] = {}
+
+    async def create(self, chunk: Chunk) -> Chunk:
+        return self._add(chunk)
+
+    async def batch_create(self, chunks: List[Chunk]) -> List[Chunk]:
+        return [self._add(chunk) for chunk in chunks]
+
+    async def find_similar(
+        self,
+        embedding: Embedding,
+        limit: int = 10,
+        threshold: float = 0.7,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        exact: bool = False,
+        with_embedding: bool = False,
+        filters: Optional[SearchFilter] = None
+    ) -> List[Tuple[Chunk, float]]:
+        # ef_search/probes/exact are ANN knobs; this search is always exact
+        self._check_filters(filters)
+        matrix = self._matrices.get(embedding.model)
+        if matrix is None:
+            return []
+        matches = matrix.search(embedding.vector, matrix.size if filters else limit)
+        return [
+            (self._to_entity(id, with_embedding), score)
+            for id, score in self._filter(matches, filters)[:limit]
+            if score >= threshold
+        ]
+
+    async def find_similar_many(
+        self,
+        embeddings: List[Embedding],
+        limit: int = 10,
+        threshold: float = 0.7,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        with_embedding: bool = False,
+        filters: Optional[SearchFilter] = None
+    ) -> List[List[Tuple[Chunk, float]]]:
+        self._check_filters(filters)
+        matrix = self._matrices.get(embeddings[0].model) if embeddings else None
+        if matrix is None:
+            return [[] for _ in embeddings]
+        vectors = np.stack([e.vector for e in embeddings])
+        return [
+            [
+                (self._to_entity(id, with_embedding), score)
+                for id, score in self._filter(matches, filters)[:limit]
+                if score >= threshold
+            ]
+            for matches in matrix.search_many(vectors, matrix.size if filters else limit)
+        ]
+
+    async def find_lexical(
+        self,
+        query_text: str,
+        limit: int = 10,
+        with_embedding: bool = False,
+        filters: Optional[SearchFilter] = None
+    ) -> List[Tuple[Chunk, float]]:
+        # Fraction of query terms present; a stand-in for Postgres full-text rank
+        self._check_filters(filters)
+        terms = set(re.findall(r"\w+", query_text.lower()))
+        if not terms:
+            return []
+        scored = []
+        for chunk in self.chunks.values():
+            words = set(re.findall(r"\w+", chunk.text.lower()))
+            score = len(terms & words) / len(terms)
+            if score > 0:
+                scored.append((chunk.id, score))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return [(self._to_entity(id, with_embedding), score) for id, score in self._filter(scored, filters)[:limit]]
+
+    def _check_filters(self, filters: Optional[SearchFilter]):
+        # Chunks here carry no link to content status or source
+        if filters and filters.by_content:
+            raise ValueError("Source, domain and status filters need the Postgres chunk store")
+
+    def _filter(self, matches: List[Tuple[UUID, float]], filters: Optional[SearchFilter]) -> List[Tuple[UUID, float]]:
+        if not filters:
+            return matches
+        return [(id, score) for id, score in matches if self.chunks[id].embedding_model == filters.embedding_model]
+
+    async def sample_embeddings(self, limit: int, model: Optional[str] = None) -> List[Embedding]:
+        if model is None and self._matrices:
+            # The primary model is the one every chunk has a vector for
+            model = max(self._matrices, key=lambda label: self._matrices[label].size)
+        matrix = self._matrices.get(model)
+        if matrix is None:
+            return []
+        rows = np.random.default_rng().permutation(matrix.size)[:limit]
+        return [Embedding(vector=np.array(matrix.matrix[row]), model=model) for row in rows]
+
+    async def find_missing_embeddings(self, model: str, limit: int = 100) -> List[Chunk]:
+        matrix = self._matrices.get(model)
+        missing = [id for id in self.chunks if matrix is None or id not in matrix.rows]
+        return [self._to_entity(id, with_embedding=False) for id in missing[:limit]]
+
+    async def save_embeddings(self, model: str, embeddings: List[Tuple[UUID, np.ndarray]]) -> None:
+        for id, vector in embeddings:
+            if id in self.chunks:
+                self._matrix_for(model, len(vector)).put(id, vector)
+
+    async def get_by_content_id(
+        self,
+        content_id: UUID,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[int, UUID]] = None,
+        with_embedding: bool = False
+    ) -> List[Chunk]:
+        ids = sorted(
+            (id for id in self._by_content.get(content_id, [])
+             if after is None or (self.chunks[id].sequence, id) > after),
+            key=lambda id: (self.chunks[id].sequence, id)
+        )
+        if limit is not None:
+            ids = ids[:limit]
+        return [self._to_entity(id, with_embedding) for id in ids]
+
+    async def stream_by_content_id(
+        self,
+        content_id: UUID,
+        batch_size: int = 500,
+        with_embedding: bool = False
+    ) -> AsyncIterator[Chunk]:
+        for chunk in await self.get_by_content_id(content_id, with_embedding=with_embedding):
+            yield chunk
+
+    async def get_fingerprints(self, content_id: UUID) -> List[Tuple[UUID, Optional[str], int]]:
+        return [
+            (id, self.chunks[id].text_hash, self.chunks[id].sequence)
+            for id in self._by_content.get(content_id, [])
+        ]
+
+    async def sync_content_chunks(
+        self,
+        content_id: UUID,
+        new_chunks: List[Chunk],
+        resequence: Dict[UUID, int],
+        stale_ids: List[UUID]
+    ) -> List[Chunk]:
+        for id in stale_ids:
+            self._remove(id)
+        for id, sequence in resequence.items():
+            self.chunks[id].sequence = sequence
+        return await self.batch_create(new_chunks)
+
+    def persist(self, path: str):
+        """Write the metadata and one matrix per model next to each other under ``path``.
+
+        Every file is written aside and renamed into place: a loaded store's
+        matrices are memory-mapped from the very files being replaced.
+        """
+        matrices = []
+        for i, (model, matrix) in enumerate(self._matrices.items()):
+            with _replacing(f"{path}.{i}.npy", "wb") as f:
+                np.save(f, np.ascontiguousarray(matrix.matrix[:matrix.size]))
+            matrices.append({"model": model, "file": i, "ids": [str(id) for id in matrix.row_ids]})
+        metadata = [
+            {
+                "id": str(chunk.id),
+                "content_id": str(chunk.content_id),
+                "sequence": chunk.sequence,
+                "text": chunk.text,
+                "token_count": chunk.token_count,
+                "char_count": chunk.char_count,
+                "embedding_model": chunk.embedding_model,
+                "text_hash": chunk.text_hash,
+                "created_at": chunk.created_at.isoformat(),
+            }
+            for chunk in self.chunks.values()
+        ]
+        with _replacing(f"{path}.json", "w", encoding="utf-8") as f:
+            json.dump({"dimension": self.dimension, "chunks": metadata, "matrices": matrices}, f)
+
+    @classmethod
+    def load(cls, path: str) -> "InMemoryChunkRepository":
+        """Load a persisted store; matrices stay memory-mapped until the next write"""
+        with open(f"{path}.json", encoding="utf-8") as f:
+            data = json.load(f)
+        repository = cls(dimension=data["dimension"])
+        for item in data["chunks"]:
+            repository._index_metadata(Chunk(
+                id=UUID(item["id"]),
+                content_id=UUID(item["content_id"]),
+                sequence=item["sequence"],
+                text=item["text"],
+                token_count=item["token_count"],
+                char_count=item["char_count"],
+                embedding_model=item["embedding_model"],
+                text_hash=item.get("text_hash"),
+                created_at=datetime.fromisoformat(item["created_at"])
+            ))
+        for entry in data["matrices"]:
+            matrix = np.load(f"{path}.{entry['file']}.npy", mmap_mode="r")
+            repository._matrices[entry["model"]] = _VectorMatrix(
+                matrix.shape[1], matrix, [UUID(id) for id in entry["ids"]]
+            )
+        return repository
+
+    def _add(self, chunk: Chunk) -> Chunk:
+        if chunk.id in self.chunks:
+            self._remove_metadata(chunk.id)
+        self._index_metadata(replace(chunk, embedding=None, extra_embeddings={}))
+        if chunk.embedding is not None:
+            self._matrix_for(chunk.embedding_model, len(chunk.embedding)).put(chunk.id, chunk.embedding)
+        for model, vector in chunk.extra_embeddings.items():
+            self._matrix_for(model, len(vector)).put(chunk.id, vector)
+        return self._to_entity(chunk.id)
+
+    def _matrix_for(self, model: Optional[str], dimension: int) -> _VectorMatrix:
+        if model not in self._matrices:
+            self._matrices[model] = _VectorMatrix(dimension)
+        return self._matrices[model]
+
+    def _index_metadata(self, chunk: Chunk):
         self.chunks[chunk.id] = chunk
-        return chunk
-    
-    # ... implement other methods
\ No newline at end of file
+        self._by_content.setdefault(chunk.content_id, []).append(chunk.id)
+
+    def _remove_metadata(self, id: UUID):
+        chunk = self.chunks.pop(id)
+        self._by_content[chunk.content_id].remove(id)
+
+    def _remove(self, id: UUID):
+        self._remove_metadata(id)
+        for matrix in self._matrices.values():
+            matrix.remove(id)
+
+    def _to_entity(self, id: UUID, with_embedding: bool = True) -> Chunk:
+        chunk = self.chunks[id]
+        if not with_embedding:
+            return replace(chunk)
+        matrix = self._matrices.get(chunk.embedding_model)
+        return replace(chunk, embedding=matrix.get(id) if matrix is not None else None)
@@ -1,23 +1,96 @@
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+from sqlalchemy import inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import create_async_engine
 
+from .schema_upgrades import upgrade_schema
+from .vector_codec import register_vector_codec
+
 Base = declarative_base()
 
+def loaded_value(model: Any, attribute: str) -> Any:
+    """Value of ``attribute`` if the query loaded it, else None; never emits SQL"""
+    return inspect(model).dict.get(attribute)
+
+class PoolMetrics:
+    """Checkout wait statistics for the connection pool"""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, wait: float):
+        self.checkouts += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def snapshot(self) -> Dict[str, float]:
+        avg = self.total_wait / self.checkouts if self.checkouts else 0.0
+        return {
+            "checkouts": self.checkouts,
+            "avg_wait_ms": round(avg * 1000, 3),
+            "max_wait_ms": round(self.max_wait * 1000, 3),
+        }
+
 class Database:
-    def __init__(self, url: str):
-        self.engine = create_async_engine(url)
+    def __init__(
+        self,
+        url: str,
+        pool_size: int = 5,
+        max_overflow: int = 10,
+        pool_timeout: float = 30.0,
+        pool_recycle: int = -1,
+        pool_pre_ping: bool = False
+    ):
+        self.engine = create_async_engine(
+            url,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_timeout=pool_timeout,
+            pool_recycle=pool_recycle,
+            pool_pre_ping=pool_pre_ping
+        )
+        register_vector_codec(self.engine)
         self.SessionLocal = sessionmaker(
             self.engine, 
             class_=AsyncSession, 
             expire_on_commit=False
         )
+        self.metrics = PoolMetrics()
     
     async def create_all(self):
         async with self.engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
+            await upgrade_schema(conn)
+
+    async def dispose(self):
+        await self.engine.dispose()
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """Yield a session with its connection checked out up front, timing the wait"""
+        async with self.SessionLocal() as session:
+            start = time.perf_counter()
+            await session.connection()
+            self.metrics.record(time.perf_counter() - start)
+            yield session
     
     async def get_session(self) -> AsyncSession:
-        async with self.SessionLocal() as session:
-            yield session
\ No newline at end of file
+        async with self.session() as session:
+            yield session
+
+    def pool_status(self) -> Dict[str, float]:
+        pool = self.engine.pool
+        return {
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            "overflow": pool.overflow(),
+            **self.metrics.snapshot(),
+        }
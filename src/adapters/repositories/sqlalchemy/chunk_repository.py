@@ -1,94 +1,441 @@
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Sequence, Tuple
 from uuid import UUID
 import numpy as np
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func
+from sqlalchemy import (
+    Float, Integer, and_, bindparam, cast, column, delete, literal, literal_column, select, text, true,
+    func, tuple_, update, values
+)
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import aliased, undefer
+from pgvector.sqlalchemy import BIT, HALFVEC
 
+from core.config import settings
 from domain.entities.chunk import Chunk
+from domain.value_objects.embedding import Embedding
+from domain.value_objects.search_filter import SearchFilter
 from ports.repositories.chunk_repository import ChunkRepository
-from .models import ChunkModel
+from .base import loaded_value
+from .models import ChunkEmbeddingModel, ChunkModel, ContentModel, SourceModel
+from .vector_codec import Vector as VECTOR, stack_vectors
+from .vector_index import compact_expression
 
 class SQLAlchemyChunkRepository(ChunkRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
 
     async def create(self, chunk: Chunk) -> Chunk:
-        chunk_model = ChunkModel(
-            id=chunk.id,
-            content_id=chunk.content_id,
-            sequence=chunk.sequence,
-            text=chunk.text,
-            token_count=chunk.token_count,
-            char_count=chunk.char_count,
-            embedding=chunk.embedding.tolist() if chunk.embedding is not None else None,
-            embedding_model=chunk.embedding_model
-        )
+        chunk_model = self._to_model(chunk)
         self.session.add(chunk_model)
+        await self._add_extra_embeddings([chunk])
         await self.session.commit()
         await self.session.refresh(chunk_model)
-        return self._to_entity(chunk_model)
+        # refresh() skips deferred columns; the embedding is what was just written
+        return self._to_entity(chunk_model, embedding=chunk.embedding)
 
     async def batch_create(self, chunks: List[Chunk]) -> List[Chunk]:
-        chunk_models = [
-            ChunkModel(
-                id=chunk.id,
-                content_id=chunk.content_id,
-                sequence=chunk.sequence,
-                text=chunk.text,
-                token_count=chunk.token_count,
-                char_count=chunk.char_count,
-                embedding=chunk.embedding.tolist() if chunk.embedding is not None else None,
-                embedding_model=chunk.embedding_model
-            )
-            for chunk in chunks
-        ]
+        chunk_models = [self._to_model(chunk) for chunk in chunks]
         self.session.add_all(chunk_models)
+        await self._add_extra_embeddings(chunks)
         await self.session.commit()
-        return [self._to_entity(chunk_model) for chunk_model in chunk_models]
+        return self._to_entities(chunk_models)
+
+    async def get_fingerprints(self, content_id: UUID) -> List[Tuple[UUID, Optional[str], int]]:
+        result = await self.session.execute(
+            select(ChunkModel.id, ChunkModel.text_hash, ChunkModel.sequence)
+            .where(ChunkModel.content_id == content_id)
+        )
+        return [tuple(row) for row in result.all()]
 
+    async def sync_content_chunks(
+        self,
+        content_id: UUID,
+        new_chunks: List[Chunk],
+        resequence: Dict[UUID, int],
+        stale_ids: List[UUID]
+    ) -> List[Chunk]:
+        # Deletes, sequence moves and inserts commit together
+        if stale_ids:
+            await self.session.execute(
+                delete(ChunkModel)
+                .where(ChunkModel.content_id == content_id)
+                .where(ChunkModel.id.in_(stale_ids))
+            )
+        if resequence:
+            await self.session.execute(
+                update(ChunkModel),
+                [{"id": id, "sequence": sequence} for id, sequence in resequence.items()]
+            )
+        chunk_models = [self._to_model(chunk) for chunk in new_chunks]
+        self.session.add_all(chunk_models)
+        await self._add_extra_embeddings(new_chunks)
+        await self.session.commit()
+        return self._to_entities(chunk_models)
 
     async def find_similar(
         self,
-        query_vector: np.ndarray,
+        embedding: Embedding,
         limit: int = 10,
-        threshold: float = 0.7
+        threshold: float = 0.7,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        exact: bool = False,
+        with_embedding: bool = False,
+        filters: Optional[SearchFilter] = None
     ) -> List[Tuple[Chunk, float]]:
-        vector_list = query_vector.tolist()
+        # Bound as-is: the binary codec sends the float32 buffer, not a list
+        vector = np.asarray(embedding.vector, dtype=np.float32)
+        # Extra models live in chunk_embeddings and are never quantized
+        extra_model = embedding.model in settings.EMBEDDING_EXTRA_MODELS
+        conditions = self._filter_conditions(filters) if filters else []
+        # A filter matching few chunks is cheapest as an exact scan of just
+        # those rows; a broad one walks the ANN index and filters as it goes
+        scan = exact or (bool(conditions) and await self._prefers_prefilter(conditions))
+        if extra_model:
+            # Same cast as the model's partial index, so the planner can use it
+            distance = cast(ChunkEmbeddingModel.embedding, VECTOR(len(vector))).cosine_distance(vector)
+            stmt = (
+                self._select(with_embedding, distance.label("distance"))
+                .join(ChunkEmbeddingModel, and_(
+                    ChunkEmbeddingModel.chunk_id == ChunkModel.id,
+                    # Inlined so even a generic plan matches the partial index predicate
+                    ChunkEmbeddingModel.embedding_model == literal(embedding.model, literal_execute=True)
+                ))
+            )
+        else:
+            distance = ChunkModel.embedding.cosine_distance(vector)
+            stmt = self._select(with_embedding, distance.label("distance"))
+        stmt = stmt.order_by(self._ordering(distance, scan)).limit(limit)
+        if scan:
+            stmt = stmt.where(*conditions)
+        elif settings.VECTOR_QUANTIZATION != "none" and not extra_model:
+            # First pass walks the compact index, then the full-precision
+            # column rescores the oversampled candidates
+            candidate_limit = limit * settings.VECTOR_RESCORE_FACTOR
+            await self._set_search_params(candidate_limit, ef_search, probes, filtered=bool(conditions))
+            compact_distance = self._compact_distance(vector)
+            candidates = (
+                select(ChunkModel.id)
+                .where(*conditions)
+                .order_by(compact_distance)
+                .limit(candidate_limit)
+                .subquery()
+            )
+            stmt = stmt.join(candidates, ChunkModel.id == candidates.c.id)
+        else:
+            await self._set_search_params(limit, ef_search, probes, filtered=bool(conditions))
+            stmt = stmt.where(*conditions)
+
+        result = await self.session.execute(stmt)
+        rows = result.all()
+        # Threshold applies after the index-driven top-k; iterative index
+        # scans may hand rows back slightly out of order
+        rows = sorted(
+            ((chunk_model, distance) for chunk_model, distance in rows if 1.0 - float(distance) >= threshold),
+            key=lambda row: row[1]
+        )
+        chunks = self._to_entities([chunk_model for chunk_model, _ in rows])
+        return [(chunk, 1.0 - float(distance)) for chunk, (_, distance) in zip(chunks, rows)]
+
+    async def find_similar_many(
+        self,
+        embeddings: List[Embedding],
+        limit: int = 10,
+        threshold: float = 0.7,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        with_embedding: bool = False,
+        filters: Optional[SearchFilter] = None
+    ) -> List[List[Tuple[Chunk, float]]]:
+        if not embeddings:
+            return []
+        model = embeddings[0].model
+        dimensions = len(embeddings[0].vector)
+        # One statement: each VALUES row drives a LATERAL top-k that can
+        # walk the ANN index with its own query vector
+        queries = values(
+            column("query_index", Integer),
+            column("query_vector", VECTOR(dimensions)),
+            name="queries"
+        ).data([
+            (index, np.asarray(embedding.vector, dtype=np.float32))
+            for index, embedding in enumerate(embeddings)
+        ])
+        query_vector = queries.c.query_vector
+        # A subquery selects every column it names, so deferral is applied by hand
+        chunk_columns = [
+            column for column in ChunkModel.__table__.c
+            if column.key != "text_search" and (with_embedding or column.key != "embedding")
+        ]
+        extra_model = model in settings.EMBEDDING_EXTRA_MODELS
+        if extra_model:
+            distance = cast(ChunkEmbeddingModel.embedding, VECTOR(dimensions)).cosine_distance(query_vector)
+            top = (
+                select(*chunk_columns, distance.label("distance"))
+                .join(ChunkEmbeddingModel, and_(
+                    ChunkEmbeddingModel.chunk_id == ChunkModel.id,
+                    ChunkEmbeddingModel.embedding_model == literal(model, literal_execute=True)
+                ))
+            )
+        else:
+            distance = ChunkModel.embedding.cosine_distance(query_vector)
+            top = select(*chunk_columns, distance.label("distance"))
+        conditions = self._filter_conditions(filters) if filters else []
+        # Same pre-filter vs index choice as find_similar
+        scan = bool(conditions) and await self._prefers_prefilter(conditions)
+        if scan:
+            top = top.where(*conditions)
+        elif settings.VECTOR_QUANTIZATION != "none" and not extra_model:
+            candidate_limit = limit * settings.VECTOR_RESCORE_FACTOR
+            candidates = (
+                select(ChunkModel.id)
+                .where(*conditions)
+                .order_by(self._compact_distance(query_vector))
+                .limit(candidate_limit)
+                .lateral("candidates")
+            )
+            top = top.join(candidates, ChunkModel.id == candidates.c.id)
+            await self._set_search_params(candidate_limit, ef_search, probes, filtered=bool(conditions))
+        else:
+            await self._set_search_params(limit, ef_search, probes, filtered=bool(conditions))
+            top = top.where(*conditions)
+        top = top.order_by(self._ordering(distance, scan)).limit(limit).lateral("top")
+        chunk = aliased(ChunkModel, top)
         stmt = (
-            select(ChunkModel, func.cosine_similarity(ChunkModel.embedding, vector_list))
-            .filter(func.cosine_similarity(ChunkModel.embedding, vector_list) >= threshold)
-            .order_by(func.cosine_similarity(ChunkModel.embedding, vector_list).desc())
-            .limit(limit)
+            select(queries.c.query_index, chunk, top.c.distance)
+            .select_from(queries)
+            .join(top, true())
         )
+        if with_embedding:
+            stmt = stmt.options(undefer(chunk.embedding))
+
+        result = await self.session.execute(stmt)
+        rows = [row for row in result.all() if 1.0 - float(row.distance) >= threshold]
+        chunks = self._to_entities([chunk_model for _, chunk_model, _ in rows])
+        matches: List[List[Tuple[Chunk, float]]] = [[] for _ in embeddings]
+        for found, (index, _, distance) in zip(chunks, rows):
+            matches[index].append((found, 1.0 - float(distance)))
+        for found in matches:
+            found.sort(key=lambda match: match[1], reverse=True)
+        return matches
 
+    async def find_lexical(
+        self,
+        query_text: str,
+        limit: int = 10,
+        with_embedding: bool = False,
+        filters: Optional[SearchFilter] = None
+    ) -> List[Tuple[Chunk, float]]:
+        query = func.websearch_to_tsquery('english', query_text)
+        rank = func.ts_rank_cd(ChunkModel.text_search, query)
+        stmt = (
+            self._select(with_embedding, rank.label("rank"))
+            .where(ChunkModel.text_search.op('@@')(query))
+            .where(*(self._filter_conditions(filters) if filters else []))
+            .order_by(rank.desc())
+            .limit(limit)
+        )
         result = await self.session.execute(stmt)
-        # Fetch all results as tuples of (ChunkModel, similarity)
-        results = result.all()
+        rows = result.all()
+        chunks = self._to_entities([chunk_model for chunk_model, _ in rows])
+        return [(chunk, float(rank)) for chunk, (_, rank) in zip(chunks, rows)]
 
-        return [
-            (
-                self._to_entity(chunk_model),
-                float(similarity)
+    async def sample_embeddings(self, limit: int, model: Optional[str] = None) -> List[Embedding]:
+        if model in settings.EMBEDDING_EXTRA_MODELS:
+            stmt = (
+                select(ChunkEmbeddingModel.embedding, ChunkEmbeddingModel.embedding_model)
+                .where(ChunkEmbeddingModel.embedding_model == model)
             )
-            for chunk_model, similarity in results
-        ]
+        else:
+            stmt = (
+                select(ChunkModel.embedding, ChunkModel.embedding_model)
+                .where(ChunkModel.embedding.is_not(None))
+            )
+        result = await self.session.execute(stmt.order_by(func.random()).limit(limit))
+        rows = result.all()
+        vectors = stack_vectors([vector for vector, _ in rows])
+        return [Embedding(vector=vector, model=model) for vector, (_, model) in zip(vectors, rows)]
 
-    async def get_by_content_id(self, content_id: UUID) -> List[Chunk]:
+    async def find_missing_embeddings(self, model: str, limit: int = 100) -> List[Chunk]:
+        has_embedding = (
+            select(ChunkEmbeddingModel.chunk_id)
+            .where(ChunkEmbeddingModel.chunk_id == ChunkModel.id)
+            .where(ChunkEmbeddingModel.embedding_model == model)
+            .exists()
+        )
         result = await self.session.execute(
-            select(ChunkModel).where(ChunkModel.content_id == content_id)
+            select(ChunkModel).where(~has_embedding).order_by(ChunkModel.id).limit(limit)
+        )
+        return self._to_entities(result.scalars().all())
+
+    async def save_embeddings(self, model: str, embeddings: List[Tuple[UUID, np.ndarray]]) -> None:
+        if not embeddings:
+            return
+        stmt = insert(ChunkEmbeddingModel).values([
+            {"chunk_id": chunk_id, "embedding_model": model, "embedding": vector}
+            for chunk_id, vector in embeddings
+        ])
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[ChunkEmbeddingModel.chunk_id, ChunkEmbeddingModel.embedding_model],
+                set_={"embedding": stmt.excluded.embedding}
+            )
+        )
+        await self.session.commit()
+
+    async def _add_extra_embeddings(self, chunks: List[Chunk]):
+        # Flush first so the chunk rows exist for the foreign key
+        rows = [
+            {"chunk_id": chunk.id, "embedding_model": model, "embedding": vector}
+            for chunk in chunks
+            for model, vector in chunk.extra_embeddings.items()
+        ]
+        if rows:
+            await self.session.flush()
+            await self.session.execute(insert(ChunkEmbeddingModel), rows)
+
+    def _compact_distance(self, query):
+        """Quantized distance to ``query``, a vector or a SQL expression yielding one"""
+        # Must render the same expression the index was built on
+        quantization, dimensions = settings.VECTOR_QUANTIZATION, settings.VECTOR_DIMENSION
+        compact = literal_column(
+            compact_expression(f"{ChunkModel.__tablename__}.embedding", quantization, dimensions)
         )
-        chunks = result.scalars().all()
-        return [self._to_entity(chunk) for chunk in chunks]
+        if isinstance(query, np.ndarray):
+            query = bindparam("query_vector", query, type_=VECTOR(dimensions))
+        if quantization == "halfvec":
+            return compact.op("<=>", return_type=Float)(cast(query, HALFVEC(dimensions)))
+        return compact.op("<~>", return_type=Float)(cast(func.binary_quantize(query), BIT(dimensions)))
 
-    def _to_entity(self, chunk: ChunkModel) -> Chunk:
-        return Chunk(
+    def _ordering(self, distance, exact: bool):
+        """Sort key for a top-k by ``distance``.
+
+        The raw <=> operator lets the planner walk the ANN index. Adding
+        zero hides it from the index, forcing an exact scan of the rows
+        that pass the filter, while btree lookups for the filter itself
+        stay available.
+        """
+        return distance + 0 if exact else distance
+
+    def _filter_conditions(self, filters: SearchFilter) -> list:
+        conditions = []
+        if filters.embedding_model is not None:
+            conditions.append(ChunkModel.embedding_model == filters.embedding_model)
+        if filters.by_content:
+            # Semi-join through contents (and sources for domains), so each
+            # chunk still appears once and the statement keeps its shape
+            contents = select(ContentModel.id)
+            if filters.source_ids:
+                contents = contents.where(ContentModel.source_id.in_(filters.source_ids))
+            if filters.statuses:
+                contents = contents.where(ContentModel.status.in_(filters.statuses))
+            if filters.domains:
+                contents = (
+                    contents.join(SourceModel, SourceModel.id == ContentModel.source_id)
+                    .where(SourceModel.domain.in_(filters.domains))
+                )
+            conditions.append(ChunkModel.content_id.in_(contents))
+        return conditions
+
+    async def _prefers_prefilter(self, conditions: list) -> bool:
+        """Whether few enough chunks pass the filter to scan them all exactly"""
+        # Counting stops one past the cap, so a broad filter costs little to probe
+        cap = settings.VECTOR_PREFILTER_MAX_ROWS
+        matching = select(ChunkModel.id).where(*conditions).limit(cap + 1).subquery()
+        result = await self.session.execute(select(func.count()).select_from(matching))
+        return result.scalar_one() <= cap
+
+    async def _set_search_params(
+        self,
+        limit: int,
+        ef_search: Optional[int],
+        probes: Optional[int],
+        filtered: bool = False
+    ):
+        # SET LOCAL scopes the knob to the current transaction only
+        if settings.VECTOR_INDEX_TYPE == "hnsw":
+            # At least the limit, within the 1..1000 range pgvector accepts
+            ef_search = min(max(int(ef_search or settings.HNSW_EF_SEARCH), limit), 1000)
+            await self.session.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
+        elif settings.VECTOR_INDEX_TYPE == "ivfflat":
+            probes = int(probes or settings.IVFFLAT_PROBES)
+            await self.session.execute(text(f"SET LOCAL ivfflat.probes = {probes}"))
+        if filtered and settings.VECTOR_INDEX_TYPE in ("hnsw", "ivfflat") and settings.VECTOR_ITERATIVE_SCAN != "off":
+            # pgvector >= 0.8 keeps scanning until enough rows pass the filter
+            await self.session.execute(text(
+                f"SET LOCAL {settings.VECTOR_INDEX_TYPE}.iterative_scan = {settings.VECTOR_ITERATIVE_SCAN}"
+            ))
+
+    async def get_by_content_id(
+        self,
+        content_id: UUID,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[int, UUID]] = None,
+        with_embedding: bool = False
+    ) -> List[Chunk]:
+        # Keyset pagination on (content_id, sequence, id) instead of OFFSET;
+        # sequences may repeat, so the id breaks ties
+        stmt = self._select(with_embedding).where(ChunkModel.content_id == content_id)
+        if after is not None:
+            stmt = stmt.where(tuple_(ChunkModel.sequence, ChunkModel.id) > tuple_(*after))
+        stmt = stmt.order_by(ChunkModel.sequence, ChunkModel.id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await self.session.execute(stmt)
+        return self._to_entities(result.scalars().all())
+
+    async def stream_by_content_id(
+        self,
+        content_id: UUID,
+        batch_size: int = 500,
+        with_embedding: bool = False
+    ) -> AsyncIterator[Chunk]:
+        # Server-side cursor: rows arrive batch_size at a time
+        result = await self.session.stream_scalars(
+            self._select(with_embedding)
+            .where(ChunkModel.content_id == content_id)
+            .order_by(ChunkModel.sequence, ChunkModel.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for chunk in result:
+            yield self._to_entity(chunk)
+
+    def _select(self, with_embedding: bool, *columns):
+        stmt = select(ChunkModel, *columns)
+        return stmt.options(undefer(ChunkModel.embedding)) if with_embedding else stmt
+
+    def _to_model(self, chunk: Chunk) -> ChunkModel:
+        return ChunkModel(
             id=chunk.id,
             content_id=chunk.content_id,
             sequence=chunk.sequence,
             text=chunk.text,
-            embedding=np.array(chunk.embedding) if chunk.embedding is not None else None,
+            text_hash=chunk.text_hash,
             token_count=chunk.token_count,
             char_count=chunk.char_count,
-            embedding_model=chunk.embedding_model,
-            created_at=chunk.created_at
-        )
\ No newline at end of file
+            embedding=chunk.embedding,
+            embedding_model=chunk.embedding_model
+        )
+
+    def _to_entities(self, chunks: Sequence[ChunkModel]) -> List[Chunk]:
+        # One float32 matrix for the whole result set; entities hold row views
+        embeddings = stack_vectors([loaded_value(chunk, "embedding") for chunk in chunks])
+        return [self._to_entity(chunk, embedding=embedding) for chunk, embedding in zip(chunks, embeddings)]
+
+    def _to_entity(self, chunk: ChunkModel, **overrides) -> Chunk:
+        if "embedding" not in overrides:
+            # The embedding stays None unless the query undeferred it
+            embedding = loaded_value(chunk, "embedding")
+            overrides["embedding"] = np.asarray(embedding, dtype=np.float32) if embedding is not None else None
+        return Chunk(**{
+            "id": chunk.id,
+            "content_id": chunk.content_id,
+            "sequence": chunk.sequence,
+            "text": chunk.text,
+            "token_count": chunk.token_count,
+            "char_count": chunk.char_count,
+            "embedding_model": chunk.embedding_model,
+            "text_hash": chunk.text_hash,
+            "created_at": chunk.created_at,
+            **overrides
+        })
\ No newline at end of file
@@ -1,11 +1,14 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
-from sqlalchemy import select, update
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
 from sqlalchemy.dialects.postgresql import insert
 
+from core.config import settings
 from domain.entities.content import Content
 from ports.repositories.content_repository import ContentRepository, ABC
+from .base import loaded_value
 from .models import ContentModel
 
 class SQLAlchemyContentRepository(ContentRepository):
@@ -19,7 +22,9 @@ class SQLAlchemyContentRepository(ContentRepository):
             # Update existing model
             content_model.url = content.url
             content_model.source_id = content.source_id
-            content_model.raw_content = content.raw_content
+            # None means "not loaded" (raw_content is deferred), not "clear it"
+            if content.raw_content is not None:
+                content_model.raw_content = content.raw_content
             content_model.status = content.status
         else:
             # Create new model
@@ -36,29 +41,56 @@ class SQLAlchemyContentRepository(ContentRepository):
 
         await self.session.commit()
         await self.session.refresh(content_model)
-        return self._to_entity(content_model)
+        # refresh() skips deferred columns; raw_content is what was just written
+        return self._to_entity(content_model, raw_content=content.raw_content)
 
-    async def get_by_id(self, id: UUID) -> Optional[Content]:
-        content_model = await self._get_by_id(id)
+    async def get_by_id(self, id: UUID, with_raw_content: bool = False) -> Optional[Content]:
+        content_model = await self._get_by_id(id, with_raw_content)
         return self._to_entity(content_model) if content_model else None
 
-    async def get_by_url(self, url: str) -> Optional[Content]:
-        content_model = await self._get_by_url(url)
+    async def get_by_url(self, url: str, with_raw_content: bool = False) -> Optional[Content]:
+        content_model = await self._get_by_url(url, with_raw_content)
         return self._to_entity(content_model) if content_model else None
 
-    async def _get_by_url(self, url:str) -> Optional[ContentModel]:
+    async def _get_by_url(self, url:str, with_raw_content: bool = False) -> Optional[ContentModel]:
          result = await self.session.execute(
-            select(ContentModel)
+            self._select(with_raw_content)
             .where(ContentModel.url == url)
         )
          return result.scalar_one_or_none()
 
-    async def get_by_source_id(self, source_id: UUID) -> List[Content]:
-        result = await self.session.execute(
-            select(ContentModel)
+    async def get_by_source_id(
+        self,
+        source_id: UUID,
+        limit: Optional[int] = None,
+        after: Optional[UUID] = None,
+        with_raw_content: bool = False
+    ) -> List[Content]:
+        # Keyset pagination: seek past the last id on (source_id, id) instead of OFFSET
+        stmt = self._select(with_raw_content).where(ContentModel.source_id == source_id)
+        if after is not None:
+            stmt = stmt.where(ContentModel.id > after)
+        stmt = stmt.order_by(ContentModel.id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        result = await self.session.execute(stmt)
+        return [self._to_entity(model) for model in result.scalars().all()]
+
+    async def stream_by_source_id(
+        self,
+        source_id: UUID,
+        batch_size: int = 500,
+        with_raw_content: bool = False
+    ) -> AsyncIterator[Content]:
+        # Server-side cursor: rows arrive batch_size at a time
+        result = await self.session.stream_scalars(
+            self._select(with_raw_content)
             .where(ContentModel.source_id == source_id)
+            .order_by(ContentModel.id)
+            .execution_options(yield_per=batch_size)
         )
-        return [self._to_entity(model) for model in result.scalars().all()]
+        async for model in result:
+            yield self._to_entity(model)
 
     async def update_status(self, id: UUID, status: str) -> Optional[Content]:
         stmt = (
@@ -73,41 +105,48 @@ class SQLAlchemyContentRepository(ContentRepository):
         content_model = result.scalar_one_or_none()
         return self._to_entity(content_model) if content_model else None
 
-    async def get_by_status(self, status: str) -> List[Content]:
+    async def get_by_status(self, status: str, with_raw_content: bool = False) -> List[Content]:
         result = await self.session.execute(
-            select(ContentModel)
+            self._select(with_raw_content)
             .where(ContentModel.status == status)
         )
         return [self._to_entity(model) for model in result.scalars().all()]
 
-    async def _get_by_id(self, id: UUID) -> Optional[ContentModel]:
+    async def _get_by_id(self, id: UUID, with_raw_content: bool = False) -> Optional[ContentModel]:
         result = await self.session.execute(
-            select(ContentModel)
+            self._select(with_raw_content)
             .where(ContentModel.id == id)
         )
         return result.scalar_one_or_none()
 
-    async def _get_by_url_hash(self, url_hash: str) -> Optional[ContentModel]:
+    async def _get_by_url_hash(self, url_hash: str, with_raw_content: bool = False) -> Optional[ContentModel]:
         result = await self.session.execute(
-            select(ContentModel)
+            self._select(with_raw_content)
             .where(ContentModel.url_hash == url_hash)
         )
         return result.scalar_one_or_none()
 
-    def _to_entity(self, model: ContentModel) -> Content:
-        return Content(
-            id=model.id,
-            url=model.url,
-            url_hash=model.url_hash,
-            source_id=model.source_id,
-            raw_content=model.raw_content,
-            status=model.status,
-            created_at=model.created_at
-        )
+    def _select(self, with_raw_content: bool):
+        stmt = select(ContentModel)
+        return stmt.options(undefer(ContentModel.raw_content)) if with_raw_content else stmt
 
-    async def get_pending_contents(self, limit: int = 10) -> List[Content]:
+    def _to_entity(self, model: ContentModel, **overrides) -> Content:
+        # raw_content stays None unless the query undeferred it
+        return Content(**{
+            "id": model.id,
+            "url": model.url,
+            "url_hash": model.url_hash,
+            "source_id": model.source_id,
+            "raw_content": loaded_value(model, "raw_content"),
+            "status": model.status,
+            "content_hash": model.content_hash,
+            "created_at": model.created_at,
+            **overrides
+        })
+
+    async def get_pending_contents(self, limit: int = 10, with_raw_content: bool = False) -> List[Content]:
         result = await self.session.execute(
-            select(ContentModel)
+            self._select(with_raw_content)
             .where(ContentModel.status == 'pending')
             .limit(limit)
         )
@@ -133,7 +172,10 @@ class SQLAlchemyContentRepository(ContentRepository):
         for model in content_models:
             await self.session.refresh(model)
         
-        return [self._to_entity(model) for model in content_models]
+        return [
+            self._to_entity(model, raw_content=content.raw_content)
+            for model, content in zip(content_models, contents)
+        ]
 
     async def delete(self, id: UUID) -> bool:
         content_model = await self._get_by_id(id)
@@ -172,8 +214,61 @@ class SQLAlchemyContentRepository(ContentRepository):
         content_model = result.scalar_one_or_none()
         if content_model is None:
             raise Exception("Upsert failed")  # Should not happen
-        return self._to_entity(content_model)
+        return self._to_entity(content_model, raw_content=content.raw_content)
+
+    async def upsert_many(self, contents: List[Content]) -> List[Content]:
+        """Insert or update contents by url_hash, one statement per batch of rows.
+
+        Existing rows keep their id and status; raw_content is only replaced
+        when a new value is given, and is not sent back.
+        """
+        unique = list({content.url_hash: content for content in contents}.values())
+        if not unique:
+            return []
+        by_hash = {}
+        batch_size = settings.DB_UPSERT_BATCH_SIZE
+        for start in range(0, len(unique), batch_size):
+            for model in await self._upsert_batch(unique[start:start + batch_size]):
+                by_hash[model.url_hash] = self._to_entity(model)
+        await self.session.commit()
+        return [by_hash[content.url_hash] for content in contents]
+
+    async def _upsert_batch(self, contents: List[Content]) -> List[ContentModel]:
+        stmt = insert(ContentModel).values([
+            {
+                "id": content.id,
+                "url": content.url,
+                "url_hash": content.url_hash,
+                "source_id": content.source_id,
+                "raw_content": content.raw_content,
+                "status": content.status,
+                "created_at": content.created_at,
+            }
+            for content in contents
+        ])
+        stmt = (
+            stmt.on_conflict_do_update(
+                index_elements=[ContentModel.url_hash],
+                set_={
+                    "url": stmt.excluded.url,
+                    "source_id": stmt.excluded.source_id,
+                    "raw_content": func.coalesce(stmt.excluded.raw_content, ContentModel.raw_content),
+                },
+            )
+            .returning(ContentModel)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
+
+    async def mark_ingested(self, id: UUID, content_hash: str) -> None:
+        await self.session.execute(
+            update(ContentModel)
+            .where(ContentModel.id == id)
+            .values(content_hash=content_hash, status='processed')
+        )
+        await self.session.commit()
 
-    async def get_by_url_hash(self, url_hash: str) -> Optional[Content]:
-        content_model = await self._get_by_url_hash(url_hash)
+    async def get_by_url_hash(self, url_hash: str, with_raw_content: bool = False) -> Optional[Content]:
+        content_model = await self._get_by_url_hash(url_hash, with_raw_content)
         return self._to_entity(content_model) if content_model else None
\ No newline at end of file
@@ -0,0 +1,50 @@
+from typing import Dict, List
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from ports.repositories.embedding_cache_repository import EmbeddingCacheRepository
+from .models import EmbeddingCacheModel
+from .vector_codec import stack_vectors
+
+class SQLAlchemyEmbeddingCacheRepository(EmbeddingCacheRepository):
+    """Process-wide cache store; opens its own short-lived sessions"""
+
+    def __init__(self, session_factory: sessionmaker):
+        self.session_factory = session_factory
+
+    async def get_many(self, model: str, text_hashes: List[str]) -> Dict[str, np.ndarray]:
+        if not text_hashes:
+            return {}
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(EmbeddingCacheModel.text_hash, EmbeddingCacheModel.embedding)
+                .where(EmbeddingCacheModel.embedding_model == model)
+                .where(EmbeddingCacheModel.text_hash.in_(text_hashes))
+            )
+            rows = result.all()
+            vectors = stack_vectors([embedding for _, embedding in rows])
+            return {text_hash: vector for (text_hash, _), vector in zip(rows, vectors)}
+
+    async def put_many(self, model: str, vectors: Dict[str, np.ndarray]) -> None:
+        if not vectors:
+            return
+        stmt = (
+            insert(EmbeddingCacheModel)
+            .values([
+                {
+                    "embedding_model": model,
+                    "text_hash": text_hash,
+                    "embedding": vector,
+                }
+                for text_hash, vector in vectors.items()
+            ])
+            .on_conflict_do_nothing(
+                index_elements=[EmbeddingCacheModel.embedding_model, EmbeddingCacheModel.text_hash]
+            )
+        )
+        async with self.session_factory() as session:
+            await session.execute(stmt)
+            await session.commit()
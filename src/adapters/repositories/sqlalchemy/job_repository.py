@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from domain.entities.job import IngestionJob
+from ports.repositories.job_repository import JobRepository
+from .models import IngestionJobModel
+
+class SQLAlchemyJobRepository(JobRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def create(self, job: IngestionJob) -> IngestionJob:
+        job_model = IngestionJobModel(
+            id=job.id,
+            user=job.user,
+            inputs=job.inputs,
+            response_mode=job.response_mode,
+            status=job.status,
+            created_at=job.created_at,
+            updated_at=datetime.utcnow()
+        )
+        self.session.add(job_model)
+        await self.session.commit()
+        await self.session.refresh(job_model)
+        return self._to_entity(job_model)
+
+    async def get_by_id(self, id: UUID) -> Optional[IngestionJob]:
+        result = await self.session.execute(
+            select(IngestionJobModel).where(IngestionJobModel.id == id)
+        )
+        model = result.scalar_one_or_none()
+        return self._to_entity(model) if model else None
+
+    async def claim_next(self) -> Optional[IngestionJob]:
+        # SKIP LOCKED lets any number of worker processes poll the same table
+        result = await self.session.execute(
+            select(IngestionJobModel)
+            .where(IngestionJobModel.status == 'queued')
+            .order_by(IngestionJobModel.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        model = result.scalar_one_or_none()
+        if model is None:
+            await self.session.rollback()
+            return None
+        now = datetime.utcnow()
+        model.status = 'running'
+        model.started_at = now
+        model.updated_at = now
+        await self.session.commit()
+        return self._to_entity(model)
+
+    async def update_progress(self, id: UUID, documents_processed: int, chunks_processed: int) -> None:
+        await self.session.execute(
+            update(IngestionJobModel)
+            .where(IngestionJobModel.id == id)
+            .values(
+                documents_processed=documents_processed,
+                chunks_processed=chunks_processed,
+                updated_at=datetime.utcnow()
+            )
+        )
+        await self.session.commit()
+
+    async def heartbeat(self, id: UUID) -> None:
+        await self.session.execute(
+            update(IngestionJobModel)
+            .where(IngestionJobModel.id == id)
+            .where(IngestionJobModel.status == 'running')
+            .values(updated_at=datetime.utcnow())
+        )
+        await self.session.commit()
+
+    async def finish(self, id: UUID, status: str, error: Optional[str] = None) -> None:
+        now = datetime.utcnow()
+        await self.session.execute(
+            update(IngestionJobModel)
+            .where(IngestionJobModel.id == id)
+            .values(status=status, error=error, finished_at=now, updated_at=now)
+        )
+        await self.session.commit()
+
+    async def requeue_stale(self, stale_after_seconds: float) -> int:
+        cutoff = datetime.utcnow() - timedelta(seconds=stale_after_seconds)
+        result = await self.session.execute(
+            update(IngestionJobModel)
+            .where(IngestionJobModel.status == 'running')
+            .where(IngestionJobModel.updated_at < cutoff)
+            .values(status='queued', started_at=None, updated_at=datetime.utcnow())
+        )
+        await self.session.commit()
+        return result.rowcount
+
+    def _to_entity(self, model: IngestionJobModel) -> IngestionJob:
+        return IngestionJob(
+            id=model.id,
+            user=model.user,
+            inputs=model.inputs,
+            response_mode=model.response_mode,
+            status=model.status,
+            documents_processed=model.documents_processed or 0,
+            chunks_processed=model.chunks_processed or 0,
+            error=model.error,
+            created_at=model.created_at,
+            started_at=model.started_at,
+            finished_at=model.finished_at
+        )
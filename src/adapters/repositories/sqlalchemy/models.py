@@ -1,13 +1,14 @@
 from sqlalchemy import (
-    Column, DateTime, Boolean, String, Text, Integer, ForeignKey, Index
+    Column, Computed, DateTime, Boolean, String, Text, Integer, ForeignKey, Index
 )
-from sqlalchemy.dialects.postgresql import UUID
-from pgvector.sqlalchemy import Vector as VECTOR
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR, UUID
+from sqlalchemy.orm import deferred, relationship
 from datetime import datetime
 from uuid import uuid4
 
+from core.config import settings
 from .base import Base
+from .vector_codec import Vector as VECTOR
 
 class SourceModel(Base):
     __tablename__ = 'sources'
@@ -27,8 +28,11 @@ class ContentModel(Base):
     source_id = Column(UUID(as_uuid=True), ForeignKey('sources.id'))
     url = Column(Text, nullable=False)
     url_hash = Column(String(64), unique=True, nullable=False)
-    raw_content = Column(Text)
+    # Heavy columns are deferred: queries load them only via undefer()
+    raw_content = deferred(Column(Text), raiseload=True)
     status = Column(String(20), default='pending')
+    # sha256 of the last ingested page text; unchanged pages are skipped
+    content_hash = Column(String(64))
     created_at = Column(DateTime, default=datetime.utcnow)
 
     source = relationship("SourceModel", back_populates="contents")
@@ -36,8 +40,11 @@ class ContentModel(Base):
 
     __table_args__ = (
         Index('ix_contents_url_hash', 'url_hash'),
-        Index('ix_contents_source_id', 'source_id'),
-        Index('ix_contents_status', 'status'),
+        # Also serves keyset pagination in id order
+        Index('ix_contents_source_id_id', 'source_id', 'id'),
+        # Covers the status/source semi-join of filtered vector searches,
+        # and plain status lookups through its leading column
+        Index('ix_contents_status_source_id', 'status', 'source_id', 'id'),
     )
 
 class ChunkModel(Base):
@@ -47,10 +54,62 @@ class ChunkModel(Base):
     content_id = Column(UUID(as_uuid=True), ForeignKey('contents.id'))
     sequence = Column(Integer, nullable=False)
     text = Column(Text, nullable=False)
+    text_hash = Column(String(64))
     token_count = Column(Integer)
     char_count = Column(Integer)
-    embedding = Column(VECTOR(1536))
+    embedding = deferred(Column(VECTOR(settings.VECTOR_DIMENSION)), raiseload=True)
     embedding_model = Column(String(100))
+    # Generated column, so Postgres keeps it in sync on every insert/update;
+    # only ever used inside SQL, so never loaded
+    text_search = deferred(
+        Column(TSVECTOR, Computed("to_tsvector('english', text)", persisted=True)),
+        raiseload=True
+    )
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    content = relationship("ContentModel", back_populates="chunks")
\ No newline at end of file
+    content = relationship("ContentModel", back_populates="chunks")
+
+    __table_args__ = (
+        Index('ix_chunks_text_search', 'text_search', postgresql_using='gin'),
+        Index('ix_chunks_content_id_text_hash', 'content_id', 'text_hash'),
+        Index('ix_chunks_content_id_sequence', 'content_id', 'sequence', 'id'),
+    )
+
+class ChunkEmbeddingModel(Base):
+    """Vectors from the extra embedding models, one row per chunk and model"""
+    __tablename__ = 'chunk_embeddings'
+
+    chunk_id = Column(UUID(as_uuid=True), ForeignKey('chunks.id', ondelete='CASCADE'), primary_key=True)
+    embedding_model = Column(String(100), primary_key=True)
+    # Unconstrained dimension; per-model ANN indexes cast to the model's size
+    embedding = Column(VECTOR(), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class EmbeddingCacheModel(Base):
+    __tablename__ = 'embedding_cache'
+
+    embedding_model = Column(String(100), primary_key=True)
+    text_hash = Column(String(64), primary_key=True)
+    # Unconstrained dimension so entries from different models can coexist
+    embedding = Column(VECTOR(), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class IngestionJobModel(Base):
+    __tablename__ = 'ingestion_jobs'
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid4)
+    user = Column(String(255), nullable=False)
+    inputs = Column(JSONB, nullable=False)
+    response_mode = Column(String(20), default='blocking')
+    status = Column(String(32), default='queued', nullable=False)
+    documents_processed = Column(Integer, default=0)
+    chunks_processed = Column(Integer, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_ingestion_jobs_status_created_at', 'status', 'created_at'),
+    )
@@ -0,0 +1,61 @@
+from typing import List
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from core.config import settings
+
+# create_all() only creates missing tables: it never adds columns or
+# indexes to a table that already exists. Databases created before a
+# schema change are brought up to date here, so every statement must be
+# safe to rerun. Index names match the models, making these no-ops on a
+# fresh database.
+UPGRADES: List[str] = [
+    # Full-text side of hybrid search
+    "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS text_search tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', text)) STORED",
+    "CREATE INDEX IF NOT EXISTS ix_chunks_text_search ON chunks USING gin (text_search)",
+    # Fingerprints for incremental re-ingestion
+    "ALTER TABLE contents ADD COLUMN IF NOT EXISTS content_hash VARCHAR(64)",
+    "ALTER TABLE chunks ADD COLUMN IF NOT EXISTS text_hash VARCHAR(64)",
+    "CREATE INDEX IF NOT EXISTS ix_chunks_content_id_text_hash ON chunks (content_id, text_hash)",
+    # Keyset pagination over a source's contents: (source_id, id)
+    "CREATE INDEX IF NOT EXISTS ix_contents_source_id_id ON contents (source_id, id)",
+    "DROP INDEX IF EXISTS ix_contents_source_id",
+    "CREATE INDEX IF NOT EXISTS ix_chunks_content_id_sequence ON chunks (content_id, sequence, id)",
+    # Filtered vector search; its leading column also serves status lookups
+    "CREATE INDEX IF NOT EXISTS ix_contents_status_source_id ON contents (status, source_id, id)",
+    "DROP INDEX IF EXISTS ix_contents_status",
+]
+
+EMBEDDING_COLUMN_TYPE = text(
+    "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+    "WHERE attrelid = 'chunks'::regclass AND attname = 'embedding' AND NOT attisdropped"
+)
+
+async def check_embedding_dimension(connection: AsyncConnection, dimension: int):
+    """Make chunks.embedding match VECTOR_DIMENSION.
+
+    An empty column is resized in place. Stored vectors of another size
+    cannot be converted, so startup fails instead of every insert and
+    search failing later.
+    """
+    expected = f"vector({dimension})"
+    actual = (await connection.execute(EMBEDDING_COLUMN_TYPE)).scalar()
+    if actual is None or actual == expected:
+        return
+
+    has_vectors = (await connection.execute(
+        text("SELECT EXISTS (SELECT 1 FROM chunks WHERE embedding IS NOT NULL)")
+    )).scalar()
+    if has_vectors:
+        raise ValueError(
+            f"chunks.embedding is {actual} but VECTOR_DIMENSION is {dimension}; "
+            "set VECTOR_DIMENSION to match, or re-embed into a new database"
+        )
+    await connection.execute(text(f"ALTER TABLE chunks ALTER COLUMN embedding TYPE {expected}"))
+
+async def upgrade_schema(connection: AsyncConnection):
+    for statement in UPGRADES:
+        await connection.execute(text(statement))
+    await check_embedding_dimension(connection, settings.VECTOR_DIMENSION)
@@ -1,8 +1,10 @@
 from typing import List, Optional
 from uuid import UUID
-from sqlalchemy import select
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from core.config import settings
 from domain.entities.source import Source
 from ports.repositories.source_repository import SourceRepository
 from .models import SourceModel
@@ -63,37 +65,46 @@ class SQLAlchemySourceRepository(SourceRepository):
         return self._to_entity(source_model) if source_model else None
     
     async def upsert(self, source: Source) -> Source:
-        existing_source = await self.get_by_domain(source.domain)
-        if existing_source:
-            # Update existing source
-            existing_source.is_active = source.is_active
-            existing_source.last_crawled = source.last_crawled
-            result = await self.session.execute(
-                select(SourceModel).where(SourceModel.id == existing_source.id)
-            )
-            source_model = result.scalar_one_or_none()
-            if source_model:
-                source_model.domain = existing_source.domain
-                source_model.is_active = existing_source.is_active
-                source_model.last_crawled = existing_source.last_crawled
-                await self.session.commit()
-                await self.session.refresh(source_model)
-            return self._to_entity(source_model) if source_model else None
-        else:
-            # Create new source
-            source_model = SourceModel(
-                id=source.id,
-                domain=source.domain,
-                is_active=source.is_active,
-                last_crawled=source.last_crawled,
-                created_at=source.created_at
-            )
-            self.session.add(source_model)
-            await self.session.commit()
-            await self.session.refresh(source_model)
-            return self._to_entity(source_model)
+        return (await self.upsert_many([source]))[0]
 
+    async def upsert_many(self, sources: List[Source]) -> List[Source]:
+        """Insert or update sources by domain, one statement per batch of rows"""
+        # ON CONFLICT cannot touch the same row twice, so keep one per domain
+        unique = list({source.domain: source for source in sources}.values())
+        if not unique:
+            return []
+        by_domain = {}
+        batch_size = settings.DB_UPSERT_BATCH_SIZE
+        for start in range(0, len(unique), batch_size):
+            for model in await self._upsert_batch(unique[start:start + batch_size]):
+                by_domain[model.domain] = self._to_entity(model)
+        await self.session.commit()
+        return [by_domain[source.domain] for source in sources]
 
+    async def _upsert_batch(self, sources: List[Source]) -> List[SourceModel]:
+        stmt = insert(SourceModel).values([
+            {
+                "id": source.id,
+                "domain": source.domain,
+                "is_active": source.is_active,
+                "last_crawled": source.last_crawled,
+                "created_at": source.created_at,
+            }
+            for source in sources
+        ])
+        stmt = (
+            stmt.on_conflict_do_update(
+                index_elements=[SourceModel.domain],
+                set_={
+                    "is_active": stmt.excluded.is_active,
+                    "last_crawled": func.coalesce(stmt.excluded.last_crawled, SourceModel.last_crawled),
+                },
+            )
+            .returning(SourceModel)
+            .execution_options(populate_existing=True)
+        )
+        result = await self.session.execute(stmt)
+        return list(result.scalars().all())
 
     # Test comment
 
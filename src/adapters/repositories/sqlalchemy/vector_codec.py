@@ -0,0 +1,99 @@
+import logging
+import struct
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+from pgvector.sqlalchemy import VECTOR
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.types import TypeDecorator
+
+logger = logging.getLogger(__name__)
+
+# pgvector binary format: uint16 dimensions, uint16 unused, big-endian float32s
+_HEADER = struct.Struct(">HH")
+_WIRE_DTYPE = np.dtype(">f4")
+
+def encode_vector(value: Any) -> bytes:
+    if isinstance(value, str):
+        # Text literal, e.g. bound through a plain pgvector VECTOR type
+        value = np.array(value.strip("[]").split(","), dtype=np.float32)
+    array = np.asarray(value, dtype=_WIRE_DTYPE)
+    if array.ndim != 1:
+        raise ValueError(f"expected a 1-d vector, got shape {array.shape}")
+    return _HEADER.pack(array.shape[0], 0) + array.tobytes()
+
+def decode_vector(data: bytes) -> np.ndarray:
+    """Read-only big-endian view over the received bytes; no per-float objects"""
+    dimensions, _ = _HEADER.unpack_from(data)
+    if len(data) != _HEADER.size + dimensions * _WIRE_DTYPE.itemsize:
+        raise ValueError(f"vector header says {dimensions} dimensions but carries {len(data)} bytes")
+    return np.frombuffer(data, dtype=_WIRE_DTYPE, count=dimensions, offset=_HEADER.size)
+
+def stack_vectors(vectors: Sequence[Optional[np.ndarray]]) -> List[Optional[np.ndarray]]:
+    """Copy decoded vectors into one contiguous float32 matrix.
+
+    Returns one row view of that matrix per input, None where the input
+    was None. Vectors of different lengths are converted one by one.
+    """
+    present = [vector for vector in vectors if vector is not None]
+    if not present:
+        return list(vectors)
+    if len({len(vector) for vector in present}) > 1:
+        rows = iter([np.asarray(vector, dtype=np.float32) for vector in present])
+    else:
+        # A single C-level pass byte-swaps every row into place
+        rows = iter(np.array(present, dtype=np.float32))
+    return [next(rows) if vector is not None else None for vector in vectors]
+
+class _CastVector(VECTOR):
+    cache_ok = True
+    render_bind_cast = True
+
+class Vector(TypeDecorator):
+    """pgvector ``vector`` column that speaks numpy.
+
+    On asyncpg (with register_vector_codec) values cross the wire in binary
+    and come back as numpy views; elsewhere it falls back to pgvector's
+    text format. Binds render an explicit ``::VECTOR`` cast so parameters
+    nested in CASTs or overloaded functions still resolve to ``vector``.
+    """
+
+    impl = _CastVector
+    cache_ok = True
+
+    def bind_processor(self, dialect):
+        if dialect.driver == "asyncpg":
+            return None
+        return self.impl_instance.bind_processor(dialect)
+
+    def result_processor(self, dialect, coltype):
+        text_processor = self.impl_instance.result_processor(dialect, coltype)
+
+        def process(value):
+            if value is None or isinstance(value, np.ndarray):
+                return value
+            return np.asarray(text_processor(value), dtype=np.float32)
+        return process
+
+def register_vector_codec(engine: AsyncEngine):
+    """Decode and encode ``vector`` in binary on every new asyncpg connection"""
+    if engine.dialect.driver != "asyncpg":
+        return
+
+    async def set_codec(connection):
+        try:
+            await connection.set_type_codec(
+                "vector",
+                schema="public",
+                encoder=encode_vector,
+                decoder=decode_vector,
+                format="binary"
+            )
+        except ValueError as e:
+            # The extension is created by database/init.sql; without it there is nothing to decode
+            logger.warning(f"pgvector binary codec not registered: {e}")
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        dbapi_connection.run_async(set_codec)
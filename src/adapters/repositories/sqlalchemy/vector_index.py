@@ -0,0 +1,120 @@
+import logging
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = logging.getLogger(__name__)
+
+INDEX_TYPES = ("hnsw", "ivfflat")
+QUANTIZATIONS = ("none", "halfvec", "binary")
+
+def compact_expression(column: str, quantization: str, dimensions: int) -> str:
+    """SQL for the indexed form of ``column``; search must use the same expression"""
+    if quantization == "halfvec":
+        return f"({column}::halfvec({dimensions}))"
+    if quantization == "binary":
+        return f"(binary_quantize({column})::bit({dimensions}))"
+    if quantization == "none":
+        return column
+    raise ValueError(f"Unknown vector quantization: {quantization}")
+
+class VectorIndexManager:
+    """Builds, rebuilds and drops the pgvector ANN indexes on chunk embeddings.
+
+    With a quantization other than "none" the index is built over a
+    halfvec or binary-quantized expression of the column, which is 2x / 32x
+    smaller than a full-precision index; the float32 column stays the
+    source for rescoring.
+
+    Given a ``model``, the index is a partial one over that model's rows of
+    a shared multi-model table, with the untyped column cast to
+    ``dimensions``.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        table: str = "chunks",
+        column: str = "embedding",
+        quantization: str = "none",
+        dimensions: int = 1536,
+        model: Optional[str] = None
+    ):
+        self.engine = engine
+        self.table = table
+        self.column = column
+        self.quantization = quantization
+        self.model = model
+        self.expression = compact_expression(column, quantization, dimensions)
+        if model is not None and quantization == "none":
+            self.expression = f"({column}::vector({dimensions}))"
+        self.opclass = {
+            "none": "vector_cosine_ops",
+            "halfvec": "halfvec_cosine_ops",
+            "binary": "bit_hamming_ops",
+        }[quantization]
+
+    def index_name(self, index_type: str) -> str:
+        suffix = "" if self.quantization == "none" else f"_{self.quantization}"
+        if self.model is not None:
+            suffix += "_" + re.sub(r"\W+", "_", self.model).lower()
+        # Postgres truncates identifiers beyond 63 bytes
+        return f"ix_{self.table}_{self.column}_{index_type}{suffix}"[:63]
+
+    def create_statement(self, index_type: str, params: Dict[str, int], concurrently: bool = False) -> str:
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"Unknown vector index type: {index_type}")
+        with_clause = ", ".join(f"{key} = {int(value)}" for key, value in params.items())
+        return (
+            f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS "
+            f"{self.index_name(index_type)} ON {self.table} "
+            f"USING {index_type} ({self.expression} {self.opclass})"
+            + (f" WITH ({with_clause})" if with_clause else "")
+            + (f" WHERE embedding_model = {self._model_literal()}" if self.model else "")
+        )
+
+    def _model_literal(self) -> str:
+        escaped = self.model.replace("'", "''")
+        return f"'{escaped}'"
+
+    async def build(self, index_type: str, params: Dict[str, int], concurrently: bool = False):
+        logger.info(f"Building {index_type} index on {self.table}.{self.column} with {params}")
+        await self._execute(self.create_statement(index_type, params, concurrently), autocommit=concurrently)
+
+    async def rebuild(self, index_type: str, concurrently: bool = True):
+        logger.info(f"Rebuilding {self.index_name(index_type)}")
+        await self._execute(
+            f"REINDEX INDEX {'CONCURRENTLY ' if concurrently else ''}{self.index_name(index_type)}",
+            autocommit=concurrently
+        )
+
+    async def drop(self, index_type: str, concurrently: bool = False):
+        logger.info(f"Dropping {self.index_name(index_type)}")
+        await self._execute(
+            f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}IF EXISTS {self.index_name(index_type)}",
+            autocommit=concurrently
+        )
+
+    async def list_indexes(self) -> List[Dict[str, str]]:
+        async with self.engine.connect() as conn:
+            result = await conn.execute(
+                text(
+                    "SELECT indexname, indexdef, "
+                    "pg_size_pretty(pg_relation_size(indexname::regclass)) AS size "
+                    "FROM pg_indexes WHERE tablename = :table"
+                ),
+                {"table": self.table}
+            )
+            return [dict(row._mapping) for row in result]
+
+    async def _execute(self, statement: str, autocommit: bool = False):
+        # CONCURRENTLY variants cannot run inside a transaction block
+        if autocommit:
+            async with self.engine.connect() as conn:
+                conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+                await conn.execute(text(statement))
+        else:
+            async with self.engine.begin() as conn:
+                await conn.execute(text(statement))
@@ -0,0 +1,111 @@
+import asyncio
+from typing import Callable, Dict, List, Set, Tuple
+
+from domain.value_objects.embedding import Embedding
+from ports.services.vector_service import VectorService
+
+class MicroBatchingVectorService(VectorService):
+    """VectorService decorator that merges concurrent single-text requests.
+
+    A ``generate_embedding`` call that finds no batch in flight is sent at
+    once, so a lone query pays no batching delay. While a batch is in
+    flight, calls arriving within ``max_wait`` seconds of the first one are
+    sent upstream as one ``batch_generate_embeddings`` call, flushed early
+    once ``max_batch_size`` texts or ``max_batch_tokens`` tokens are
+    pending; each caller gets its own embedding back. Batch calls pass
+    straight through.
+    """
+
+    def __init__(
+        self,
+        inner: VectorService,
+        max_wait: float = 0.005,
+        max_batch_size: int = 64,
+        max_batch_tokens: int = 8_000,
+        count_tokens: Callable[[str], int] = lambda text: len(text) // 4 + 1
+    ):
+        self.inner = inner
+        self.max_wait = max_wait
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.count_tokens = count_tokens
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._pending_tokens = 0
+        self._timer: asyncio.TimerHandle | None = None
+        self._dispatches: Set[asyncio.Task] = set()
+        self.requests = 0
+        self.batches = 0
+
+    @property
+    def model(self) -> str:
+        return self.inner.model
+
+    async def generate_embedding(self, text: str) -> Embedding:
+        loop = asyncio.get_running_loop()
+        tokens = self.count_tokens(text)
+        if self._pending and self._pending_tokens + tokens > self.max_batch_tokens:
+            self._flush()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self._pending_tokens += tokens
+        self.requests += 1
+        if len(self._pending) >= self.max_batch_size or not self._dispatches:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait, self._flush)
+        return await future
+
+    async def batch_generate_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return await self.inner.batch_generate_embeddings(texts)
+
+    async def compute_similarity(self, embedding1: Embedding, embedding2: Embedding) -> float:
+        return await self.inner.compute_similarity(embedding1, embedding2)
+
+    async def aclose(self):
+        """Send whatever is pending and wait for in-flight batches"""
+        self._flush()
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending, self._pending_tokens = self._pending, [], 0
+        if not batch:
+            return
+        self.batches += 1
+        # Hold a reference so the task isn't garbage collected mid-flight
+        task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+        self._dispatches.add(task)
+        task.add_done_callback(self._dispatches.discard)
+        # A dispatch cancelled (e.g. at shutdown), even before it started,
+        # must not leave its callers waiting forever
+        task.add_done_callback(lambda _: self._cancel_unanswered(batch))
+
+    def _cancel_unanswered(self, batch: List[Tuple[str, asyncio.Future]]):
+        for _, future in batch:
+            future.cancel()
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        # Identical texts in one window are embedded once
+        texts = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            embeddings = dict(zip(texts, await self.inner.batch_generate_embeddings(texts)))
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for text, future in batch:
+            # Callers that were cancelled while waiting are skipped
+            if not future.done():
+                future.set_result(embeddings[text])
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch_size": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "pending": len(self._pending),
+        }
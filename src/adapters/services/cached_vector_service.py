@@ -0,0 +1,121 @@
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from domain.value_objects.embedding import Embedding
+from ports.repositories.embedding_cache_repository import EmbeddingCacheRepository
+from ports.services.vector_service import VectorService
+
+logger = logging.getLogger(__name__)
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+class LRUCache:
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items: OrderedDict[Tuple[str, str], np.ndarray] = OrderedDict()
+
+    def get(self, key: Tuple[str, str]) -> np.ndarray | None:
+        vector = self._items.get(key)
+        if vector is not None:
+            self._items.move_to_end(key)
+        return vector
+
+    def put(self, key: Tuple[str, str], vector: np.ndarray):
+        self._items[key] = vector
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+class CachedVectorService(VectorService):
+    """VectorService decorator with an in-memory LRU in front of a persistent store.
+
+    Entries are keyed on (model, sha256(text)); identical texts within one
+    batch are embedded once.
+    """
+
+    def __init__(
+        self,
+        inner: VectorService,
+        store: EmbeddingCacheRepository | None = None,
+        max_size: int = 10_000
+    ):
+        self.inner = inner
+        self.store = store
+        self.memory = LRUCache(max_size)
+        self.memory_hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    @property
+    def model(self) -> str:
+        return self.inner.model
+
+    async def generate_embedding(self, text: str) -> Embedding:
+        return (await self.batch_generate_embeddings([text]))[0]
+
+    async def batch_generate_embeddings(self, texts: List[str]) -> List[Embedding]:
+        model = self.model
+        keys = [(model, text_hash(text)) for text in texts]
+        found: Dict[Tuple[str, str], np.ndarray] = {}
+
+        for key in dict.fromkeys(keys):
+            vector = self.memory.get(key)
+            if vector is not None:
+                found[key] = vector
+                self.memory_hits += 1
+
+        pending = [key for key in dict.fromkeys(keys) if key not in found]
+        if pending and self.store is not None:
+            try:
+                stored = await self.store.get_many(model, [key[1] for key in pending])
+            except Exception as e:
+                logger.warning(f"Embedding cache lookup failed: {e}")
+                stored = {}
+            for key in pending:
+                vector = stored.get(key[1])
+                if vector is not None:
+                    found[key] = vector
+                    self.memory.put(key, vector)
+                    self.store_hits += 1
+            pending = [key for key in pending if key not in found]
+
+        if pending:
+            first_text = {key: text for key, text in zip(keys, texts)}
+            embeddings = await self.inner.batch_generate_embeddings(
+                [first_text[key] for key in pending]
+            )
+            self.misses += len(pending)
+            fresh = {key: embedding.vector for key, embedding in zip(pending, embeddings)}
+            for key, vector in fresh.items():
+                found[key] = vector
+                self.memory.put(key, vector)
+            if self.store is not None:
+                try:
+                    await self.store.put_many(
+                        model, {key[1]: vector for key, vector in fresh.items()}
+                    )
+                except Exception as e:
+                    logger.warning(f"Embedding cache write failed: {e}")
+
+        return [Embedding(vector=found[key], model=model) for key in keys]
+
+    async def compute_similarity(self, embedding1: Embedding, embedding2: Embedding) -> float:
+        return await self.inner.compute_similarity(embedding1, embedding2)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.memory_hits + self.store_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "store_hits": self.store_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.store_hits) / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.memory),
+        }
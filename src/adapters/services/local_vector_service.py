@@ -0,0 +1,140 @@
+import asyncio
+import hashlib
+import re
+from abc import abstractmethod
+from typing import List, Optional
+
+import numpy as np
+
+from adapters.cpu_pool import CpuPool
+from domain.value_objects.embedding import Embedding, split_model_spec
+from ports.services.vector_service import VectorService
+
+_TOKEN = re.compile(r"\w+")
+_INLINE_MAX_CHARS = 2_000
+
+def hash_embed(texts: List[str], dimensions: int) -> np.ndarray:
+    """Signed feature hashing of word unigrams and bigrams, L2-normalized.
+
+    Deterministic across processes and machines (blake2b, not ``hash()``),
+    so vectors can be compared between runs.
+    """
+    matrix = np.zeros((len(texts), dimensions), dtype=np.float32)
+    for row, text in enumerate(texts):
+        words = _TOKEN.findall(text.lower())
+        features = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+        for feature in features:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            matrix[row, digest % dimensions] += 1.0 if digest >> 63 else -1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+class _LocalVectorService(VectorService):
+    """Shared batching for CPU models: length-sorted batches, run off the event loop"""
+
+    def __init__(self, model: str, batch_size: int = 32):
+        self.model = model
+        self.batch_size = batch_size
+
+    async def generate_embedding(self, text: str) -> Embedding:
+        return (await self.batch_generate_embeddings([text]))[0]
+
+    async def batch_generate_embeddings(self, texts: List[str]) -> List[Embedding]:
+        if not texts:
+            return []
+        # Similar lengths share a batch, which keeps padding to a minimum
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors: List[Optional[np.ndarray]] = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, await self._encode([texts[i] for i in batch])):
+                vectors[i] = vector
+        return [Embedding(vector=vector, model=self.model) for vector in vectors]
+
+    async def compute_similarity(self, embedding1: Embedding, embedding2: Embedding) -> float:
+        return embedding1.cosine_similarity(embedding2)
+
+    @abstractmethod
+    async def _encode(self, texts: List[str]) -> np.ndarray:
+        """One L2-normalized float32 row per text"""
+        pass
+
+class HashingVectorService(_LocalVectorService):
+    """Dependency-free local embeddings for tests and offline benchmarks.
+
+    Captures lexical overlap only, not semantics. ``model`` is a label
+    like ``"hashing@384"``; the size defaults to ``dimensions``.
+    """
+
+    def __init__(self, model: str = "hashing", dimensions: int = 1536, batch_size: int = 256, cpu_pool: Optional[CpuPool] = None):
+        super().__init__(model, batch_size)
+        self.dimensions = split_model_spec(model)[1] or dimensions
+        self.cpu_pool = cpu_pool
+
+    async def _encode(self, texts: List[str]) -> np.ndarray:
+        # Queries are hashed inline: cheaper than any hop off the loop
+        if sum(len(text) for text in texts) <= _INLINE_MAX_CHARS:
+            return hash_embed(texts, self.dimensions)
+        # Pure Python hashing holds the GIL, so a process pool scales it
+        if self.cpu_pool is not None:
+            return await self.cpu_pool.run(hash_embed, texts, self.dimensions)
+        return await asyncio.to_thread(hash_embed, texts, self.dimensions)
+
+class OnnxVectorService(_LocalVectorService):
+    """Sentence-embedding model exported to ONNX, run with ONNX Runtime on CPU.
+
+    Expects a transformer exported with ``input_ids`` / ``attention_mask``
+    inputs and a ``last_hidden_state`` first output (e.g. MiniLM), plus its
+    ``tokenizer.json``; embeddings are mean-pooled and L2-normalized.
+    Inference runs in a thread since ONNX Runtime releases the GIL. The
+    model's output width must equal the ``@<dimensions>`` of ``model``,
+    else ``dimensions``; this is checked once at load.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        model_path: str,
+        tokenizer_path: str,
+        dimensions: int = 1536,
+        batch_size: int = 32,
+        threads: int = 0
+    ):
+        super().__init__(model, batch_size)
+        self.dimensions = split_model_spec(model)[1] or dimensions
+        try:
+            import onnxruntime
+            from tokenizers import Tokenizer
+        except ImportError as e:
+            raise ImportError("The onnx embedding provider needs `pip install onnxruntime tokenizers`") from e
+        options = onnxruntime.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {input.name for input in self.session.get_inputs()}
+        self.tokenizer = Tokenizer.from_file(tokenizer_path)
+        self.tokenizer.enable_padding()
+        self.tokenizer.enable_truncation(max_length=512)
+        # A mismatch would otherwise only surface when vectors are inserted
+        width = self._run(["dimension check"]).shape[1]
+        if width != self.dimensions:
+            raise ValueError(
+                f"ONNX model {model_path} produces {width}-dimensional embeddings but {model} "
+                f"expects {self.dimensions}; set VECTOR_DIMENSION or the '@<dimensions>' suffix to match"
+            )
+
+    async def _encode(self, texts: List[str]) -> np.ndarray:
+        return await asyncio.to_thread(self._run, texts)
+
+    def _run(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([encoding.ids for encoding in encodings], dtype=np.int64)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        inputs = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            inputs["token_type_ids"] = np.zeros_like(input_ids)
+        hidden = self.session.run(None, inputs)[0]
+        mask = attention_mask[..., None].astype(np.float32)
+        pooled = (hidden * mask).sum(axis=1) / np.maximum(mask.sum(axis=1), 1e-9)
+        norms = np.linalg.norm(pooled, axis=1, keepdims=True)
+        return (pooled / np.where(norms == 0, 1.0, norms)).astype(np.float32)
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set, Tuple
+
+from domain.value_objects.embedding import Embedding
+from ports.services.vector_service import VectorService
+from .cached_vector_service import text_hash
+
+class QueryEmbeddingCache(VectorService):
+    """VectorService decorator for query-time embeddings.
+
+    Keeps a TTL-bounded LRU of recent query embeddings and coalesces
+    concurrent identical requests, single or batched, so N simultaneous
+    misses for the same text cost a single upstream call. That call runs
+    in its own task: cancelling one caller leaves the others waiting.
+    """
+
+    def __init__(self, inner: VectorService, max_size: int = 2048, ttl: float = 3600.0):
+        self.inner = inner
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: OrderedDict[Tuple[str, str], Tuple[float, Embedding]] = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @property
+    def model(self) -> str:
+        return self.inner.model
+
+    async def generate_embedding(self, text: str) -> Embedding:
+        key = (self.model, text_hash(text))
+        embedding = self._lookup(key)
+        if embedding is not None:
+            return embedding
+
+        future = self._inflight.get(key)
+        if future is None:
+            self.misses += 1
+            future = self._start({key: text})[key]
+        else:
+            self.coalesced += 1
+        # A cancelled caller must not cancel the result others are waiting on
+        return await asyncio.shield(future)
+
+    async def batch_generate_embeddings(self, texts: List[str]) -> List[Embedding]:
+        """Serve cached and in-flight texts; the rest, deduplicated, go upstream in one call"""
+        keys = [(self.model, text_hash(text)) for text in texts]
+        found: Dict[Tuple[str, str], Embedding] = {}
+        waiting: Dict[Tuple[str, str], asyncio.Future] = {}
+        missing: Dict[Tuple[str, str], str] = {}
+        for key, text in zip(keys, texts):
+            if key in found or key in waiting or key in missing:
+                continue
+            embedding = self._lookup(key)
+            if embedding is not None:
+                found[key] = embedding
+            elif key in self._inflight:
+                self.coalesced += 1
+                waiting[key] = self._inflight[key]
+            else:
+                missing[key] = text
+        if missing:
+            self.misses += len(missing)
+            waiting.update(self._start(missing))
+        for key, future in waiting.items():
+            found[key] = await asyncio.shield(future)
+        return [found[key] for key in keys]
+
+    def _start(self, texts: Dict[Tuple[str, str], str]) -> Dict[Tuple[str, str], asyncio.Future]:
+        """Begin one upstream call for ``texts``; returns a shared future per key"""
+        loop = asyncio.get_running_loop()
+        futures = {key: loop.create_future() for key in texts}
+        self._inflight.update(futures)
+        # The call belongs to no single caller, so it outlives any of them
+        task = asyncio.create_task(self._fetch(texts, futures))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return futures
+
+    async def _fetch(self, texts: Dict[Tuple[str, str], str], futures: Dict[Tuple[str, str], asyncio.Future]):
+        try:
+            if len(texts) == 1:
+                embeddings = [await self.inner.generate_embedding(next(iter(texts.values())))]
+            else:
+                embeddings = await self.inner.batch_generate_embeddings(list(texts.values()))
+        except asyncio.CancelledError:
+            for future in self._release(futures):
+                future.cancel()
+            raise
+        except Exception as e:
+            for future in self._release(futures):
+                future.set_exception(e)
+                # Mark retrieved so a failure with no waiters isn't logged as unhandled
+                future.exception()
+        else:
+            for key, embedding in zip(futures, embeddings):
+                self._store(key, embedding)
+            for future, embedding in zip(self._release(futures), embeddings):
+                future.set_result(embedding)
+
+    def _release(self, futures: Dict[Tuple[str, str], asyncio.Future]) -> List[asyncio.Future]:
+        for key in futures:
+            del self._inflight[key]
+        return list(futures.values())
+
+    async def compute_similarity(self, embedding1: Embedding, embedding2: Embedding) -> float:
+        return await self.inner.compute_similarity(embedding1, embedding2)
+
+    def _lookup(self, key: Tuple[str, str]) -> Optional[Embedding]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, embedding = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return embedding
+
+    def _store(self, key: Tuple[str, str], embedding: Embedding):
+        self._entries[key] = (time.monotonic() + self.ttl, embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+        }
@@ -0,0 +1,155 @@
+import logging
+import re
+from functools import lru_cache
+from typing import Iterator, List
+
+from langchain_text_splitters import RecursiveCharacterTextSplitter, TextSplitter
+
+from domain.value_objects.text_chunk import TextChunk
+from ports.services.text_chunker import TextChunker
+
+logger = logging.getLogger(__name__)
+
+MARKDOWN_SEPARATORS = [
+    "\n# ",
+    "\n## ",
+    "\n### ",
+    "\n#### ",
+    "\n- ",
+    "\n\n",
+    "\n",
+    ". ",
+    " ",
+    "",
+]
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+class TokenCounter:
+    """Counts tokens with tiktoken, or estimates ~4 chars/token if the encoding can't load.
+
+    Pickles by encoding name, so chunkers can be shipped to worker processes,
+    which then load the encoding once each.
+    """
+
+    def __init__(self, encoding_name: str):
+        self.encoding_name = encoding_name
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(encoding_name)
+        except Exception as e:
+            logger.warning(f"Falling back to estimated token counts ({encoding_name} unavailable: {e})")
+            self._encoding = None
+
+    def __call__(self, text: str) -> int:
+        if self._encoding is None:
+            return len(text) // 4 + 1
+        return len(self._encoding.encode(text, disallowed_special=()))
+
+    def __reduce__(self):
+        return get_token_counter, (self.encoding_name,)
+
+@lru_cache(maxsize=None)
+def get_token_counter(encoding_name: str = "cl100k_base") -> TokenCounter:
+    return TokenCounter(encoding_name)
+
+class SplitterChunker(TextChunker):
+    """Adapts a langchain splitter whose length function counts tokens"""
+
+    def __init__(self, splitter: TextSplitter, count_tokens: TokenCounter, offload_min_chars: int):
+        self.splitter = splitter
+        self.count_tokens = count_tokens
+        self.offload_min_chars = offload_min_chars
+
+    def split(self, text: str) -> List[TextChunk]:
+        return [
+            TextChunk(text=piece, token_count=self.count_tokens(piece), char_count=len(piece))
+            for piece in self.splitter.split_text(text)
+        ]
+
+class SentenceChunker(TextChunker):
+    """Packs whole sentences into chunks of at most ``chunk_size`` tokens.
+
+    A sentence that alone exceeds the budget (a table row, minified text)
+    is cut into token-sized pieces, which are then packed like sentences.
+    """
+
+    def __init__(self, chunk_size: int, chunk_overlap: int, count_tokens: TokenCounter, offload_min_chars: int):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.count_tokens = count_tokens
+        self.offload_min_chars = offload_min_chars
+        self._oversize_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=0,
+            separators=[" ", ""],
+            length_function=count_tokens
+        )
+
+    def split(self, text: str) -> List[TextChunk]:
+        chunks: List[TextChunk] = []
+        current: List[tuple[str, int]] = []
+        current_tokens = 0
+        for sentence, tokens in self._sentences(text):
+            if current and current_tokens + tokens > self.chunk_size:
+                chunks.append(self._chunk(current))
+                # Carry trailing sentences forward as overlap
+                carried, carried_tokens = [], 0
+                for item in reversed(current):
+                    if carried_tokens + item[1] > self.chunk_overlap:
+                        break
+                    carried.insert(0, item)
+                    carried_tokens += item[1]
+                current, current_tokens = carried, carried_tokens
+            current.append((sentence, tokens))
+            current_tokens += tokens
+        if current:
+            chunks.append(self._chunk(current))
+        return chunks
+
+    def _sentences(self, text: str) -> Iterator[tuple[str, int]]:
+        for sentence in filter(None, (s.strip() for s in _SENTENCE_END.split(text))):
+            tokens = self.count_tokens(sentence)
+            if tokens <= self.chunk_size:
+                yield sentence, tokens
+                continue
+            for piece in self._oversize_splitter.split_text(sentence):
+                yield piece, self.count_tokens(piece)
+
+    def _chunk(self, sentences: List[tuple[str, int]]) -> TextChunk:
+        text = " ".join(sentence for sentence, _ in sentences)
+        return TextChunk(text=text, token_count=self.count_tokens(text), char_count=len(text))
+
+@lru_cache(maxsize=32)
+def get_chunker(
+    strategy: str = "markdown",
+    chunk_size: int = 150,
+    chunk_overlap: int = 15,
+    encoding_name: str = "cl100k_base",
+    offload_min_chars: int = 20_000
+) -> TextChunker:
+    """Build (once per configuration) a chunker for ``strategy``.
+
+    Sizes are in tokens for every strategy.
+    """
+    count_tokens = get_token_counter(encoding_name)
+    if strategy == "markdown":
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=MARKDOWN_SEPARATORS,
+            length_function=count_tokens
+        )
+        return SplitterChunker(splitter, count_tokens, offload_min_chars)
+    if strategy == "token":
+        # Ignores document structure: pieces are cut on whitespace by token length
+        splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap,
+            separators=[" ", ""],
+            length_function=count_tokens
+        )
+        return SplitterChunker(splitter, count_tokens, offload_min_chars)
+    if strategy == "sentence":
+        return SentenceChunker(chunk_size, chunk_overlap, count_tokens, offload_min_chars)
+    raise ValueError(f"Unknown chunking strategy: {strategy}")
@@ -1,35 +1,109 @@
-from typing import List
+import asyncio
+import logging
+import random
+from typing import Any, Callable, Dict, List
+import httpx
 import numpy as np
-from openai import AsyncOpenAI
-from domain.value_objects.embedding import Embedding
+from openai import AsyncOpenAI, RateLimitError
+from adapters.rate_limiter import RateLimiter, retry_after_seconds
+from domain.value_objects.embedding import Embedding, split_model_spec
 from ports.services.vector_service import VectorService
 
+logger = logging.getLogger(__name__)
+
+# Output size of each model when no reduced dimension is requested
+NATIVE_DIMENSIONS = {
+    "text-embedding-ada-002": 1536,
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+}
+
+def embedding_dimensions(spec: str) -> int:
+    name, dimensions = split_model_spec(spec)
+    if dimensions is None and name not in NATIVE_DIMENSIONS:
+        raise ValueError(f"Unknown embedding model {name}; give its size as '{name}@<dimensions>'")
+    return dimensions or NATIVE_DIMENSIONS[name]
+
+def is_quota_exhausted(error: RateLimitError) -> bool:
+    return error.code == "insufficient_quota" or getattr(error, "type", None) == "insufficient_quota"
+
 class OpenAIVectorService(VectorService):
-    def __init__(self, api_key: str):
-        self.client = AsyncOpenAI(api_key=api_key)
-        self.model = "text-embedding-ada-002"
-    
-    async def generate_embedding(self, text: str) -> Embedding:
-        response = await self.client.embeddings.create(
-            input=text,
-            model=self.model
+    """Embeds with one OpenAI model; ``model`` may request reduced
+    dimensions as ``"text-embedding-3-small@512"``.
+
+    With a ``rate_limiter`` every call first reserves its request and
+    token budget, feeds the response's rate-limit headers back, and 429s
+    are retried here (honoring Retry-After) rather than failing the batch.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        http_client: httpx.AsyncClient | None = None,
+        model: str = "text-embedding-ada-002",
+        rate_limiter: RateLimiter | None = None,
+        count_tokens: Callable[[str], int] = lambda text: len(text) // 4 + 1,
+        throttle_retries: int = 8
+    ):
+        # Retries are handled by the shared transport when a client is injected
+        self.client = AsyncOpenAI(
+            api_key=api_key,
+            http_client=http_client,
+            max_retries=0 if http_client is not None else 2
         )
-        vector = np.array(response.data[0].embedding)
+        self.model = model
+        self._api_model, self._dimensions = split_model_spec(model)
+        self.rate_limiter = rate_limiter
+        self.count_tokens = count_tokens
+        self.throttle_retries = throttle_retries
+
+    def _request(self, input: str | List[str]) -> Dict[str, Any]:
+        request: Dict[str, Any] = {"input": input, "model": self._api_model}
+        if self._dimensions:
+            request["dimensions"] = self._dimensions
+        return request
+
+    async def _create(self, input: str | List[str]):
+        if self.rate_limiter is None:
+            return await self.client.embeddings.create(**self._request(input))
+        tokens = sum(self.count_tokens(text) for text in ([input] if isinstance(input, str) else input))
+        for attempt in range(self.throttle_retries + 1):
+            async with self.rate_limiter.acquire(tokens) as permit:
+                try:
+                    raw = await self.client.embeddings.with_raw_response.create(**self._request(input))
+                except RateLimitError as e:
+                    self.rate_limiter.observe(e.response.headers)
+                    if is_quota_exhausted(e):
+                        # Also a 429, but waiting won't bring credit back
+                        raise
+                    retry_after = retry_after_seconds(e.response.headers)
+                    permit.mark_throttled(retry_after)
+                    if attempt == self.throttle_retries:
+                        raise
+                else:
+                    self.rate_limiter.observe(raw.headers)
+                    return raw.parse()
+            # Without a Retry-After, back off exponentially with full jitter
+            delay = retry_after if retry_after is not None else random.uniform(0, min(60.0, 2 ** attempt))
+            logger.warning(f"Embedding call throttled, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+    async def generate_embedding(self, text: str) -> Embedding:
+        response = await self._create(text)
+        vector = np.array(response.data[0].embedding, dtype=np.float32)
         return Embedding(vector=vector, model=self.model)
     
     async def batch_generate_embeddings(self, texts: List[str]) -> List[Embedding]:
-        response = await self.client.embeddings.create(
-            input=texts,
-            model=self.model
-        )
+        response = await self._create(texts)
+        # The API may return items out of order; index restores input order
+        ordered = sorted(response.data, key=lambda data: data.index)
         return [
             Embedding(
-                vector=np.array(data['embedding']),
+                vector=np.array(data.embedding, dtype=np.float32),
                 model=self.model
             )
-            for data in response['data']
+            for data in ordered
         ]
     
     async def compute_similarity(self, embedding1: Embedding, embedding2: Embedding) -> float:
-        return float(np.dot(embedding1.vector, embedding2.vector) / 
-                    (np.linalg.norm(embedding1.vector) * np.linalg.norm(embedding2.vector)))
\ No newline at end of file
+        return embedding1.cosine_similarity(embedding2)
\ No newline at end of file
@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -14,13 +14,129 @@ class Settings(BaseSettings):
     
     # Database settings
     DATABASE_URL: str
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Rows per multi-row upsert; asyncpg caps a statement at 32767 parameters
+    DB_UPSERT_BATCH_SIZE: int = 1000
+
+    # List endpoints: page sizes, and rows fetched per round trip when streaming
+    PAGE_SIZE_DEFAULT: int = 100
+    PAGE_SIZE_MAX: int = 1000
+    STREAM_BATCH_SIZE: int = 500
     
     # Vector settings
     OPENAI_API_KEY: str
     DIFY_API_KEY: str
+    # Primary model, stored in chunks.embedding; VECTOR_DIMENSION must match
+    # its size. "name@dims" requests reduced dimensions (text-embedding-3)
+    EMBEDDING_MODEL: str = "text-embedding-ada-002"
     VECTOR_DIMENSION: int = 1536
+    # Further models embedded alongside into chunk_embeddings, e.g.
+    # ["text-embedding-3-small@256"]; searches pick one by label
+    EMBEDDING_EXTRA_MODELS: List[str] = []
+    # Provider of EMBEDDING_MODEL: "openai", "hashing" or "onnx" (local CPU);
+    # EMBEDDING_PROVIDERS overrides it per model label, e.g. for extra models
+    EMBEDDING_PROVIDER: str = "openai"
+    EMBEDDING_PROVIDERS: Dict[str, str] = {}
+    LOCAL_EMBEDDING_BATCH_SIZE: int = 32
+    ONNX_MODEL_PATH: str | None = None
+    ONNX_TOKENIZER_PATH: str | None = None
+    ONNX_THREADS: int = 0
     BATCH_SIZE: int = 100
 
+    # Chunk store backend ("postgres" or "memory")
+    CHUNK_STORE: str = "postgres"
+    IN_MEMORY_INDEX_PATH: str | None = None
+
+    # ANN index settings ("hnsw", "ivfflat" or "none")
+    VECTOR_INDEX_TYPE: str = "hnsw"
+    VECTOR_INDEX_AUTO_CREATE: bool = True
+    HNSW_M: int = 16
+    HNSW_EF_CONSTRUCTION: int = 64
+    HNSW_EF_SEARCH: int = 40
+    IVFFLAT_LISTS: int = 100
+    IVFFLAT_PROBES: int = 10
+    # "halfvec" or "binary" searches a compact index, then rescores exactly
+    VECTOR_QUANTIZATION: str = "none"
+    VECTOR_RESCORE_FACTOR: int = 4
+    # Filtered searches matching at most this many chunks scan them exactly;
+    # broader ones walk the ANN index with iterative scans ("relaxed_order",
+    # "strict_order", or "off" before pgvector 0.8)
+    VECTOR_PREFILTER_MAX_ROWS: int = 20_000
+    VECTOR_ITERATIVE_SCAN: str = "relaxed_order"
+
+    # Search settings; batch requests take at most SEARCH_BATCH_MAX_QUERIES
+    SEARCH_BATCH_MAX_QUERIES: int = 32
+    # Results per query; hybrid search fetches HYBRID_CANDIDATE_FACTOR x this
+    SEARCH_LIMIT_MAX: int = 100
+    # Hybrid search: candidates per side (x limit) and the RRF constant
+    HYBRID_CANDIDATE_FACTOR: int = 3
+    HYBRID_RRF_K: int = 60
+
+    # Embedding batch settings
+    EMBEDDING_BATCH_MAX_TOKENS: int = 100_000
+    # Concurrent single-text embeddings are merged into one batch call
+    EMBEDDING_MICROBATCH_ENABLED: bool = True
+    EMBEDDING_MICROBATCH_WAIT: float = 0.005
+    EMBEDDING_MICROBATCH_MAX_SIZE: int = 64
+    EMBEDDING_MICROBATCH_MAX_TOKENS: int = 8_000
+
+    # Embedding cache settings (document chunks, then search queries)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_SIZE: int = 10_000
+    EMBEDDING_CACHE_PERSISTENT: bool = True
+    QUERY_CACHE_SIZE: int = 2048
+    QUERY_CACHE_TTL: float = 3600.0
+
+    # Ingestion pipeline settings
+    PIPELINE_QUEUE_SIZE: int = 8
+    INGESTION_CONCURRENCY: int = 4
+
+    # Outbound HTTP settings
+    HTTP_MAX_CONNECTIONS: int = 100
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP2_ENABLED: bool = False
+    HTTP_RETRY_ATTEMPTS: int = 3
+    HTTP_RETRY_BACKOFF: float = 0.5
+    DIFY_TIMEOUT: float = 120.0
+    OPENAI_TIMEOUT: float = 60.0
+
+    # Client-side embedding rate limits, per model (0 disables a bucket);
+    # concurrency adapts (AIMD) between the min and max
+    EMBEDDING_RATE_LIMIT_ENABLED: bool = True
+    OPENAI_RPM_LIMIT: int = 3_000
+    OPENAI_TPM_LIMIT: int = 1_000_000
+    EMBEDDING_CONCURRENCY_INITIAL: int = 4
+    EMBEDDING_CONCURRENCY_MIN: int = 1
+    EMBEDDING_CONCURRENCY_MAX: int = 32
+    EMBEDDING_THROTTLE_RETRIES: int = 8
+
+    # Chunking settings (sizes are in tokens)
+    CHUNKING_STRATEGY: str = "markdown"  # "markdown", "token" or "sentence"
+    CHUNK_SIZE_TOKENS: int = 150
+    CHUNK_OVERLAP_TOKENS: int = 15
+    TOKENIZER_ENCODING: str = "cl100k_base"
+
+    # Process pool for CPU-bound ingestion work (0 workers disables it)
+    CPU_WORKERS: int = 2
+    CPU_MAX_PENDING: int = 8
+    # Texts at least this long are split, hashed and parsed off the event
+    # loop: splitting in the process pool, hashing and JSON in a thread
+    CPU_OFFLOAD_MIN_CHARS: int = 20_000
+
+    # Ingestion job settings
+    JOB_WORKERS_ENABLED: bool = True
+    JOB_WORKERS: int = 2
+    JOB_POLL_INTERVAL: float = 2.0
+    # Running jobs heartbeat this often; one silent for JOB_STALE_AFTER
+    # is taken as abandoned and requeued
+    JOB_HEARTBEAT_INTERVAL: float = 60.0
+    JOB_STALE_AFTER: float = 600.0
+
     # CORS settings
     ALLOWED_ORIGINS: List = ["*"]
 
@@ -1,23 +1,316 @@
-from typing import AsyncGenerator, Dict
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncGenerator, AsyncIterator, Dict, List
+import httpx
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.config import settings
+from adapters.dify_adapter import DifyAdapter
+from adapters.job_worker import JobWorkerPool, ProgressCallback
+from adapters.http_client import IDEMPOTENT_METHODS, RETRYABLE_STATUS_CODES, create_http_client
+from adapters.rate_limiter import RateLimiter
+from adapters.cpu_pool import CpuPool
 from adapters.repositories.sqlalchemy.base import Database
-from adapters.services.vector_service import OpenAIVectorService
+from adapters.repositories.sqlalchemy.vector_index import VectorIndexManager
+from adapters.services.vector_service import OpenAIVectorService, embedding_dimensions
+from adapters.services.local_vector_service import HashingVectorService, OnnxVectorService
+from adapters.services.cached_vector_service import CachedVectorService
+from adapters.services.query_embedding_cache import QueryEmbeddingCache
+from adapters.services.batching_vector_service import MicroBatchingVectorService
+from adapters.services.text_chunkers import get_token_counter
+from adapters.repositories.sqlalchemy.embedding_cache_repository import SQLAlchemyEmbeddingCacheRepository
+from ports.services.vector_service import VectorService
 from ports.repositories.source_repository import SourceRepository
 from ports.repositories.content_repository import ContentRepository
 from ports.repositories.chunk_repository import ChunkRepository
 from adapters.repositories.sqlalchemy.source_repository import SQLAlchemySourceRepository
 from adapters.repositories.sqlalchemy.content_repository import SQLAlchemyContentRepository
 from adapters.repositories.sqlalchemy.chunk_repository import SQLAlchemyChunkRepository
+from adapters.repositories.in_memory.repositories import InMemoryChunkRepository
+from adapters.repositories.sqlalchemy.job_repository import SQLAlchemyJobRepository
+from domain.entities.job import IngestionJob
+from usecases.source_usecases import SourceUseCases
+from usecases.content_usecases import ContentUseCases
+from usecases.chunk_usecases import ChunkEmbedder, ChunkUseCases
+from usecases.dify_usecases import DifyUsecases, IngestionUnit
+from usecases.job_usecases import IngestionJobUseCases
+
+_database: Database | None = None
+
+def init_database() -> Database:
+    """Create the process-wide engine; called once from app startup"""
+    global _database
+    if _database is None:
+        _database = Database(
+            settings.DATABASE_URL,
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+            pool_recycle=settings.DB_POOL_RECYCLE,
+            pool_pre_ping=settings.DB_POOL_PRE_PING
+        )
+    return _database
+
+def get_database() -> Database:
+    return init_database()
+
+async def close_database():
+    global _database
+    if _database is not None:
+        await _database.dispose()
+        _database = None
+
+def get_vector_index_manager(model: str | None = None) -> VectorIndexManager:
+    """Index manager for the primary model, or for one extra model's partial index"""
+    if model is None or model == settings.EMBEDDING_MODEL:
+        return VectorIndexManager(
+            get_database().engine,
+            quantization=settings.VECTOR_QUANTIZATION,
+            dimensions=settings.VECTOR_DIMENSION
+        )
+    if model not in settings.EMBEDDING_EXTRA_MODELS:
+        raise ValueError(f"Unknown embedding model: {model}")
+    return VectorIndexManager(
+        get_database().engine,
+        table="chunk_embeddings",
+        dimensions=embedding_dimensions(model),
+        model=model
+    )
+
+def get_vector_index_managers() -> List[VectorIndexManager]:
+    return [get_vector_index_manager()] + [
+        get_vector_index_manager(model) for model in settings.EMBEDDING_EXTRA_MODELS
+    ]
+
+def vector_index_params(index_type: str) -> Dict[str, int]:
+    if index_type == "hnsw":
+        return {"m": settings.HNSW_M, "ef_construction": settings.HNSW_EF_CONSTRUCTION}
+    if index_type == "ivfflat":
+        return {"lists": settings.IVFFLAT_LISTS}
+    raise ValueError(f"Unknown vector index type: {index_type}")
 
 async def get_session() -> AsyncGenerator[AsyncSession, None]:
-    async with Database(settings.DATABASE_URL).SessionLocal() as session:
+    async with get_database().session() as session:
         yield session
 
-async def get_vector_service() -> OpenAIVectorService:
-    return OpenAIVectorService(settings.OPENAI_API_KEY)
+_cpu_pool: CpuPool | None = None
+
+def init_cpu_pool() -> CpuPool | None:
+    """Start the worker processes for CPU-bound ingestion steps, if enabled"""
+    global _cpu_pool
+    if _cpu_pool is None and settings.CPU_WORKERS > 0:
+        _cpu_pool = CpuPool(settings.CPU_WORKERS, max_pending=settings.CPU_MAX_PENDING)
+    return _cpu_pool
+
+def close_cpu_pool():
+    global _cpu_pool
+    if _cpu_pool is not None:
+        _cpu_pool.shutdown()
+        _cpu_pool = None
+
+def get_cpu_pool_stats() -> Dict[str, int] | None:
+    return _cpu_pool.stats() if _cpu_pool is not None else None
+
+_http_clients: Dict[str, httpx.AsyncClient] = {}
+
+def _http_client(
+    name: str,
+    timeout: float,
+    retry_throttled: bool = True,
+    retry_post: bool = False
+) -> httpx.AsyncClient:
+    if name not in _http_clients:
+        _http_clients[name] = create_http_client(
+            timeout=timeout,
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY,
+            http2=settings.HTTP2_ENABLED,
+            retry_attempts=settings.HTTP_RETRY_ATTEMPTS,
+            retry_backoff=settings.HTTP_RETRY_BACKOFF,
+            retry_statuses=RETRYABLE_STATUS_CODES if retry_throttled else RETRYABLE_STATUS_CODES - {429},
+            retry_methods=IDEMPOTENT_METHODS | {"POST"} if retry_post else IDEMPOTENT_METHODS
+        )
+    return _http_clients[name]
+
+_vector_service: VectorService | None = None
+_embedding_cache: CachedVectorService | None = None
+_embedding_batchers: Dict[str, MicroBatchingVectorService] = {}
+_rate_limiters: Dict[str, RateLimiter] = {}
+_query_vector_service: QueryEmbeddingCache | None = None
+_extra_vector_services: Dict[str, VectorService] = {}
+_extra_query_vector_services: Dict[str, VectorService] = {}
+_dify_adapter: DifyAdapter | None = None
+
+def _embedding_provider(model: str) -> str:
+    if model in settings.EMBEDDING_PROVIDERS:
+        return settings.EMBEDDING_PROVIDERS[model]
+    return settings.EMBEDDING_PROVIDER if model == settings.EMBEDDING_MODEL else "openai"
+
+def _build_vector_service(model: str) -> VectorService:
+    service = _build_provider(model)
+    if settings.EMBEDDING_MICROBATCH_ENABLED:
+        service = _embedding_batchers[model] = MicroBatchingVectorService(
+            service,
+            max_wait=settings.EMBEDDING_MICROBATCH_WAIT,
+            max_batch_size=settings.EMBEDDING_MICROBATCH_MAX_SIZE,
+            max_batch_tokens=settings.EMBEDDING_MICROBATCH_MAX_TOKENS,
+            count_tokens=get_token_counter(settings.TOKENIZER_ENCODING)
+        )
+    return service
+
+def _build_provider(model: str) -> VectorService:
+    global _embedding_cache
+    provider = _embedding_provider(model)
+    # Local models are cheap to rerun, so only remote embeddings are cached
+    if provider == "hashing":
+        return HashingVectorService(
+            model,
+            dimensions=settings.VECTOR_DIMENSION,
+            batch_size=settings.LOCAL_EMBEDDING_BATCH_SIZE,
+            cpu_pool=init_cpu_pool()
+        )
+    if provider == "onnx":
+        return OnnxVectorService(
+            model,
+            settings.ONNX_MODEL_PATH,
+            settings.ONNX_TOKENIZER_PATH,
+            dimensions=settings.VECTOR_DIMENSION,
+            batch_size=settings.LOCAL_EMBEDDING_BATCH_SIZE,
+            threads=settings.ONNX_THREADS
+        )
+    if provider != "openai":
+        raise ValueError(f"Unknown embedding provider: {provider}")
+    rate_limiter = None
+    if settings.EMBEDDING_RATE_LIMIT_ENABLED:
+        # OpenAI quotas apply per model
+        rate_limiter = _rate_limiters[model] = RateLimiter(
+            requests_per_minute=settings.OPENAI_RPM_LIMIT,
+            tokens_per_minute=settings.OPENAI_TPM_LIMIT,
+            initial_concurrency=settings.EMBEDDING_CONCURRENCY_INITIAL,
+            min_concurrency=settings.EMBEDDING_CONCURRENCY_MIN,
+            max_concurrency=settings.EMBEDDING_CONCURRENCY_MAX
+        )
+    service: VectorService = OpenAIVectorService(
+        settings.OPENAI_API_KEY,
+        # 429s are left to the rate limiter, which needs to see them
+        http_client=_http_client(
+            "openai", settings.OPENAI_TIMEOUT,
+            retry_throttled=not settings.EMBEDDING_RATE_LIMIT_ENABLED,
+            # Embedding a text twice has no side effects
+            retry_post=True
+        ),
+        model=model,
+        rate_limiter=rate_limiter,
+        count_tokens=get_token_counter(settings.TOKENIZER_ENCODING),
+        throttle_retries=settings.EMBEDDING_THROTTLE_RETRIES
+    )
+    if settings.EMBEDDING_CACHE_ENABLED:
+        store = None
+        if settings.EMBEDDING_CACHE_PERSISTENT:
+            store = SQLAlchemyEmbeddingCacheRepository(get_database().SessionLocal)
+        service = CachedVectorService(
+            service, store=store, max_size=settings.EMBEDDING_CACHE_SIZE
+        )
+        if model == settings.EMBEDDING_MODEL:
+            _embedding_cache = service
+    return service
+
+def _build_query_vector_service(service: VectorService) -> QueryEmbeddingCache:
+    return QueryEmbeddingCache(
+        service,
+        max_size=settings.QUERY_CACHE_SIZE,
+        ttl=settings.QUERY_CACHE_TTL
+    )
+
+def init_http_clients():
+    """Create the shared outbound clients; called once from app startup"""
+    global _vector_service, _embedding_cache, _query_vector_service, _dify_adapter
+    if _vector_service is None:
+        _vector_service = _build_vector_service(settings.EMBEDDING_MODEL)
+        _query_vector_service = _build_query_vector_service(_vector_service)
+        for model in settings.EMBEDDING_EXTRA_MODELS:
+            _extra_vector_services[model] = _build_vector_service(model)
+            _extra_query_vector_services[model] = _build_query_vector_service(_extra_vector_services[model])
+    if _dify_adapter is None:
+        # Never retry_post: a resent /workflows/run would run the workflow twice
+        _dify_adapter = DifyAdapter(client=_http_client("dify", settings.DIFY_TIMEOUT))
+
+async def close_http_clients():
+    global _vector_service, _embedding_cache, _query_vector_service, _dify_adapter
+    for batcher in _embedding_batchers.values():
+        await batcher.aclose()
+    _embedding_batchers.clear()
+    _rate_limiters.clear()
+    for client in _http_clients.values():
+        await client.aclose()
+    _http_clients.clear()
+    _vector_service = None
+    _embedding_cache = None
+    _query_vector_service = None
+    _extra_vector_services.clear()
+    _extra_query_vector_services.clear()
+    _dify_adapter = None
+
+def get_embedding_cache_stats() -> Dict[str, float] | None:
+    return _embedding_cache.stats() if _embedding_cache is not None else None
+
+def get_embedding_batching_stats() -> Dict[str, Dict[str, float]]:
+    return {model: batcher.stats() for model, batcher in _embedding_batchers.items()}
+
+def get_rate_limit_stats() -> Dict[str, Dict[str, float]]:
+    return {model: limiter.stats() for model, limiter in _rate_limiters.items()}
+
+async def get_vector_service() -> VectorService:
+    init_http_clients()
+    return _vector_service
+
+def get_query_cache_stats() -> Dict[str, float] | None:
+    return _query_vector_service.stats() if _query_vector_service is not None else None
+
+async def get_query_vector_service() -> VectorService:
+    init_http_clients()
+    return _query_vector_service
+
+async def get_extra_vector_services() -> Dict[str, VectorService]:
+    init_http_clients()
+    return _extra_vector_services
+
+async def get_extra_query_vector_services() -> Dict[str, VectorService]:
+    init_http_clients()
+    return _extra_query_vector_services
+
+async def get_dify_adapter() -> DifyAdapter:
+    init_http_clients()
+    return _dify_adapter
+
+_in_memory_chunks: InMemoryChunkRepository | None = None
+
+def init_chunk_store():
+    """Load the in-process vector store when CHUNK_STORE is 'memory'"""
+    global _in_memory_chunks
+    if settings.CHUNK_STORE != "memory" or _in_memory_chunks is not None:
+        return
+    path = settings.IN_MEMORY_INDEX_PATH
+    if path and os.path.exists(f"{path}.json"):
+        _in_memory_chunks = InMemoryChunkRepository.load(path)
+    else:
+        _in_memory_chunks = InMemoryChunkRepository(dimension=settings.VECTOR_DIMENSION)
+
+def close_chunk_store():
+    global _in_memory_chunks
+    if _in_memory_chunks is not None and settings.IN_MEMORY_INDEX_PATH:
+        _in_memory_chunks.persist(settings.IN_MEMORY_INDEX_PATH)
+    _in_memory_chunks = None
+
+async def get_chunk_repository(
+    session: AsyncSession = Depends(get_session)
+) -> ChunkRepository:
+    if settings.CHUNK_STORE == "memory":
+        init_chunk_store()
+        return _in_memory_chunks
+    return SQLAlchemyChunkRepository(session)
 
 async def get_repositories(
     session: AsyncSession = Depends(get_session)
@@ -25,5 +318,72 @@ async def get_repositories(
     return {
         'source_repository': SQLAlchemySourceRepository(session),
         'content_repository': SQLAlchemyContentRepository(session),
-        'chunk_repository': SQLAlchemyChunkRepository(session)
-    }
\ No newline at end of file
+        'chunk_repository': await get_chunk_repository(session)
+    }
+
+@asynccontextmanager
+async def ingestion_unit_of_work() -> AsyncIterator[IngestionUnit]:
+    """Use cases on a fresh session, one per concurrently ingested document"""
+    async with get_database().session() as session:
+        yield IngestionUnit(
+            SourceUseCases(SQLAlchemySourceRepository(session)),
+            ContentUseCases(SQLAlchemyContentRepository(session)),
+            ChunkUseCases(
+                await get_chunk_repository(session),
+                _vector_service,
+                extra_vector_services=_extra_vector_services
+            )
+        )
+
+async def run_ingestion_job(job: IngestionJob, report_progress: ProgressCallback) -> str | None:
+    """Run one Dify ingestion job; returns a summary of failed documents, if any"""
+    init_http_clients()
+    # No session for the job itself: the Dify call and embedding can take
+    # minutes, and each database write opens a short unit instead
+    dify_usecases = DifyUsecases(
+        _dify_adapter,
+        ChunkEmbedder(_vector_service, _extra_vector_services),
+        unit_of_work=ingestion_unit_of_work,
+        cpu_pool=init_cpu_pool()
+    )
+    if job.response_mode == "streaming":
+        results = await dify_usecases.process_dify_workflow_streaming(job.inputs, job.user, on_progress=report_progress)
+    else:
+        results = await dify_usecases.process_dify_workflow(job.inputs, job.user, on_progress=report_progress)
+
+    failed = [result for result in results if result["status"] == "failed"]
+    if failed and len(failed) == len(results):
+        raise RuntimeError(f"All {len(failed)} documents failed; first error: {failed[0]['error']}")
+    if failed:
+        return "; ".join(f"{result['url']}: {result['error']}" for result in failed)
+    return None
+
+_job_pool: JobWorkerPool | None = None
+
+async def init_job_workers() -> JobWorkerPool:
+    global _job_pool
+    if _job_pool is None:
+        _job_pool = JobWorkerPool(
+            get_database().SessionLocal,
+            run_ingestion_job,
+            concurrency=settings.JOB_WORKERS,
+            poll_interval=settings.JOB_POLL_INTERVAL,
+            heartbeat_interval=settings.JOB_HEARTBEAT_INTERVAL,
+            stale_after=settings.JOB_STALE_AFTER
+        )
+        await _job_pool.start()
+    return _job_pool
+
+async def close_job_workers():
+    global _job_pool
+    if _job_pool is not None:
+        await _job_pool.stop()
+        _job_pool = None
+
+async def get_job_usecases(
+    session: AsyncSession = Depends(get_session)
+) -> IngestionJobUseCases:
+    return IngestionJobUseCases(
+        SQLAlchemyJobRepository(session),
+        notify=_job_pool.notify if _job_pool is not None else None
+    )
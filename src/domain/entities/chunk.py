@@ -1,6 +1,8 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Dict
 from uuid import UUID, uuid4
+import numpy as np
 from ..value_objects.embedding import Embedding
 
 @dataclass
@@ -12,5 +14,8 @@ class Chunk:
     token_count: int | None = None
     char_count: int | None = None
     embedding_model: str | None = None
-    id: UUID = uuid4()
-    created_at: datetime = datetime.now()
\ No newline at end of file
+    text_hash: str | None = None
+    # Vectors from additional embedding models, keyed by model label
+    extra_embeddings: Dict[str, np.ndarray] = field(default_factory=dict)
+    id: UUID = field(default_factory=uuid4)
+    created_at: datetime = field(default_factory=datetime.now)
\ No newline at end of file
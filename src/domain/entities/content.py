@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from uuid import UUID, uuid4
 
@@ -9,5 +9,6 @@ class Content:
     source_id: UUID
     raw_content: str | None = None
     status: str = "pending"
-    id: UUID = uuid4()
-    created_at: datetime = datetime.now()
\ No newline at end of file
+    content_hash: str | None = None
+    id: UUID = field(default_factory=uuid4)
+    created_at: datetime = field(default_factory=datetime.now)
\ No newline at end of file
@@ -0,0 +1,18 @@
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict
+from uuid import UUID, uuid4
+
+@dataclass
+class IngestionJob:
+    user: str
+    inputs: Dict[str, Any]
+    response_mode: str = "blocking"
+    status: str = "queued"
+    documents_processed: int = 0
+    chunks_processed: int = 0
+    error: str | None = None
+    id: UUID = field(default_factory=uuid4)
+    created_at: datetime = field(default_factory=datetime.now)
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from uuid import UUID, uuid4
 
@@ -6,6 +6,6 @@ from uuid import UUID, uuid4
 class Source:
     domain: str
     is_active: bool = True
-    id: UUID = uuid4()
+    id: UUID = field(default_factory=uuid4)
     last_crawled: datetime | None = None
-    created_at: datetime = datetime.now()
\ No newline at end of file
+    created_at: datetime = field(default_factory=datetime.now)
\ No newline at end of file
@@ -1,6 +1,16 @@
 from dataclasses import dataclass
+from typing import Optional, Tuple
 import numpy as np
 
+def split_model_spec(spec: str) -> Tuple[str, Optional[int]]:
+    """Split ``"name@dimensions"`` into the API model name and reduced dimensions.
+
+    The full spec is the model label stored with every vector, so one model
+    at two dimensions never mixes.
+    """
+    name, _, dimensions = spec.partition("@")
+    return name, int(dimensions) if dimensions else None
+
 @dataclass(frozen=True)
 class Embedding:
     vector: np.ndarray
@@ -11,4 +21,8 @@ class Embedding:
             object.__setattr__(self, 'vector', np.array(self.vector))
             
     def to_list(self) -> list:
-        return self.vector.tolist()
\ No newline at end of file
+        return self.vector.tolist()
+
+    def cosine_similarity(self, other: "Embedding") -> float:
+        return float(np.dot(self.vector, other.vector) /
+                    (np.linalg.norm(self.vector) * np.linalg.norm(other.vector)))
@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+from typing import Tuple
+from uuid import UUID
+
+@dataclass(frozen=True)
+class SearchFilter:
+    """Restricts a similarity search; empty fields match everything.
+
+    ``embedding_model`` matches the model a chunk's stored vector came
+    from, e.g. to skip rows not yet re-embedded after a model change.
+    """
+    source_ids: Tuple[UUID, ...] = ()
+    domains: Tuple[str, ...] = ()
+    statuses: Tuple[str, ...] = ()
+    embedding_model: str | None = None
+
+    @property
+    def by_content(self) -> bool:
+        return bool(self.source_ids or self.domains or self.statuses)
+
+    def __bool__(self) -> bool:
+        return self.by_content or self.embedding_model is not None
@@ -0,0 +1,14 @@
+import hashlib
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class TextChunk:
+    text: str
+    token_count: int
+    char_count: int
+    text_hash: str = ""
+
+    def __post_init__(self):
+        # Hashed where the chunk is produced, which may be a worker process
+        if not self.text_hash:
+            object.__setattr__(self, 'text_hash', hashlib.sha256(self.text.encode('utf-8')).hexdigest())
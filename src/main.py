@@ -8,7 +8,15 @@ import uvicorn
 
 from core.config import settings
 from ports.http.v1.router import router as api_v1_router
-from adapters.repositories.sqlalchemy.base import Database
+from core.dependencies import (
+    init_database, get_database, close_database,
+    init_http_clients, close_http_clients, get_embedding_cache_stats, get_query_cache_stats,
+    get_embedding_batching_stats, get_rate_limit_stats,
+    get_vector_index_managers, vector_index_params,
+    init_chunk_store, close_chunk_store,
+    init_cpu_pool, close_cpu_pool, get_cpu_pool_stats,
+    init_job_workers, close_job_workers
+)
 
 # Configure logging
 logging.basicConfig(
@@ -17,9 +25,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize database
-database = Database(settings.DATABASE_URL)
-
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
@@ -87,8 +92,19 @@ app.include_router(
 async def startup():
     try:
         logger.info("Initializing database...")
-        await database.create_all()
+        await init_database().create_all()
+        if settings.VECTOR_INDEX_AUTO_CREATE and settings.VECTOR_INDEX_TYPE != "none":
+            for manager in get_vector_index_managers():
+                await manager.build(
+                    settings.VECTOR_INDEX_TYPE,
+                    vector_index_params(settings.VECTOR_INDEX_TYPE)
+                )
         logger.info("Database initialized successfully")
+        init_http_clients()
+        init_chunk_store()
+        init_cpu_pool()
+        if settings.JOB_WORKERS_ENABLED:
+            await init_job_workers()
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
         raise
@@ -97,6 +113,11 @@ async def startup():
 @app.on_event("shutdown")
 async def shutdown():
     logger.info("Shutting down application...")
+    await close_job_workers()
+    close_cpu_pool()
+    close_chunk_store()
+    await close_http_clients()
+    await close_database()
 
 # Health check endpoint
 @app.get("/health")
@@ -106,7 +127,13 @@ async def health_check():
         return {
             "status": "healthy",
             "version": settings.VERSION,
-            "database": "connected"
+            "database": "connected",
+            "database_pool": get_database().pool_status(),
+            "embedding_cache": get_embedding_cache_stats(),
+            "query_cache": get_query_cache_stats(),
+            "embedding_batching": get_embedding_batching_stats(),
+            "embedding_rate_limits": get_rate_limit_stats(),
+            "cpu_pool": get_cpu_pool_stats()
         }
     except Exception as e:
         logger.error(f"Health check failed: {e}")
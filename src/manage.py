@@ -0,0 +1,106 @@
+import argparse
+import asyncio
+import logging
+
+from core.config import settings
+from usecases.chunk_usecases import ChunkUseCases
+from core.dependencies import (
+    close_database, get_database, get_vector_index_manager, vector_index_params,
+    get_chunk_repository, get_vector_service, get_extra_vector_services,
+    init_http_clients, close_http_clients, init_chunk_store, close_chunk_store,
+    init_job_workers, close_job_workers, init_cpu_pool, close_cpu_pool
+)
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+async def index_command(args: argparse.Namespace):
+    manager = get_vector_index_manager(args.model)
+    index_type = args.type or settings.VECTOR_INDEX_TYPE
+    try:
+        if args.action == "build":
+            await manager.build(index_type, vector_index_params(index_type), concurrently=args.concurrently)
+        elif args.action == "rebuild":
+            await manager.rebuild(index_type, concurrently=args.concurrently)
+        elif args.action == "drop":
+            await manager.drop(index_type, concurrently=args.concurrently)
+        elif args.action == "list":
+            for index in await manager.list_indexes():
+                print(f"{index['indexname']} ({index['size']}): {index['indexdef']}")
+        elif args.action == "recall":
+            async with get_database().session() as session:
+                chunk_usecases = ChunkUseCases(await get_chunk_repository(session), await get_vector_service())
+                report = await chunk_usecases.measure_recall(k=args.k, samples=args.samples, model=args.model)
+            print(
+                f"recall@{report['k']} = {report['recall']:.4f} over {report['queries']} queries "
+                f"({args.model or settings.EMBEDDING_MODEL}, {settings.VECTOR_INDEX_TYPE}, "
+                f"quantization={settings.VECTOR_QUANTIZATION})"
+            )
+    finally:
+        await close_http_clients()
+        await close_database()
+
+async def embeddings_command(args: argparse.Namespace):
+    """Embed existing chunks with an extra model, e.g. before switching searches to it"""
+    init_chunk_store()
+    try:
+        async with get_database().session() as session:
+            chunk_usecases = ChunkUseCases(
+                await get_chunk_repository(session),
+                await get_vector_service(),
+                extra_vector_services=await get_extra_vector_services()
+            )
+            total = await chunk_usecases.backfill_embeddings(args.model, batch_size=args.batch_size)
+        print(f"Embedded {total} chunks with {args.model}")
+    finally:
+        close_chunk_store()
+        await close_http_clients()
+        await close_database()
+
+async def worker_command(args: argparse.Namespace):
+    """Run ingestion job workers without the HTTP API"""
+    if args.concurrency:
+        settings.JOB_WORKERS = args.concurrency
+    init_http_clients()
+    init_chunk_store()
+    init_cpu_pool()
+    await init_job_workers()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await close_job_workers()
+        close_cpu_pool()
+        close_chunk_store()
+        await close_http_clients()
+        await close_database()
+
+def main():
+    parser = argparse.ArgumentParser(description="Content Store maintenance commands")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index = commands.add_parser("index", help="Manage the chunk embedding ANN index")
+    index.add_argument("action", choices=["build", "rebuild", "drop", "list", "recall"])
+    index.add_argument("--type", choices=["hnsw", "ivfflat"], help="defaults to VECTOR_INDEX_TYPE")
+    index.add_argument("--concurrently", action="store_true", help="avoid locking writes while running")
+    index.add_argument("--model", help="an EMBEDDING_EXTRA_MODELS label; defaults to EMBEDDING_MODEL")
+    index.add_argument("--k", type=int, default=10, help="recall: result size compared")
+    index.add_argument("--samples", type=int, default=50, help="recall: stored embeddings used as queries")
+    index.set_defaults(handler=index_command)
+
+    embeddings = commands.add_parser("embeddings", help="Manage extra-model embeddings")
+    embeddings.add_argument("action", choices=["backfill"])
+    embeddings.add_argument("--model", required=True, help="an EMBEDDING_EXTRA_MODELS label")
+    embeddings.add_argument("--batch-size", type=int, help="defaults to BATCH_SIZE")
+    embeddings.set_defaults(handler=embeddings_command)
+
+    worker = commands.add_parser("worker", help="Process queued ingestion jobs")
+    worker.add_argument("--concurrency", type=int, help="defaults to JOB_WORKERS")
+    worker.set_defaults(handler=worker_command)
+
+    args = parser.parse_args()
+    asyncio.run(args.handler(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+from typing import Any, AsyncIterator, Callable, List, Sequence, Type
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def wants_ndjson(request: Request, stream: bool) -> bool:
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+def ndjson_response(rows: AsyncIterator[Any], schema: Type[BaseModel]) -> StreamingResponse:
+    """Stream rows as newline-delimited JSON, serializing one row at a time"""
+    async def lines():
+        async for row in rows:
+            yield schema.model_validate(row, from_attributes=True).model_dump_json() + "\n"
+    return StreamingResponse(lines(), media_type=NDJSON_MEDIA_TYPE)
+
+def keyset_page(
+    request: Request,
+    response: Response,
+    rows: Sequence[Any],
+    limit: int,
+    cursor: Callable[[Any], str]
+) -> List[Any]:
+    """Trim a ``limit + 1`` fetch to one page and link to the next one.
+
+    The extra row only signals that more exist; the next page starts
+    after ``cursor(row)`` of the last row returned.
+    """
+    page = list(rows[:limit])
+    if len(rows) > limit:
+        next_url = request.url.include_query_params(after=cursor(page[-1]), limit=limit)
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return page
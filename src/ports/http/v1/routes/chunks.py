@@ -1,27 +1,44 @@
-from typing import List
+from typing import Dict, List, Optional, Tuple
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 
 from ports.http.v1.schemas.chunks import (
     ChunkCreate, 
     ChunkResponse, 
+    SearchFilters,
     SimilaritySearch, 
-    SimilarityResult
+    SimilarityResult,
+    BatchSimilaritySearch,
+    BatchSimilarityResult
+)
+from ports.http.v1.pagination import keyset_page, ndjson_response, wants_ndjson
+from core.config import settings
+from domain.entities.chunk import Chunk
+from domain.value_objects.search_filter import SearchFilter
+from core.dependencies import (
+    get_chunk_repository, get_vector_service, get_query_vector_service,
+    get_extra_vector_services, get_extra_query_vector_services
 )
-from core.dependencies import get_session, get_vector_service
 from usecases.chunk_usecases import ChunkUseCases
-from adapters.repositories.sqlalchemy.chunk_repository import SQLAlchemyChunkRepository
-from adapters.services.vector_service import OpenAIVectorService
+from ports.repositories.chunk_repository import ChunkRepository
+from ports.services.vector_service import VectorService
 
 router = APIRouter()
 
 async def get_chunk_usecases(
-    session: AsyncSession = Depends(get_session),
-    vector_service: OpenAIVectorService = Depends(get_vector_service)
+    repository: ChunkRepository = Depends(get_chunk_repository),
+    vector_service: VectorService = Depends(get_vector_service),
+    query_vector_service: VectorService = Depends(get_query_vector_service),
+    extra_vector_services: Dict[str, VectorService] = Depends(get_extra_vector_services),
+    extra_query_vector_services: Dict[str, VectorService] = Depends(get_extra_query_vector_services)
 ) -> ChunkUseCases:
-    repository = SQLAlchemyChunkRepository(session)
-    return ChunkUseCases(repository, vector_service)
+    return ChunkUseCases(
+        repository,
+        vector_service,
+        query_vector_service=query_vector_service,
+        extra_vector_services=extra_vector_services,
+        extra_query_vector_services=extra_query_vector_services
+    )
 
 @router.post("/", response_model=ChunkResponse)
 async def create_chunk(
@@ -34,24 +51,102 @@ async def create_chunk(
         text=chunk.text
     )
 
+def _search_filter(search: SearchFilters) -> Optional[SearchFilter]:
+    filters = SearchFilter(
+        source_ids=tuple(search.source_ids or ()),
+        domains=tuple(search.domains or ()),
+        statuses=tuple(search.statuses or ()),
+        embedding_model=search.embedding_model
+    )
+    return filters or None
+
 @router.post("/search", response_model=List[SimilarityResult])
 async def search_similar_chunks(
     search: SimilaritySearch,
     usecases: ChunkUseCases = Depends(get_chunk_usecases)
 ):
-    results = await usecases.find_similar_chunks(
-        query_text=search.text,
-        limit=search.limit,
-        threshold=search.threshold
+    search_fn = (
+        usecases.hybrid_search if search.mode == "hybrid"
+        else usecases.find_similar_chunks
     )
+    try:
+        results = await search_fn(
+            query_text=search.text,
+            limit=search.limit,
+            threshold=search.threshold,
+            ef_search=search.ef_search,
+            probes=search.probes,
+            model=search.model,
+            filters=_search_filter(search)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     return [
         SimilarityResult(chunk=chunk, similarity=similarity)
         for chunk, similarity in results
     ]
 
+@router.post("/search/batch", response_model=List[BatchSimilarityResult])
+async def search_similar_chunks_batch(
+    search: BatchSimilaritySearch,
+    usecases: ChunkUseCases = Depends(get_chunk_usecases)
+):
+    """Vector search for several queries at once; results come back in query order"""
+    try:
+        results = await usecases.find_similar_chunks_batch(
+            query_texts=search.queries,
+            limit=search.limit,
+            threshold=search.threshold,
+            ef_search=search.ef_search,
+            probes=search.probes,
+            model=search.model,
+            filters=_search_filter(search)
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [
+        BatchSimilarityResult(
+            query=query,
+            results=[
+                SimilarityResult(chunk=chunk, similarity=similarity)
+                for chunk, similarity in matches
+            ]
+        )
+        for query, matches in zip(search.queries, results)
+    ]
+
 @router.get("/content/{content_id}", response_model=List[ChunkResponse])
 async def get_content_chunks(
     content_id: UUID,
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[str] = Query(None, description="Cursor from the previous page's Link header"),
+    stream: bool = False,
     usecases: ChunkUseCases = Depends(get_chunk_usecases)
 ):
-    return await usecases.get_chunks_by_content(content_id)
\ No newline at end of file
+    """Get a page of a content's chunks; the Link header points to the next page.
+
+    With ``stream=true`` (or ``Accept: application/x-ndjson``) every
+    chunk is streamed as NDJSON instead.
+    """
+    if wants_ndjson(request, stream):
+        return ndjson_response(
+            usecases.stream_chunks_by_content(content_id, batch_size=settings.STREAM_BATCH_SIZE),
+            ChunkResponse
+        )
+    chunks = await usecases.get_chunks_by_content(
+        content_id, limit=limit + 1, after=_parse_chunk_cursor(after) if after else None
+    )
+    return keyset_page(request, response, chunks, limit, cursor=_chunk_cursor)
+
+# Sequences are not unique, so the cursor carries the id as a tiebreaker
+def _chunk_cursor(chunk: Chunk) -> str:
+    return f"{chunk.sequence}:{chunk.id}"
+
+def _parse_chunk_cursor(after: str) -> Tuple[int, UUID]:
+    try:
+        sequence, id = after.split(":", 1)
+        return int(sequence), UUID(id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
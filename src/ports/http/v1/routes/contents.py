@@ -1,6 +1,6 @@
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from ports.http.v1.schemas.sources import SourceResponse
@@ -10,6 +10,8 @@ from ports.http.v1.schemas.contents import (
     ContentUpdate, 
     ContentResponse
 )
+from ports.http.v1.pagination import keyset_page, ndjson_response, wants_ndjson
+from core.config import settings
 from core.dependencies import get_session
 from usecases import source_usecases, content_usecases, chunk_usecases
 from usecases.content_usecases import ContentUseCases
@@ -48,10 +50,33 @@ async def get_content(
 @router.get("/source/{source_id}", response_model=List[ContentResponse])
 async def get_source_contents(
     source_id: UUID,
+    request: Request,
+    response: Response,
+    limit: int = Query(settings.PAGE_SIZE_DEFAULT, ge=1, le=settings.PAGE_SIZE_MAX),
+    after: Optional[UUID] = None,
+    stream: bool = False,
+    include_raw_content: bool = False,
     usecases: ContentUseCases = Depends(get_content_usecases)
 ):
-    """Get all contents for a source"""
-    return await usecases.get_source_contents(source_id)
+    """Get a page of a source's contents; the Link header points to the next page.
+
+    With ``stream=true`` (or ``Accept: application/x-ndjson``) every
+    content is streamed as NDJSON instead. ``raw_content`` is only
+    filled in with ``include_raw_content=true``.
+    """
+    if wants_ndjson(request, stream):
+        return ndjson_response(
+            usecases.stream_source(
+                source_id,
+                batch_size=settings.STREAM_BATCH_SIZE,
+                with_raw_content=include_raw_content
+            ),
+            ContentResponse
+        )
+    contents = await usecases.get_source(
+        source_id, limit=limit + 1, after=after, with_raw_content=include_raw_content
+    )
+    return keyset_page(request, response, contents, limit, cursor=lambda content: str(content.id))
 
 @router.patch("/{content_id}", response_model=ContentResponse)
 async def update_content(
@@ -1,7 +1,13 @@
 from datetime import datetime
-from typing import Optional, List
+from typing import Literal, Optional, List
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from core.config import settings
+
+# Ranges pgvector accepts for hnsw.ef_search and ivfflat.probes
+HNSW_EF_SEARCH_MAX = 1000
+IVFFLAT_PROBES_MAX = 32768
 
 class ChunkBase(BaseModel):
     content_id: UUID
@@ -22,13 +28,41 @@ class ChunkResponse(ChunkBase):
     created_at: datetime
 
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+class SearchFilters(BaseModel):
+    """Optional restrictions shared by the search endpoints"""
+    source_ids: Optional[List[UUID]] = None
+    domains: Optional[List[str]] = None
+    # Content statuses, e.g. ["processed"]
+    statuses: Optional[List[str]] = None
+    # Model a chunk's primary embedding came from
+    embedding_model: Optional[str] = None
 
-class SimilaritySearch(BaseModel):
+class SimilaritySearch(SearchFilters):
     text: str
-    limit: Optional[int] = 10
-    threshold: Optional[float] = 0.7
+    limit: int = Field(10, ge=1, le=settings.SEARCH_LIMIT_MAX)
+    # Cosine similarity, so -1 keeps everything
+    threshold: float = Field(0.7, ge=-1, le=1)
+    ef_search: Optional[int] = Field(None, ge=1, le=HNSW_EF_SEARCH_MAX)
+    probes: Optional[int] = Field(None, ge=1, le=IVFFLAT_PROBES_MAX)
+    mode: Literal["vector", "hybrid"] = "vector"
+    # Embedding model label to search with; defaults to the primary model
+    model: Optional[str] = None
 
 class SimilarityResult(BaseModel):
     chunk: ChunkResponse
-    similarity: float
\ No newline at end of file
+    similarity: float
+
+class BatchSimilaritySearch(SearchFilters):
+    queries: List[str] = Field(min_length=1, max_length=settings.SEARCH_BATCH_MAX_QUERIES)
+    limit: int = Field(10, ge=1, le=settings.SEARCH_LIMIT_MAX)
+    # Cosine similarity, so -1 keeps everything
+    threshold: float = Field(0.7, ge=-1, le=1)
+    ef_search: Optional[int] = Field(None, ge=1, le=HNSW_EF_SEARCH_MAX)
+    probes: Optional[int] = Field(None, ge=1, le=IVFFLAT_PROBES_MAX)
+    model: Optional[str] = None
+
+class BatchSimilarityResult(BaseModel):
+    query: str
+    results: List[SimilarityResult]
\ No newline at end of file
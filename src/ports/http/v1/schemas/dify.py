@@ -1,6 +1,23 @@
-from typing import Dict, Any
+from datetime import datetime
+from typing import Dict, Any, Literal, Optional
+from uuid import UUID
 from pydantic import BaseModel
 
 class DifyWorkflowRequest(BaseModel):
     inputs: Dict[str, Any]
-    user: str
\ No newline at end of file
+    user: str
+    response_mode: Literal["blocking", "streaming"] = "blocking"
+
+class IngestionJobResponse(BaseModel):
+    id: UUID
+    status: str
+    response_mode: str
+    documents_processed: int
+    chunks_processed: int
+    error: Optional[str]
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+
+    class Config:
+        from_attributes = True
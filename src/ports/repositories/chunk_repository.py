@@ -1,10 +1,14 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional, Tuple
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from uuid import UUID
+import numpy as np
 from domain.entities.chunk import Chunk
 from domain.value_objects.embedding import Embedding
+from domain.value_objects.search_filter import SearchFilter
 
 class ChunkRepository(ABC):
+    """Reads leave ``Chunk.embedding`` as None unless ``with_embedding`` is set"""
+
     @abstractmethod
     async def create(self, chunk: Chunk) -> Chunk:
         pass
@@ -18,10 +22,92 @@ class ChunkRepository(ABC):
         self, 
         embedding: Embedding, 
         limit: int = 10, 
-        threshold: float = 0.7
+        threshold: float = 0.7,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        exact: bool = False,
+        with_embedding: bool = False,
+        filters: Optional[SearchFilter] = None
+    ) -> List[Tuple[Chunk, float]]:
+        """``exact`` bypasses ANN indexes and quantization (the recall baseline).
+
+        ``filters`` restricts candidates before the top-k is taken, so a
+        filtered search still returns up to ``limit`` matching chunks.
+        """
+        pass
+
+    @abstractmethod
+    async def find_similar_many(
+        self,
+        embeddings: List[Embedding],
+        limit: int = 10,
+        threshold: float = 0.7,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        with_embedding: bool = False,
+        filters: Optional[SearchFilter] = None
+    ) -> List[List[Tuple[Chunk, float]]]:
+        """Top-k search for several same-model queries at once; one result list per query"""
+        pass
+
+    @abstractmethod
+    async def find_lexical(
+        self,
+        query_text: str,
+        limit: int = 10,
+        with_embedding: bool = False,
+        filters: Optional[SearchFilter] = None
     ) -> List[Tuple[Chunk, float]]:
         pass
 
     @abstractmethod
-    async def get_by_content_id(self, content_id: UUID) -> List[Chunk]:
-        pass
\ No newline at end of file
+    async def sample_embeddings(self, limit: int, model: Optional[str] = None) -> List[Embedding]:
+        """Return up to ``limit`` stored embeddings of ``model`` picked at random"""
+        pass
+
+    @abstractmethod
+    async def find_missing_embeddings(self, model: str, limit: int = 100) -> List[Chunk]:
+        """Return chunks that have no vector from the extra model ``model`` yet"""
+        pass
+
+    @abstractmethod
+    async def save_embeddings(self, model: str, embeddings: List[Tuple[UUID, np.ndarray]]) -> None:
+        """Store or replace extra-model vectors for existing chunks"""
+        pass
+
+    @abstractmethod
+    async def get_by_content_id(
+        self,
+        content_id: UUID,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[int, UUID]] = None,
+        with_embedding: bool = False
+    ) -> List[Chunk]:
+        """Chunks of a content in (sequence, id) order; ``after`` is that key of the previous page's last chunk"""
+        pass
+
+    @abstractmethod
+    def stream_by_content_id(
+        self,
+        content_id: UUID,
+        batch_size: int = 500,
+        with_embedding: bool = False
+    ) -> AsyncIterator[Chunk]:
+        """Yield every chunk of a content in (sequence, id) order without loading them all at once"""
+        pass
+
+    @abstractmethod
+    async def get_fingerprints(self, content_id: UUID) -> List[Tuple[UUID, Optional[str], int]]:
+        """Return (id, text_hash, sequence) for every chunk of a content"""
+        pass
+
+    @abstractmethod
+    async def sync_content_chunks(
+        self,
+        content_id: UUID,
+        new_chunks: List[Chunk],
+        resequence: Dict[UUID, int],
+        stale_ids: List[UUID]
+    ) -> List[Chunk]:
+        """Atomically delete stale chunks, move kept ones and insert new ones"""
+        pass
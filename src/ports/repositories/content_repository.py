@@ -1,27 +1,49 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 from uuid import UUID
 from domain.entities.content import Content
 
 class ContentRepository(ABC):
+    """Reads leave ``raw_content`` as None unless ``with_raw_content`` is set.
+
+    Saving a content whose ``raw_content`` is None keeps the stored text.
+    """
+
     @abstractmethod
     async def save(self, content: Content) -> Content:
         pass
     
     @abstractmethod
-    async def get_by_id(self, id: UUID) -> Optional[Content]:
+    async def get_by_id(self, id: UUID, with_raw_content: bool = False) -> Optional[Content]:
         pass
     
     @abstractmethod
-    async def get_by_url(self, url: str) -> Optional[Content]:
+    async def get_by_url(self, url: str, with_raw_content: bool = False) -> Optional[Content]:
         pass
 
     @abstractmethod
-    async def get_by_url_hash(self, url_hash: str) -> Optional[Content]:
+    async def get_by_url_hash(self, url_hash: str, with_raw_content: bool = False) -> Optional[Content]:
         pass
     
     @abstractmethod
-    async def get_by_source_id(self, source_id: UUID) -> List[Content]:
+    async def get_by_source_id(
+        self,
+        source_id: UUID,
+        limit: Optional[int] = None,
+        after: Optional[UUID] = None,
+        with_raw_content: bool = False
+    ) -> List[Content]:
+        """Contents of a source ordered by id; ``after`` is the last id of the previous page"""
+        pass
+
+    @abstractmethod
+    def stream_by_source_id(
+        self,
+        source_id: UUID,
+        batch_size: int = 500,
+        with_raw_content: bool = False
+    ) -> AsyncIterator[Content]:
+        """Yield every content of a source in id order without loading them all at once"""
         pass
     
     @abstractmethod
@@ -30,4 +52,12 @@ class ContentRepository(ABC):
 
     @abstractmethod
     async def upsert(self, content: Content) -> Content:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def upsert_many(self, contents: List[Content]) -> List[Content]:
+        pass
+
+    @abstractmethod
+    async def mark_ingested(self, id: UUID, content_hash: str) -> None:
+        pass
@@ -0,0 +1,12 @@
+from abc import ABC, abstractmethod
+from typing import Dict, List
+import numpy as np
+
+class EmbeddingCacheRepository(ABC):
+    @abstractmethod
+    async def get_many(self, model: str, text_hashes: List[str]) -> Dict[str, np.ndarray]:
+        pass
+
+    @abstractmethod
+    async def put_many(self, model: str, vectors: Dict[str, np.ndarray]) -> None:
+        pass
@@ -0,0 +1,36 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+from uuid import UUID
+from domain.entities.job import IngestionJob
+
+class JobRepository(ABC):
+    @abstractmethod
+    async def create(self, job: IngestionJob) -> IngestionJob:
+        pass
+
+    @abstractmethod
+    async def get_by_id(self, id: UUID) -> Optional[IngestionJob]:
+        pass
+
+    @abstractmethod
+    async def claim_next(self) -> Optional[IngestionJob]:
+        """Atomically move the oldest queued job to running and return it"""
+        pass
+
+    @abstractmethod
+    async def update_progress(self, id: UUID, documents_processed: int, chunks_processed: int) -> None:
+        pass
+
+    @abstractmethod
+    async def heartbeat(self, id: UUID) -> None:
+        """Mark a running job as alive without changing its progress"""
+        pass
+
+    @abstractmethod
+    async def finish(self, id: UUID, status: str, error: Optional[str] = None) -> None:
+        pass
+
+    @abstractmethod
+    async def requeue_stale(self, stale_after_seconds: float) -> int:
+        """Return running jobs without a recent heartbeat to the queue"""
+        pass
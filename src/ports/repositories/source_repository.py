@@ -22,4 +22,12 @@ class SourceRepository(ABC):
 
     @abstractmethod
     async def list_active(self) -> List[Source]:
-        pass
\ No newline at end of file
+        pass
+
+    @abstractmethod
+    async def upsert(self, source: Source) -> Source:
+        pass
+
+    @abstractmethod
+    async def upsert_many(self, sources: List[Source]) -> List[Source]:
+        pass
@@ -0,0 +1,17 @@
+import asyncio
+from abc import ABC, abstractmethod
+from typing import List
+from domain.value_objects.text_chunk import TextChunk
+
+class TextChunker(ABC):
+    # Documents at least this long are split off the event loop
+    offload_min_chars: int = 20_000
+
+    @abstractmethod
+    def split(self, text: str) -> List[TextChunk]:
+        pass
+
+    async def split_async(self, text: str) -> List[TextChunk]:
+        if len(text) < self.offload_min_chars:
+            return self.split(text)
+        return await asyncio.to_thread(self.split, text)
@@ -1,18 +1,150 @@
-from typing import List, Optional, Tuple
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
 from uuid import UUID, uuid4
 import numpy as np
 
+from adapters.services.text_chunkers import get_token_counter
+from core.config import settings
 from domain.entities.chunk import Chunk
+from domain.value_objects.embedding import Embedding
+from domain.value_objects.search_filter import SearchFilter
+from domain.value_objects.text_chunk import TextChunk
 from ports.repositories.chunk_repository import ChunkRepository
 from ports.services.vector_service import VectorService
 
+def text_fingerprint(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+@dataclass
+class ChunkSyncResult:
+    added: List[Chunk]
+    kept: int
+    deleted: int
+
+def reciprocal_rank_fusion(
+    rankings: List[List[Tuple[Chunk, float]]],
+    k: int = 60
+) -> List[Tuple[Chunk, float]]:
+    """Fuse ranked lists by summing 1 / (k + rank) per chunk"""
+    scores: Dict[UUID, float] = {}
+    chunks: Dict[UUID, Chunk] = {}
+    for ranking in rankings:
+        for rank, (chunk, _) in enumerate(ranking, start=1):
+            scores[chunk.id] = scores.get(chunk.id, 0.0) + 1.0 / (k + rank)
+            chunks.setdefault(chunk.id, chunk)
+    ordered = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [(chunks[id], score) for id, score in ordered]
+
+class ChunkEmbedder:
+    """Embeds split chunks with the primary and extra models.
+
+    Holds no repository, so ingestion can embed without a database
+    session open.
+    """
+
+    def __init__(
+        self,
+        vector_service: VectorService,
+        extra_vector_services: Optional[Dict[str, VectorService]] = None,
+        batch_size: int = settings.BATCH_SIZE,
+        max_batch_tokens: int = settings.EMBEDDING_BATCH_MAX_TOKENS
+    ):
+        self.vector_service = vector_service
+        self.extra_vector_services = extra_vector_services or {}
+        self.batch_size = batch_size
+        self.max_batch_tokens = max_batch_tokens
+
+    async def embed_chunks(self, chunks: List[TextChunk]) -> List[Embedding]:
+        """Embed split chunks, packing batches by their token counts"""
+        return await self.embed_with(self.vector_service, chunks)
+
+    async def embed_extra_models(self, chunks: List[TextChunk]) -> List[Dict[str, np.ndarray]]:
+        """Embed chunks with every extra model; one {label: vector} per chunk"""
+        extras: List[Dict[str, np.ndarray]] = [{} for _ in chunks]
+        if not chunks or not self.extra_vector_services:
+            return extras
+        models = list(self.extra_vector_services)
+        results = await asyncio.gather(*(
+            self.embed_with(self.extra_vector_services[model], chunks) for model in models
+        ))
+        for model, embeddings in zip(models, results):
+            for extra, embedding in zip(extras, embeddings):
+                extra[model] = embedding.vector
+        return extras
+
+    async def embed_with(self, vector_service: VectorService, chunks: List[TextChunk]) -> List[Embedding]:
+        embeddings: List[Embedding] = []
+        for batch in self._batches(chunks):
+            embeddings.extend(
+                await vector_service.batch_generate_embeddings([chunk.text for chunk in batch])
+            )
+        return embeddings
+
+    async def embed_new_chunks(
+        self,
+        text_chunks: List[TextChunk],
+        known_hashes: Set[str]
+    ) -> Tuple[List[Optional[Embedding]], List[Optional[Dict[str, np.ndarray]]]]:
+        """Embed the chunks whose text is not stored yet, with every model.
+
+        Returns primary and extra-model embeddings aligned with
+        ``text_chunks``, None for known texts; both feed
+        ``ChunkUseCases.sync_chunks`` so
+        the remote calls happen outside any unit of work.
+        """
+        pending = [i for i, chunk in enumerate(text_chunks) if chunk.text_hash not in known_hashes]
+        pending_chunks = [text_chunks[i] for i in pending]
+        primary, extras = await asyncio.gather(
+            self.embed_chunks(pending_chunks), self.embed_extra_models(pending_chunks)
+        )
+        embeddings: List[Optional[Embedding]] = [None] * len(text_chunks)
+        extra_embeddings: List[Optional[Dict[str, np.ndarray]]] = [None] * len(text_chunks)
+        for i, embedding, extra in zip(pending, primary, extras):
+            embeddings[i], extra_embeddings[i] = embedding, extra
+        return embeddings, extra_embeddings
+
+    def _batches(self, chunks: List[TextChunk]) -> List[List[TextChunk]]:
+        # Close a batch once it hits either the item cap or the token budget
+        batches: List[List[TextChunk]] = []
+        current: List[TextChunk] = []
+        current_tokens = 0
+        for chunk in chunks:
+            tokens = chunk.token_count
+            if current and (
+                len(current) >= self.batch_size
+                or current_tokens + tokens > self.max_batch_tokens
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(chunk)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
 class ChunkUseCases:
     def __init__(
         self,
-        chunk_repository: ChunkRepository, vector_service: VectorService
+        chunk_repository: ChunkRepository, vector_service: VectorService,
+        batch_size: int = settings.BATCH_SIZE,
+        max_batch_tokens: int = settings.EMBEDDING_BATCH_MAX_TOKENS,
+        query_vector_service: Optional[VectorService] = None,
+        extra_vector_services: Optional[Dict[str, VectorService]] = None,
+        extra_query_vector_services: Optional[Dict[str, VectorService]] = None,
+        count_tokens: Optional[Callable[[str], int]] = None
     ):
         self.chunk_repository = chunk_repository
         self.vector_service = vector_service
+        # Query embeddings may go through a cache that ingestion bypasses
+        self.query_vector_service = query_vector_service or vector_service
+        # Additional models, keyed by label, embedded alongside the primary one
+        self.extra_vector_services = extra_vector_services or {}
+        self.extra_query_vector_services = extra_query_vector_services or self.extra_vector_services
+        self.batch_size = batch_size
+        self.embedder = ChunkEmbedder(vector_service, self.extra_vector_services, batch_size, max_batch_tokens)
+        self.count_tokens = count_tokens or get_token_counter(settings.TOKENIZER_ENCODING)
 
     async def create_chunk_with_embedding(
         self,
@@ -20,8 +152,9 @@ class ChunkUseCases:
         sequence: int,
         text: str
     ) -> Chunk:
-        # Generate embedding
-        embedding = await self.vector_service.generate_embedding(text)
+        # Hashed and counted like split chunks, so re-ingestion can match it
+        text_chunk = self._text_chunk(text)
+        [embedding], [extra] = await self.embedder.embed_new_chunks([text_chunk], set())
 
         # Create chunk with a new UUID
         chunk = Chunk(
@@ -30,27 +163,231 @@ class ChunkUseCases:
             sequence=sequence,
             text=text,
             embedding=embedding.vector,
-            embedding_model=self.vector_service.model
+            token_count=text_chunk.token_count,
+            char_count=text_chunk.char_count,
+            embedding_model=embedding.model,
+            text_hash=text_chunk.text_hash,
+            extra_embeddings=extra
         )
         
         # Save chunk
         saved_chunk = await self.chunk_repository.create(chunk)
         return saved_chunk
 
+    async def embed_chunks(self, chunks: List[TextChunk]) -> List[Embedding]:
+        return await self.embedder.embed_chunks(chunks)
+
+    async def embed_extra_models(self, chunks: List[TextChunk]) -> List[Dict[str, np.ndarray]]:
+        return await self.embedder.embed_extra_models(chunks)
+
+    async def get_text_hashes(self, content_id: UUID) -> Set[str]:
+        return {
+            text_hash
+            for _, text_hash, _ in await self.chunk_repository.get_fingerprints(content_id)
+            if text_hash
+        }
+
+    async def sync_chunks(
+        self,
+        content_id: UUID,
+        text_chunks: List[TextChunk],
+        embeddings: Optional[List[Optional[Embedding]]] = None,
+        extra_embeddings: Optional[List[Optional[Dict[str, np.ndarray]]]] = None
+    ) -> ChunkSyncResult:
+        """Bring a content's chunks in line with ``text_chunks``.
+
+        Chunks whose text is unchanged are kept (and re-sequenced if they
+        moved), only new texts are embedded, and chunks no longer present
+        are deleted. ``embeddings`` and ``extra_embeddings`` may carry
+        vectors computed upstream by ``ChunkEmbedder.embed_new_chunks``, aligned with
+        ``text_chunks``; entries left as None are embedded here.
+        """
+        existing: Dict[Optional[str], List[Tuple[UUID, int]]] = {}
+        for id, text_hash, sequence in await self.chunk_repository.get_fingerprints(content_id):
+            existing.setdefault(text_hash, []).append((id, sequence))
+
+        resequence: Dict[UUID, int] = {}
+        kept = 0
+        new_items: List[Tuple[int, int, TextChunk, str]] = []
+        for i, text_chunk in enumerate(text_chunks):
+            sequence, text_hash = i + 1, text_chunk.text_hash
+            matches = existing.get(text_hash)
+            if matches:
+                id, old_sequence = matches.pop()
+                kept += 1
+                if old_sequence != sequence:
+                    resequence[id] = sequence
+            else:
+                new_items.append((i, sequence, text_chunk, text_hash))
+        # Legacy chunks without a hash land under None and are replaced
+        stale_ids = [id for matches in existing.values() for id, _ in matches]
+
+        new_embeddings = [embeddings[i] if embeddings else None for i, _, _, _ in new_items]
+        missing = [k for k, embedding in enumerate(new_embeddings) if embedding is None]
+        if missing:
+            for k, embedding in zip(missing, await self.embed_chunks([new_items[k][2] for k in missing])):
+                new_embeddings[k] = embedding
+        extras = [extra_embeddings[i] if extra_embeddings else None for i, _, _, _ in new_items]
+        missing = [k for k, extra in enumerate(extras) if extra is None]
+        if missing:
+            for k, extra in zip(missing, await self.embed_extra_models([new_items[k][2] for k in missing])):
+                extras[k] = extra
+        new_chunks = [
+            Chunk(
+                id=uuid4(),
+                content_id=content_id,
+                sequence=sequence,
+                text=text_chunk.text,
+                embedding=embedding.vector,
+                token_count=text_chunk.token_count,
+                char_count=text_chunk.char_count,
+                embedding_model=embedding.model,
+                text_hash=text_hash,
+                extra_embeddings=extra
+            )
+            for (_, sequence, text_chunk, text_hash), embedding, extra in zip(new_items, new_embeddings, extras)
+        ]
+        added = await self.chunk_repository.sync_content_chunks(
+            content_id, new_chunks, resequence, stale_ids
+        )
+        return ChunkSyncResult(added=added, kept=kept, deleted=len(stale_ids))
+
+    async def get_chunks_by_content(
+        self,
+        content_id: UUID,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[int, UUID]] = None
+    ) -> List[Chunk]:
+        return await self.chunk_repository.get_by_content_id(content_id, limit=limit, after=after)
+
+    def stream_chunks_by_content(self, content_id: UUID, batch_size: int = 500) -> AsyncIterator[Chunk]:
+        return self.chunk_repository.stream_by_content_id(content_id, batch_size=batch_size)
+
     async def find_similar_chunks(
         self,
         query_text: str,
         limit: int = 10,
-        threshold: float = 0.7
+        threshold: float = 0.7,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        model: Optional[str] = None,
+        filters: Optional[SearchFilter] = None
     ) -> List[Tuple[Chunk, float]]:
-        # Generate query embedding
-        query_vector = await self.vector_service.generate_embedding(query_text)
+        # Generate query embedding; its model routes the search
+        query_embedding = await self._query_service(model).generate_embedding(query_text)
         
         # Find similar chunks
         similar_chunks = await self.chunk_repository.find_similar(
-            query_vector,
+            query_embedding,
             limit=limit,
-            threshold=threshold
+            threshold=threshold,
+            ef_search=ef_search,
+            probes=probes,
+            filters=filters
         )
         
-        return similar_chunks
\ No newline at end of file
+        return similar_chunks
+
+    async def find_similar_chunks_batch(
+        self,
+        query_texts: List[str],
+        limit: int = 10,
+        threshold: float = 0.7,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        model: Optional[str] = None,
+        filters: Optional[SearchFilter] = None
+    ) -> List[List[Tuple[Chunk, float]]]:
+        """Vector search for several queries: one embedding call, one search round trip"""
+        query_embeddings = await self._query_service(model).batch_generate_embeddings(query_texts)
+        return await self.chunk_repository.find_similar_many(
+            query_embeddings,
+            limit=limit,
+            threshold=threshold,
+            ef_search=ef_search,
+            probes=probes,
+            filters=filters
+        )
+
+    async def hybrid_search(
+        self,
+        query_text: str,
+        limit: int = 10,
+        threshold: float = 0.7,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        model: Optional[str] = None,
+        filters: Optional[SearchFilter] = None
+    ) -> List[Tuple[Chunk, float]]:
+        """Fuse full-text and vector candidates with reciprocal rank fusion.
+
+        Scores in the result are RRF scores, not cosine similarities; the
+        threshold only filters the vector candidates.
+        """
+        candidates = limit * settings.HYBRID_CANDIDATE_FACTOR
+        # The lexical query runs while the query embedding is in flight
+        lexical, query_embedding = await asyncio.gather(
+            self.chunk_repository.find_lexical(query_text, limit=candidates, filters=filters),
+            self._query_service(model).generate_embedding(query_text)
+        )
+        semantic = await self.chunk_repository.find_similar(
+            query_embedding,
+            limit=candidates,
+            threshold=threshold,
+            ef_search=ef_search,
+            probes=probes,
+            filters=filters
+        )
+        fused = reciprocal_rank_fusion([lexical, semantic], k=settings.HYBRID_RRF_K)
+        return fused[:limit]
+
+    async def measure_recall(
+        self,
+        k: int = 10,
+        samples: int = 50,
+        ef_search: Optional[int] = None,
+        probes: Optional[int] = None,
+        model: Optional[str] = None
+    ) -> Dict[str, float]:
+        """Recall@k of the configured search against exact search.
+
+        Stored embeddings serve as queries, so no embedding calls are made.
+        """
+        queries = await self.chunk_repository.sample_embeddings(samples, model=model)
+        found = 0
+        for query in queries:
+            exact = await self.chunk_repository.find_similar(query, limit=k, threshold=-1.0, exact=True)
+            approximate = await self.chunk_repository.find_similar(
+                query, limit=k, threshold=-1.0, ef_search=ef_search, probes=probes
+            )
+            expected = {chunk.id for chunk, _ in exact}
+            found += len(expected & {chunk.id for chunk, _ in approximate}) / max(len(expected), 1)
+        return {
+            "k": k,
+            "queries": len(queries),
+            "recall": found / len(queries) if queries else 0.0,
+        }
+
+    async def backfill_embeddings(self, model: str, batch_size: Optional[int] = None) -> int:
+        """Embed existing chunks with the extra model ``model``; returns how many"""
+        vector_service = self.extra_vector_services.get(model)
+        if vector_service is None:
+            raise ValueError(f"Unknown embedding model: {model}")
+        total = 0
+        while chunks := await self.chunk_repository.find_missing_embeddings(model, limit=batch_size or self.batch_size):
+            embeddings = await self.embedder.embed_with(vector_service, [self._text_chunk(chunk.text) for chunk in chunks])
+            await self.chunk_repository.save_embeddings(
+                model, [(chunk.id, embedding.vector) for chunk, embedding in zip(chunks, embeddings)]
+            )
+            total += len(chunks)
+        return total
+
+    def _text_chunk(self, text: str) -> TextChunk:
+        return TextChunk(text=text, token_count=self.count_tokens(text), char_count=len(text))
+
+    def _query_service(self, model: Optional[str]) -> VectorService:
+        if model is None or model == settings.EMBEDDING_MODEL:
+            return self.query_vector_service
+        if model not in self.extra_query_vector_services:
+            raise ValueError(f"Unknown embedding model: {model}")
+        return self.extra_query_vector_services[model]
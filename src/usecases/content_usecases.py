@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional, Tuple
 from uuid import UUID
 from domain.entities.content import Content
 import hashlib
@@ -24,17 +24,38 @@ class ContentUseCases:
             return await self.content_repository.save(content)
         return None
     
-    async def get_source(self, source_id: UUID) -> List[Content]:
-        return await self.content_repository.get_by_source_id(source_id)
+    async def get_source(
+        self,
+        source_id: UUID,
+        limit: Optional[int] = None,
+        after: Optional[UUID] = None,
+        with_raw_content: bool = False
+    ) -> List[Content]:
+        return await self.content_repository.get_by_source_id(
+            source_id, limit=limit, after=after, with_raw_content=with_raw_content
+        )
+
+    def stream_source(
+        self,
+        source_id: UUID,
+        batch_size: int = 500,
+        with_raw_content: bool = False
+    ) -> AsyncIterator[Content]:
+        return self.content_repository.stream_by_source_id(
+            source_id, batch_size=batch_size, with_raw_content=with_raw_content
+        )
 
     async def upsert(self, url: str, source_id: UUID) -> Content:
-        url_hash = hashlib.sha256(url.encode('utf-8')).hexdigest()
-        content = await self.content_repository.get_by_url_hash(url_hash)
-        if content:
-            content.source_id = source_id
-            content.url = url  # Ensure URL is updated
-            # We assume other fields like status might need updating
-            return await self.content_repository.upsert(content)
-        else:
-            content = Content(url=url, source_id=source_id, url_hash=url_hash)
-            return await self.content_repository.upsert(content)
\ No newline at end of file
+        # ON CONFLICT (url_hash) in the repository replaces the old lookup
+        return (await self.upsert_many([(url, source_id)]))[0]
+
+    async def upsert_many(self, items: List[Tuple[str, UUID]]) -> List[Content]:
+        """Upsert (url, source_id) pairs in one round trip, preserving order"""
+        contents = [
+            Content(url=url, source_id=source_id, url_hash=hashlib.sha256(url.encode('utf-8')).hexdigest())
+            for url, source_id in items
+        ]
+        return await self.content_repository.upsert_many(contents)
+
+    async def mark_ingested(self, id: UUID, content_hash: str) -> None:
+        await self.content_repository.mark_ingested(id, content_hash)
@@ -1,81 +1,317 @@
-from typing import Dict, Any
+import asyncio
+from dataclasses import dataclass
+from uuid import UUID
+from typing import AsyncContextManager, AsyncIterator, Awaitable, Callable, Dict, Any, List, Optional, Tuple
 from adapters.dify_adapter import DifyAdapter
 import re
+from core.config import settings
+from domain.entities.source import Source
+from domain.value_objects.text_chunk import TextChunk
+from ports.services.text_chunker import TextChunker
+from adapters.services.text_chunkers import get_chunker
+from adapters.cpu_pool import CpuPool
 from usecases.source_usecases import SourceUseCases
 import json
 from usecases.content_usecases import ContentUseCases
-from usecases.chunk_usecases import ChunkUseCases
+from usecases.chunk_usecases import ChunkEmbedder, ChunkSyncResult, ChunkUseCases, text_fingerprint
 import logging
-from langchain_text_splitters import RecursiveCharacterTextSplitter
 
 
 logger = logging.getLogger(__name__)
 
+# Marks the end of a pipeline stage's input
+_DONE = object()
+
+# Called with cumulative (documents_processed, chunks_processed)
+ProgressCallback = Callable[[int, int], Awaitable[None]]
+
+@dataclass
+class IngestionUnit:
+    """Use cases bound to one session, used to ingest a single document"""
+    source_usecases: SourceUseCases
+    content_usecases: ContentUseCases
+    chunk_usecases: ChunkUseCases
+
+UnitOfWorkFactory = Callable[[], AsyncContextManager[IngestionUnit]]
+
 class DifyUsecases:
-    def __init__(self, dify_adapter: DifyAdapter, source_usecases: SourceUseCases, content_usecases: ContentUseCases, chunk_usecases: ChunkUseCases):
+    def __init__(
+        self,
+        dify_adapter: DifyAdapter,
+        embedder: ChunkEmbedder,
+        unit_of_work: UnitOfWorkFactory,
+        concurrency: int = settings.INGESTION_CONCURRENCY,
+        chunker: Optional[TextChunker] = None,
+        cpu_pool: Optional[CpuPool] = None
+    ):
         self.dify_adapter = dify_adapter
-        self.source_usecases = source_usecases
-        self.content_usecases = content_usecases
-        self.chunk_usecases = chunk_usecases
+        # Remote embedding calls run outside any unit, holding no connection
+        self.embedder = embedder
+        # Every database access opens a short unit of its own
+        self.unit_of_work = unit_of_work
+        self.chunker = chunker or get_chunker(
+            settings.CHUNKING_STRATEGY,
+            settings.CHUNK_SIZE_TOKENS,
+            settings.CHUNK_OVERLAP_TOKENS,
+            settings.TOKENIZER_ENCODING,
+            settings.CPU_OFFLOAD_MIN_CHARS
+        )
+        # Without a process pool, large documents are split in a thread instead
+        self.cpu_pool = cpu_pool
+        self.concurrency = concurrency
+
+    async def process_dify_workflow(self, inputs: Dict[str, Any], user: str, on_progress: Optional[ProgressCallback] = None):
+        """Ingest every document of a blocking workflow run.
 
-    async def process_dify_workflow(self, inputs: Dict[str, Any], user: str):
-        content_url = inputs.get('url')
-        source_domain = content_url.split("//")[-1].split("/")[0] if content_url else "unknown"
+        Documents are processed concurrently, up to ``concurrency`` at a
+        time, each in its own unit of work. Returns one result per URL; a
+        failing document is reported in its result instead of aborting the
+        run.
+        """
         try:
             dify_response = await self.dify_adapter.run_workflow(inputs=inputs, user=user)
-            logger.info(f"Dify workflow response: {dify_response}")
+            logger.debug(f"Dify workflow response: {dify_response}")
 
             if 'data' not in dify_response:
                 logger.error(f"Invalid Dify response format: {dify_response}")
                 raise ValueError("Invalid Dify response format: missing 'data' field")
-            
+
             dify_data = dify_response['data']
 
             if not isinstance(dify_data, dict) or 'outputs' not in dify_data or 'output' not in dify_data['outputs']:
                 logger.error(f"Invalid Dify response data format: {dify_data}")
                 raise ValueError("Invalid Dify response data format: missing 'outputs' or 'text' field")
-            
-            workflow_output = dify_data['outputs']['output']
 
-            if isinstance(workflow_output, str):
-                try:
-                    workflow_output = json.loads(workflow_output.strip())
-                except json.JSONDecodeError as e:
-                    logger.error(f"Dify workflow returned invalid JSON: {workflow_output} - {e}")                    
-                    raise ValueError(f"Dify workflow returned invalid JSON: {workflow_output}") from e
-            
-            urls = workflow_output.get('url', [])
-            contents = workflow_output.get('contents', [])
-            
-            if not isinstance(urls, list) or not isinstance(contents, list) or len(urls) != len(contents):
-                raise ValueError("Invalid Dify response: 'url' and 'contents' must be lists of the same length.")
-
-            results = []            
-            for url, content_text in zip(urls, contents):
-                domain = url.split("//")[-1].split("/")[0] if url else "unknown"
-                source = await self.source_usecases.upsert(domain=domain)
-                content = await self.content_usecases.upsert(url=url, source_id=source.id)
-                markdown_splitter = RecursiveCharacterTextSplitter(
-                    chunk_size=600,
-                    chunk_overlap=60,
-                    separators=[
-                        "\\n## ",
-                        "\\n### ",
-                        "\\n- ",
-                        "\\n\\n",
-                        "\\n",
-                        ". ",
-                        " ",
-                        ""
-                    ]
-                )
-
-                chunks = markdown_splitter.split_text(content_text)
-                for j, chunk_text in enumerate(chunks):
-                    chunk = await self.chunk_usecases.create_chunk_with_embedding(content_id=content.id, sequence=j + 1, text=chunk_text)
-                    results.append({"source_id": source.id, "content_id": content.id, "chunk_id": chunk.id})
-
-            return results
+            pairs = list(dict(await self._parse_workflow_output(dify_data['outputs']['output'])).items())
+            logger.info(f"Dify workflow returned {len(pairs)} documents")
         except Exception as e:
             logger.error(f"Error processing Dify workflow: {e}")
             raise
+
+        # Sources and contents are upserted set-wise up front, so concurrent
+        # documents never race on them and metadata costs two round trips
+        async with self.unit_of_work() as unit:
+            sources = await unit.source_usecases.upsert_many(
+                list(dict.fromkeys(self._domain(url) for url, _ in pairs))
+            )
+            contents = await unit.content_usecases.upsert_many(
+                [(url, sources[self._domain(url)].id) for url, _ in pairs]
+            )
+        contents_by_url = {content.url: content for content in contents}
+        semaphore = asyncio.Semaphore(self.concurrency)
+        progress = _Progress(on_progress)
+
+        async def ingest(url: str, content_text: str) -> Dict[str, Any]:
+            source, content = sources[self._domain(url)], contents_by_url[url]
+            fingerprint = await self._fingerprint(content_text)
+            if content.content_hash == fingerprint:
+                await progress.add(0)
+                return self._unchanged(url, source, content.id)
+            async with semaphore:
+                try:
+                    text_chunks = await self._split_text(content_text)
+                    # Embedding calls run between two short units, so no
+                    # connection sits idle in a transaction while they wait
+                    async with self.unit_of_work() as unit:
+                        known_hashes = await unit.chunk_usecases.get_text_hashes(content.id)
+                    embeddings, extra_embeddings = await self.embedder.embed_new_chunks(text_chunks, known_hashes)
+                    async with self.unit_of_work() as unit:
+                        sync = await unit.chunk_usecases.sync_chunks(content.id, text_chunks, embeddings, extra_embeddings)
+                        await unit.content_usecases.mark_ingested(content.id, fingerprint)
+                except Exception as e:
+                    logger.error(f"Failed to ingest {url}: {e}")
+                    return self._failed(url, e)
+                await progress.add(len(sync.added))
+                return self._succeeded(url, source, content.id, sync)
+
+        return await asyncio.gather(*(ingest(url, content_text) for url, content_text in pairs))
+
+    async def process_dify_workflow_streaming(self, inputs: Dict[str, Any], user: str, on_progress: Optional[ProgressCallback] = None):
+        """Run the workflow in streaming mode and pipeline each document through
+        register -> split -> embed -> store as soon as it arrives.
+
+        Stages are connected by bounded queues so a slow stage applies
+        back-pressure instead of buffering the whole workflow output.
+        Unchanged pages stop at the register stage, and only chunk texts not
+        already stored are embedded. Both DB stages give each document its
+        own unit of work, so a failed transaction only affects that
+        document. Per-document failures are reported in the results.
+        """
+        queue_size = settings.PIPELINE_QUEUE_SIZE
+        documents: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        registered_documents: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        split_documents: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        embedded_documents: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        progress = _Progress(on_progress)
+        results = []
+
+        async def produce():
+            seen = set()
+            async for event in self.dify_adapter.stream_workflow(inputs=inputs, user=user):
+                async for url, content_text in self._pairs_from_event(event):
+                    if url in seen:
+                        continue
+                    seen.add(url)
+                    await documents.put((url, content_text))
+            await documents.put(_DONE)
+
+        async def register():
+            while (item := await documents.get()) is not _DONE:
+                url, content_text = item
+                fingerprint = await self._fingerprint(content_text)
+                try:
+                    # A unit per document: a failed transaction is rolled
+                    # back with its session instead of poisoning the next one
+                    async with self.unit_of_work() as unit:
+                        source = await unit.source_usecases.upsert(domain=self._domain(url))
+                        content = await unit.content_usecases.upsert(url=url, source_id=source.id)
+                        known_hashes = (
+                            set() if content.content_hash == fingerprint
+                            else await unit.chunk_usecases.get_text_hashes(content.id)
+                        )
+                except Exception as e:
+                    logger.error(f"Failed to register {url}: {e}")
+                    results.append(self._failed(url, e))
+                    continue
+                if content.content_hash == fingerprint:
+                    results.append(self._unchanged(url, source, content.id))
+                    await progress.add(0)
+                    continue
+                await registered_documents.put((url, source, content.id, fingerprint, content_text, known_hashes))
+            await registered_documents.put(_DONE)
+
+        async def split():
+            while (item := await registered_documents.get()) is not _DONE:
+                *document, content_text, known_hashes = item
+                await split_documents.put((*document, await self._split_text(content_text), known_hashes))
+            await split_documents.put(_DONE)
+
+        async def embed():
+            while (item := await split_documents.get()) is not _DONE:
+                url, source, content_id, fingerprint, text_chunks, known_hashes = item
+                try:
+                    embeddings = await self.embedder.embed_new_chunks(text_chunks, known_hashes)
+                except Exception as e:
+                    logger.error(f"Failed to embed {url}: {e}")
+                    results.append(self._failed(url, e))
+                    continue
+                await embedded_documents.put((url, source, content_id, fingerprint, text_chunks, embeddings))
+            await embedded_documents.put(_DONE)
+
+        async def store():
+            while (item := await embedded_documents.get()) is not _DONE:
+                url, source, content_id, fingerprint, text_chunks, (embeddings, extra_embeddings) = item
+                try:
+                    async with self.unit_of_work() as unit:
+                        sync = await unit.chunk_usecases.sync_chunks(content_id, text_chunks, embeddings, extra_embeddings)
+                        await unit.content_usecases.mark_ingested(content_id, fingerprint)
+                except Exception as e:
+                    logger.error(f"Failed to store {url}: {e}")
+                    results.append(self._failed(url, e))
+                    continue
+                results.append(self._succeeded(url, source, content_id, sync))
+                logger.info(f"Stored {len(sync.added)} new chunks for {url}")
+                await progress.add(len(sync.added))
+
+        try:
+            async with asyncio.TaskGroup() as tg:
+                for stage in (produce, register, split, embed, store):
+                    tg.create_task(stage())
+        except ExceptionGroup as eg:
+            logger.error(f"Error processing streaming Dify workflow: {eg.exceptions[0]}")
+            raise eg.exceptions[0]
+        return results
+
+    def _succeeded(self, url: str, source: Source, content_id: UUID, sync: ChunkSyncResult) -> Dict[str, Any]:
+        return {
+            "url": url,
+            "status": "succeeded",
+            "source_id": source.id,
+            "content_id": content_id,
+            "chunk_ids": [chunk.id for chunk in sync.added],
+            "chunks_kept": sync.kept,
+            "chunks_deleted": sync.deleted,
+        }
+
+    def _unchanged(self, url: str, source: Source, content_id: UUID) -> Dict[str, Any]:
+        return {
+            "url": url,
+            "status": "unchanged",
+            "source_id": source.id,
+            "content_id": content_id,
+            "chunk_ids": [],
+        }
+
+    def _failed(self, url: str, error: Exception) -> Dict[str, Any]:
+        return {"url": url, "status": "failed", "error": str(error)}
+
+    async def _pairs_from_event(self, event: Dict[str, Any]) -> AsyncIterator[Tuple[str, str]]:
+        event_type = event.get('event')
+        data = event.get('data') or {}
+        if event_type == 'error':
+            raise ValueError(f"Dify workflow failed: {event.get('message')}")
+        if event_type == 'node_finished':
+            # Per-document nodes (e.g. inside an iteration) surface pages early
+            outputs = data.get('outputs') or {}
+            if isinstance(outputs.get('url'), str) and isinstance(outputs.get('contents'), str):
+                yield outputs['url'], outputs['contents']
+        elif event_type == 'workflow_finished':
+            if data.get('status', 'succeeded') != 'succeeded':
+                raise ValueError(f"Dify workflow failed: {data.get('error')}")
+            outputs = data.get('outputs') or {}
+            if 'output' not in outputs:
+                raise ValueError("Invalid Dify response data format: missing 'outputs' or 'text' field")
+            for pair in await self._parse_workflow_output(outputs['output']):
+                yield pair
+
+    async def _parse_workflow_output(self, workflow_output: Any) -> List[Tuple[str, str]]:
+        if isinstance(workflow_output, str):
+            try:
+                # The output carries every page, so it can run to megabytes;
+                # a process would pay as much to pickle the parsed result back
+                if len(workflow_output) >= settings.CPU_OFFLOAD_MIN_CHARS:
+                    workflow_output = await asyncio.to_thread(json.loads, workflow_output.strip())
+                else:
+                    workflow_output = json.loads(workflow_output.strip())
+            except json.JSONDecodeError as e:
+                logger.error(f"Dify workflow returned invalid JSON: {workflow_output[:200]} - {e}")
+                raise ValueError("Dify workflow returned invalid JSON") from e
+
+        urls = workflow_output.get('url', [])
+        contents = workflow_output.get('contents', [])
+
+        if not isinstance(urls, list) or not isinstance(contents, list) or len(urls) != len(contents):
+            raise ValueError("Invalid Dify response: 'url' and 'contents' must be lists of the same length.")
+        return list(zip(urls, contents))
+
+    def _domain(self, url: str) -> str:
+        return url.split("//")[-1].split("/")[0] if url else "unknown"
+
+    async def _split_text(self, content_text: str) -> List[TextChunk]:
+        # Splitting also tokenizes and hashes every chunk
+        if self.cpu_pool and len(content_text) >= self.chunker.offload_min_chars:
+            return await self.cpu_pool.run(self.chunker.split, content_text)
+        return await self.chunker.split_async(content_text)
+
+    async def _fingerprint(self, text: str) -> str:
+        # hashlib releases the GIL on large inputs, so a thread keeps the loop
+        # free; a process would spend longer pickling the text than hashing it
+        if len(text) >= settings.CPU_OFFLOAD_MIN_CHARS:
+            return await asyncio.to_thread(text_fingerprint, text)
+        return text_fingerprint(text)
+
+class _Progress:
+    """Serializes progress reports coming from concurrent documents"""
+
+    def __init__(self, callback: Optional[ProgressCallback]):
+        self.callback = callback
+        self.documents = 0
+        self.chunks = 0
+        self._lock = asyncio.Lock()
+
+    async def add(self, chunks: int):
+        async with self._lock:
+            self.documents += 1
+            self.chunks += chunks
+            if self.callback:
+                await self.callback(self.documents, self.chunks)
@@ -0,0 +1,21 @@
+from typing import Any, Callable, Dict, Optional
+from uuid import UUID
+from domain.entities.job import IngestionJob
+from ports.repositories.job_repository import JobRepository
+
+class IngestionJobUseCases:
+    def __init__(self, job_repository: JobRepository, notify: Optional[Callable[[], None]] = None):
+        self.job_repository = job_repository
+        # Wakes in-process workers; out-of-process workers find the job by polling
+        self.notify = notify
+
+    async def submit(self, inputs: Dict[str, Any], user: str, response_mode: str = "blocking") -> IngestionJob:
+        job = await self.job_repository.create(
+            IngestionJob(user=user, inputs=inputs, response_mode=response_mode)
+        )
+        if self.notify:
+            self.notify()
+        return job
+
+    async def get_job(self, id: UUID) -> Optional[IngestionJob]:
+        return await self.job_repository.get_by_id(id)
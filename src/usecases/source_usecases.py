@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from uuid import UUID
 from domain.entities.source import Source
 from ports.repositories.source_repository import SourceRepository
@@ -26,4 +26,7 @@ class SourceUseCases:
     async def upsert(self, domain: str) -> Source:
         source = Source(domain=domain)
         return await self.source_repository.upsert(source)
-        return None
\ No newline at end of file
+
+    async def upsert_many(self, domains: List[str]) -> Dict[str, Source]:
+        sources = await self.source_repository.upsert_many([Source(domain=domain) for domain in domains])
+        return {source.domain: source for source in sources}
\ No newline at end of file
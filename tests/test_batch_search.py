@@ -0,0 +1,117 @@
+import asyncio
+from collections import namedtuple
+from datetime import datetime
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from adapters.repositories.in_memory.repositories import InMemoryChunkRepository
+from adapters.repositories.sqlalchemy.chunk_repository import SQLAlchemyChunkRepository
+from adapters.repositories.sqlalchemy.models import ChunkModel
+from adapters.services.local_vector_service import HashingVectorService
+from core.config import settings
+from domain.entities.chunk import Chunk
+from domain.value_objects.embedding import Embedding
+from ports.http.v1.routes import chunks
+from usecases.chunk_usecases import ChunkUseCases
+
+def unit(*components):
+    vector = np.array(components, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+def embedding(*components):
+    return Embedding(vector=unit(*components), model="m")
+
+def test_in_memory_results_follow_query_order_with_per_query_limit_and_threshold():
+    repository = InMemoryChunkRepository(dimension=3)
+    stored = {
+        name: asyncio.run(repository.create(Chunk(
+            id=uuid4(), content_id=uuid4(), sequence=1, text=name,
+            embedding=unit(*vector), embedding_model="m"
+        )))
+        for name, vector in {"x": (1, 0, 0), "xy": (1, 1, 0), "y": (0, 1, 0), "z": (0, 0, 1)}.items()
+    }
+
+    results = asyncio.run(repository.find_similar_many(
+        [embedding(0, 1, 0), embedding(1, 0, 0), embedding(-1, -1, -1)], limit=2, threshold=0.5
+    ))
+
+    assert [[chunk.text for chunk, _ in matches] for matches in results] == [["y", "xy"], ["x", "xy"], []]
+    assert all(score >= 0.5 for matches in results for _, score in matches)
+    assert results[0][0][0].id == stored["y"].id
+
+Row = namedtuple("Row", ["query_index", "chunk", "distance"])
+
+class BatchSession:
+    """Returns canned (query_index, chunk, distance) rows for the search statement"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+        rows = self.rows
+
+        class Result:
+            def all(self):
+                return rows
+        return Result()
+
+def chunk_model(text):
+    return ChunkModel(id=uuid4(), content_id=uuid4(), sequence=1, text=text, created_at=datetime(2026, 1, 1))
+
+def test_sql_rows_are_grouped_by_query_sorted_and_thresholded():
+    a, b, c = chunk_model("a"), chunk_model("b"), chunk_model("c")
+    # LATERAL rows come back interleaved and not necessarily in distance order
+    session = BatchSession([
+        Row(1, a, 0.1), Row(0, b, 0.3), Row(0, c, 0.05), Row(1, b, 0.45), Row(2, c, 0.9),
+    ])
+    query = Embedding(vector=np.ones(settings.VECTOR_DIMENSION, dtype=np.float32), model=settings.EMBEDDING_MODEL)
+
+    results = asyncio.run(SQLAlchemyChunkRepository(session).find_similar_many([query] * 3, limit=2, threshold=0.6))
+
+    assert [[chunk.text for chunk, _ in matches] for matches in results] == [["c", "b"], ["a"], []]
+    assert [round(score, 2) for score in (score for matches in results for _, score in matches)] == [0.95, 0.7, 0.9]
+
+def test_sql_empty_batch_makes_no_round_trip():
+    session = BatchSession([])
+
+    assert asyncio.run(SQLAlchemyChunkRepository(session).find_similar_many([])) == []
+    assert session.statements == []
+
+@pytest.fixture
+def client():
+    usecases = ChunkUseCases(InMemoryChunkRepository(dimension=64), HashingVectorService("hashing@64"))
+    content_id = uuid4()
+    for sequence, text in enumerate(["red apples", "green pears", "blue plums"], start=1):
+        asyncio.run(usecases.create_chunk_with_embedding(content_id, sequence, text))
+    app = FastAPI()
+    app.include_router(chunks.router, prefix="/chunks")
+    app.dependency_overrides[chunks.get_chunk_usecases] = lambda: usecases
+    return TestClient(app)
+
+def test_batch_route_answers_in_query_order(client):
+    queries = ["blue plums", "red apples", "green pears"]
+
+    response = client.post("/chunks/search/batch", json={"queries": queries, "limit": 1, "threshold": 0.99})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["query"] for result in body] == queries
+    assert [[match["chunk"]["text"] for match in result["results"]] for result in body] == [[q] for q in queries]
+
+@pytest.mark.parametrize("count", [0, settings.SEARCH_BATCH_MAX_QUERIES + 1])
+def test_batch_route_rejects_empty_or_oversized_batches(client, count):
+    response = client.post("/chunks/search/batch", json={"queries": ["q"] * count})
+
+    assert response.status_code == 422
+
+def test_batch_route_accepts_the_maximum(client):
+    response = client.post("/chunks/search/batch", json={"queries": ["q"] * settings.SEARCH_BATCH_MAX_QUERIES})
+
+    assert response.status_code == 200
+    assert len(response.json()) == settings.SEARCH_BATCH_MAX_QUERIES
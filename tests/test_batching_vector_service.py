@@ -0,0 +1,100 @@
+import asyncio
+from typing import List
+
+import numpy as np
+import pytest
+
+from adapters.services.batching_vector_service import MicroBatchingVectorService
+from domain.value_objects.embedding import Embedding
+from ports.services.vector_service import VectorService
+
+class GatedVectorService(VectorService):
+    """Records batch calls; each one waits for ``release`` unless it is set"""
+
+    def __init__(self):
+        self.calls: List[List[str]] = []
+        self.release = asyncio.Event()
+        self.error: Exception | None = None
+
+    @property
+    def model(self) -> str:
+        return "fake"
+
+    async def generate_embedding(self, text: str) -> Embedding:
+        raise AssertionError("the batcher only sends batches")
+
+    async def batch_generate_embeddings(self, texts: List[str]) -> List[Embedding]:
+        self.calls.append(list(texts))
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return [Embedding(vector=np.full(2, len(text), dtype=np.float32), model=self.model) for text in texts]
+
+    async def compute_similarity(self, embedding1: Embedding, embedding2: Embedding) -> float:
+        return 0.0
+
+def test_lone_request_is_sent_without_waiting():
+    async def run():
+        inner = GatedVectorService()
+        inner.release.set()
+        batcher = MicroBatchingVectorService(inner, max_wait=60.0)
+        return inner, await asyncio.wait_for(batcher.generate_embedding("hello"), timeout=1.0)
+
+    inner, embedding = asyncio.run(run())
+    assert inner.calls == [["hello"]]
+    assert embedding.vector[0] == 5
+
+def test_requests_arriving_during_a_dispatch_share_the_next_batch():
+    async def run():
+        inner = GatedVectorService()
+        batcher = MicroBatchingVectorService(inner, max_wait=0.01)
+        first = asyncio.create_task(batcher.generate_embedding("first"))
+        await asyncio.sleep(0)
+        rest = [asyncio.create_task(batcher.generate_embedding(text)) for text in ["a", "bb", "a"]]
+        await asyncio.sleep(0.05)
+        inner.release.set()
+        return inner, batcher, await first, await asyncio.gather(*rest)
+
+    inner, batcher, first, rest = asyncio.run(run())
+    # Duplicate texts within a batch are embedded once
+    assert inner.calls == [["first"], ["a", "bb"]]
+    assert [embedding.vector[0] for embedding in rest] == [1, 2, 1]
+    assert batcher.stats()["batches"] == 2
+
+def test_full_batch_is_flushed_early():
+    async def run():
+        inner = GatedVectorService()
+        inner.release.set()
+        batcher = MicroBatchingVectorService(inner, max_wait=60.0, max_batch_size=2)
+        blocker = asyncio.create_task(batcher.generate_embedding("x"))
+        tasks = [asyncio.create_task(batcher.generate_embedding(text)) for text in ["a", "b"]]
+        return inner, await asyncio.wait_for(asyncio.gather(blocker, *tasks), timeout=1.0)
+
+    inner, _ = asyncio.run(run())
+    assert inner.calls == [["x"], ["a", "b"]]
+
+def test_upstream_error_reaches_every_caller():
+    async def run():
+        inner = GatedVectorService()
+        inner.error = RuntimeError("upstream down")
+        batcher = MicroBatchingVectorService(inner, max_wait=0.01)
+        tasks = [asyncio.create_task(batcher.generate_embedding(text)) for text in ["a", "b", "c"]]
+        await asyncio.sleep(0.05)
+        inner.release.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+def test_cancelled_dispatch_does_not_leave_callers_hanging():
+    async def run():
+        inner = GatedVectorService()
+        batcher = MicroBatchingVectorService(inner, max_wait=0.01)
+        caller = asyncio.create_task(batcher.generate_embedding("hello"))
+        await asyncio.sleep(0)
+        for dispatch in list(batcher._dispatches):
+            dispatch.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(caller, timeout=1.0)
+
+    asyncio.run(run())
@@ -0,0 +1,115 @@
+import asyncio
+from typing import Dict, List
+
+import numpy as np
+
+from adapters.services.cached_vector_service import CachedVectorService, LRUCache, text_hash
+from domain.value_objects.embedding import Embedding
+from ports.repositories.embedding_cache_repository import EmbeddingCacheRepository
+from ports.services.vector_service import VectorService
+
+class CountingVectorService(VectorService):
+    """Records every upstream batch; vectors encode the text length"""
+
+    def __init__(self, model: str = "fake"):
+        self._model = model
+        self.calls: List[List[str]] = []
+
+    @property
+    def model(self) -> str:
+        return self._model
+
+    async def generate_embedding(self, text: str) -> Embedding:
+        return (await self.batch_generate_embeddings([text]))[0]
+
+    async def batch_generate_embeddings(self, texts: List[str]) -> List[Embedding]:
+        self.calls.append(list(texts))
+        return [Embedding(vector=np.full(4, len(text), dtype=np.float32), model=self.model) for text in texts]
+
+    async def compute_similarity(self, embedding1: Embedding, embedding2: Embedding) -> float:
+        return 0.0
+
+class DictStore(EmbeddingCacheRepository):
+    def __init__(self):
+        self.vectors: Dict[tuple, np.ndarray] = {}
+
+    async def get_many(self, model: str, text_hashes: List[str]) -> Dict[str, np.ndarray]:
+        return {h: self.vectors[(model, h)] for h in text_hashes if (model, h) in self.vectors}
+
+    async def put_many(self, model: str, vectors: Dict[str, np.ndarray]) -> None:
+        self.vectors.update({(model, h): vector for h, vector in vectors.items()})
+
+class BrokenStore(EmbeddingCacheRepository):
+    async def get_many(self, model, text_hashes):
+        raise ConnectionError("store down")
+
+    async def put_many(self, model, vectors):
+        raise ConnectionError("store down")
+
+def embed(service, texts):
+    return asyncio.run(service.batch_generate_embeddings(texts))
+
+def test_duplicates_within_a_batch_are_embedded_once():
+    inner = CountingVectorService()
+    service = CachedVectorService(inner)
+
+    result = embed(service, ["a", "bb", "a", "bb", "ccc"])
+
+    assert inner.calls == [["a", "bb", "ccc"]]
+    assert [float(e.vector[0]) for e in result] == [1, 2, 1, 2, 3]
+    assert service.stats()["misses"] == 3
+
+def test_memory_hits_skip_the_store_and_upstream():
+    inner, store = CountingVectorService(), DictStore()
+    service = CachedVectorService(inner, store=store)
+    embed(service, ["a", "bb"])
+
+    result = embed(service, ["bb", "a"])
+
+    assert inner.calls == [["a", "bb"]]
+    assert [float(e.vector[0]) for e in result] == [2, 1]
+    assert service.stats()["memory_hits"] == 2
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_size=2)
+    cache.put(("m", "a"), np.zeros(1))
+    cache.put(("m", "b"), np.zeros(1))
+    cache.get(("m", "a"))
+    cache.put(("m", "c"), np.zeros(1))
+
+    assert cache.get(("m", "b")) is None
+    assert cache.get(("m", "a")) is not None and cache.get(("m", "c")) is not None
+    assert len(cache) == 2
+
+def test_evicted_entries_are_refilled_from_the_store():
+    inner, store = CountingVectorService(), DictStore()
+    service = CachedVectorService(inner, store=store, max_size=1)
+    embed(service, ["a", "bb"])
+
+    embed(service, ["a"])
+
+    assert inner.calls == [["a", "bb"]]
+    assert service.stats()["store_hits"] == 1
+
+def test_store_failures_degrade_to_misses():
+    inner = CountingVectorService()
+    service = CachedVectorService(inner, store=BrokenStore())
+
+    first = embed(service, ["a"])
+    second = embed(service, ["a"])
+
+    assert [float(e.vector[0]) for e in first + second] == [1, 1]
+    # The lookup failed, so the first call went upstream; the LRU served the second
+    assert inner.calls == [["a"]]
+    assert (service.stats()["misses"], service.stats()["memory_hits"]) == (1, 1)
+
+def test_models_never_share_entries():
+    store = DictStore()
+    small, large = CountingVectorService("m@256"), CountingVectorService("m@1536")
+    embed(CachedVectorService(small, store=store), ["same text"])
+
+    result = embed(CachedVectorService(large, store=store), ["same text"])
+
+    assert large.calls == [["same text"]]
+    assert result[0].model == "m@1536"
+    assert set(store.vectors) == {("m@256", text_hash("same text")), ("m@1536", text_hash("same text"))}
@@ -0,0 +1,95 @@
+import asyncio
+import json
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.dialects import postgresql
+
+from adapters.repositories.in_memory.repositories import InMemoryChunkRepository
+from adapters.repositories.sqlalchemy.chunk_repository import SQLAlchemyChunkRepository
+from adapters.services.local_vector_service import HashingVectorService
+from domain.entities.chunk import Chunk
+from ports.http.v1.routes import chunks
+from usecases.chunk_usecases import ChunkUseCases
+
+CONTENT_ID = uuid4()
+
+@pytest.fixture
+def repository():
+    repository = InMemoryChunkRepository(dimension=8)
+    # Sequences repeat, as in data created through POST /chunks or
+    # ingested before chunks were diffed
+    for sequence in (1, 2, 2, 2, 3, 3, 4):
+        asyncio.run(repository.create(Chunk(
+            id=uuid4(), content_id=CONTENT_ID, sequence=sequence, text=f"chunk {sequence}",
+            embedding=np.ones(8, dtype=np.float32)
+        )))
+    return repository
+
+@pytest.fixture
+def client(repository):
+    app = FastAPI()
+    app.include_router(chunks.router, prefix="/chunks")
+    usecases = ChunkUseCases(repository, HashingVectorService("hashing@8"))
+    app.dependency_overrides[chunks.get_chunk_usecases] = lambda: usecases
+    return TestClient(app)
+
+def all_chunk_ids(repository):
+    return [chunk.id for chunk in asyncio.run(repository.get_by_content_id(CONTENT_ID))]
+
+def test_pages_follow_the_link_header_without_skipping_repeated_sequences(client, repository):
+    seen, url, pages = [], f"/chunks/content/{CONTENT_ID}?limit=2", 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        seen.extend(chunk["id"] for chunk in response.json())
+        pages += 1
+        url = response.links.get("next", {}).get("url")
+
+    assert seen == [str(id) for id in all_chunk_ids(repository)]
+    assert pages == 4
+
+def test_last_page_has_no_link(client):
+    response = client.get(f"/chunks/content/{CONTENT_ID}?limit=7")
+
+    assert len(response.json()) == 7
+    assert "link" not in response.headers
+
+def test_malformed_cursor_is_rejected(client):
+    for after in ("3", "x:y", f"three:{uuid4()}"):
+        assert client.get(f"/chunks/content/{CONTENT_ID}", params={"after": after}).status_code == 400
+
+def test_ndjson_streams_every_chunk_in_order(client, repository):
+    response = client.get(f"/chunks/content/{CONTENT_ID}", headers={"accept": "application/x-ndjson"})
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["id"] for row in rows] == [str(id) for id in all_chunk_ids(repository)]
+    assert [row["sequence"] for row in rows] == [1, 2, 2, 2, 3, 3, 4]
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+
+        class Result:
+            def scalars(self):
+                class Scalars:
+                    def all(self):
+                        return []
+                return Scalars()
+        return Result()
+
+def test_sql_seeks_and_orders_on_sequence_and_id():
+    session = RecordingSession()
+
+    asyncio.run(SQLAlchemyChunkRepository(session).get_by_content_id(CONTENT_ID, limit=3, after=(2, uuid4())))
+
+    [sql] = session.statements
+    assert "(chunks.sequence, chunks.id) > (%(param_1)s::INTEGER, %(param_2)s::UUID)" in sql
+    assert "ORDER BY chunks.sequence, chunks.id" in sql
@@ -0,0 +1,36 @@
+import asyncio
+from uuid import uuid4
+
+from adapters.repositories.in_memory.repositories import InMemoryChunkRepository
+from adapters.services.local_vector_service import HashingVectorService
+from domain.value_objects.text_chunk import TextChunk
+from usecases.chunk_usecases import ChunkUseCases
+
+def make_usecases():
+    return ChunkUseCases(
+        InMemoryChunkRepository(dimension=16),
+        HashingVectorService("hashing@16"),
+        count_tokens=lambda text: len(text.split())
+    )
+
+def test_created_chunk_is_fingerprinted_and_counted():
+    usecases = make_usecases()
+
+    chunk = asyncio.run(usecases.create_chunk_with_embedding(uuid4(), 1, "three word text"))
+
+    assert chunk.text_hash == TextChunk("three word text", 0, 0).text_hash
+    assert (chunk.token_count, chunk.char_count) == (3, 15)
+    assert chunk.embedding_model == "hashing@16"
+
+def test_reingestion_keeps_a_chunk_created_through_the_api():
+    usecases = make_usecases()
+    content_id = uuid4()
+    created = asyncio.run(usecases.create_chunk_with_embedding(content_id, 1, "kept text"))
+
+    sync = asyncio.run(usecases.sync_chunks(content_id, [
+        TextChunk("kept text", 2, 9), TextChunk("new text", 2, 8)
+    ]))
+
+    assert (sync.kept, sync.deleted, len(sync.added)) == (1, 0, 1)
+    stored = asyncio.run(usecases.get_chunks_by_content(content_id))
+    assert [chunk.id for chunk in stored][0] == created.id
@@ -0,0 +1,129 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+from adapters.repositories.in_memory.repositories import (
+    InMemoryChunkRepository, InMemoryContentRepository, InMemorySourceRepository
+)
+from adapters.services.local_vector_service import HashingVectorService
+from adapters.services.text_chunkers import SentenceChunker
+from core.config import settings
+from usecases.chunk_usecases import ChunkEmbedder, ChunkUseCases
+from usecases.content_usecases import ContentUseCases
+from usecases.dify_usecases import DifyUsecases, IngestionUnit
+from usecases.source_usecases import SourceUseCases
+
+DOCUMENTS = {
+    "https://a.example/one": "First page. It has two sentences.",
+    "https://a.example/two": "This page will boom when stored.",
+    "https://b.example/three": "Third page on another domain.",
+}
+
+class FakeDifyAdapter:
+    def __init__(self, documents):
+        self.output = json.dumps({"url": list(documents), "contents": list(documents.values())})
+
+    async def run_workflow(self, inputs, user, response_mode="blocking"):
+        return {"data": {"outputs": {"output": self.output}}}
+
+    async def stream_workflow(self, inputs, user):
+        yield {"event": "workflow_finished", "data": {"status": "succeeded", "outputs": {"output": self.output}}}
+
+class FailingChunkRepository(InMemoryChunkRepository):
+    async def sync_content_chunks(self, content_id, new_chunks, resequence, stale_ids):
+        if any("boom" in chunk.text for chunk in new_chunks):
+            raise RuntimeError("database error")
+        return await super().sync_content_chunks(content_id, new_chunks, resequence, stale_ids)
+
+class OutsideUnitsVectorService(HashingVectorService):
+    """Fails if an embedding call is made while a unit of work is open"""
+
+    def __init__(self, units, model):
+        super().__init__(model)
+        self.units = units
+
+    async def batch_generate_embeddings(self, texts):
+        assert self.units.active == 0, "embedding call inside a unit of work"
+        return await super().batch_generate_embeddings(texts)
+
+class Units:
+    """Hands out use cases over shared in-memory stores, counting units opened"""
+
+    def __init__(self):
+        self.sources = InMemorySourceRepository()
+        self.contents = InMemoryContentRepository()
+        self.chunks = FailingChunkRepository(dimension=64)
+        self.vector_service = OutsideUnitsVectorService(self, "hashing@64")
+        self.opened = 0
+        self.active = 0
+
+    def unit(self):
+        return IngestionUnit(
+            SourceUseCases(self.sources),
+            ContentUseCases(self.contents),
+            ChunkUseCases(self.chunks, self.vector_service)
+        )
+
+    @asynccontextmanager
+    async def __call__(self):
+        self.opened += 1
+        self.active += 1
+        try:
+            yield self.unit()
+        finally:
+            self.active -= 1
+
+def make_usecases(units):
+    return DifyUsecases(
+        FakeDifyAdapter(DOCUMENTS),
+        ChunkEmbedder(units.vector_service),
+        unit_of_work=units,
+        chunker=SentenceChunker(50, 0, lambda text: len(text.split()), 20_000)
+    )
+
+@pytest.mark.parametrize("streaming", [False, True])
+def test_failed_document_does_not_affect_the_others(streaming):
+    units = Units()
+    usecases = make_usecases(units)
+    run = usecases.process_dify_workflow_streaming if streaming else usecases.process_dify_workflow
+
+    results = asyncio.run(run({}, "user"))
+
+    statuses = {result["url"]: result["status"] for result in results}
+    assert statuses == {
+        "https://a.example/one": "succeeded",
+        "https://a.example/two": "failed",
+        "https://b.example/three": "succeeded",
+    }
+    assert len(units.chunks.chunks) == 2
+    # Every document's database work ran in a unit of its own
+    assert units.opened >= len(DOCUMENTS)
+
+def test_rerun_skips_unchanged_documents():
+    units = Units()
+    asyncio.run(make_usecases(units).process_dify_workflow({}, "user"))
+
+    results = asyncio.run(make_usecases(units).process_dify_workflow_streaming({}, "user"))
+
+    statuses = {result["url"]: result["status"] for result in results}
+    assert statuses["https://a.example/one"] == "unchanged"
+    assert statuses["https://b.example/three"] == "unchanged"
+    assert len(units.chunks.chunks) == 2
+
+@pytest.mark.parametrize("min_chars, offloaded", [(10, True), (10**9, False)])
+def test_large_workflow_output_is_parsed_in_a_thread(monkeypatch, min_chars, offloaded):
+    to_thread, threaded = asyncio.to_thread, []
+
+    async def recording_to_thread(func, *args):
+        threaded.append(func)
+        return await to_thread(func, *args)
+
+    monkeypatch.setattr(settings, "CPU_OFFLOAD_MIN_CHARS", min_chars)
+    monkeypatch.setattr(asyncio, "to_thread", recording_to_thread)
+
+    results = asyncio.run(make_usecases(Units()).process_dify_workflow({}, "user"))
+
+    assert len(results) == len(DOCUMENTS)
+    assert (json.loads in threaded) == offloaded
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+
+from adapters.http_client import IDEMPOTENT_METHODS, RetryTransport
+
+class ScriptedTransport(httpx.AsyncBaseTransport):
+    """Plays back one outcome per attempt: a status code or an exception"""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.attempts = 0
+
+    async def handle_async_request(self, request):
+        outcome = self.outcomes[min(self.attempts, len(self.outcomes) - 1)]
+        self.attempts += 1
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, request=request)
+
+def send(inner, method, **kwargs):
+    async def run():
+        transport = RetryTransport(inner, max_attempts=3, backoff_base=0, **kwargs)
+        async with httpx.AsyncClient(transport=transport) as client:
+            return await client.request(method, "http://dify.test/v1/workflows/run")
+    return asyncio.run(run())
+
+@pytest.mark.parametrize("method", ["GET", "PUT", "DELETE"])
+def test_idempotent_requests_are_retried_on_server_errors(method):
+    inner = ScriptedTransport(503, 502, 200)
+
+    assert send(inner, method).status_code == 200
+    assert inner.attempts == 3
+
+def test_post_is_not_replayed_after_a_server_error():
+    inner = ScriptedTransport(503, 200)
+
+    assert send(inner, "POST").status_code == 503
+    assert inner.attempts == 1
+
+def test_post_is_not_replayed_after_a_dropped_connection():
+    inner = ScriptedTransport(httpx.RemoteProtocolError("server disconnected"), 200)
+
+    with pytest.raises(httpx.RemoteProtocolError):
+        send(inner, "POST")
+    assert inner.attempts == 1
+
+@pytest.mark.parametrize("error", [httpx.ConnectError("refused"), httpx.ConnectTimeout("timed out")])
+def test_post_is_retried_when_it_never_reached_the_server(error):
+    inner = ScriptedTransport(error, 200)
+
+    assert send(inner, "POST").status_code == 200
+    assert inner.attempts == 2
+
+def test_callers_can_opt_post_into_retries():
+    inner = ScriptedTransport(httpx.RemoteProtocolError("server disconnected"), 429, 200)
+
+    assert send(inner, "POST", retry_methods=IDEMPOTENT_METHODS | {"post"}).status_code == 200
+    assert inner.attempts == 3
+
+def test_last_attempt_returns_the_error_response():
+    inner = ScriptedTransport(500)
+
+    assert send(inner, "GET").status_code == 500
+    assert inner.attempts == 3
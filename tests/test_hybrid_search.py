@@ -0,0 +1,42 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+
+from adapters.repositories.in_memory.repositories import InMemoryChunkRepository
+from domain.entities.chunk import Chunk
+from usecases.chunk_usecases import reciprocal_rank_fusion
+
+def make_chunk(text="text"):
+    return Chunk(content_id=uuid4(), sequence=0, text=text)
+
+def test_rrf_scores_sum_reciprocal_ranks():
+    a, b, c = make_chunk(), make_chunk(), make_chunk()
+
+    fused = reciprocal_rank_fusion([[(a, 9.0), (b, 5.0)], [(b, 0.9), (c, 0.8)]], k=60)
+
+    scores = {chunk.id: score for chunk, score in fused}
+    assert scores[a.id] == pytest.approx(1 / 61)
+    assert scores[b.id] == pytest.approx(1 / 62 + 1 / 61)
+    assert scores[c.id] == pytest.approx(1 / 62)
+    # Found by both rankers beats first place in just one
+    assert [chunk.id for chunk, _ in fused] == [b.id, a.id, c.id]
+
+def test_rrf_ignores_raw_scores_and_handles_empty_lists():
+    a, b = make_chunk(), make_chunk()
+
+    fused = reciprocal_rank_fusion([[(a, 0.01), (b, 1000.0)], []])
+
+    assert [chunk.id for chunk, _ in fused] == [a.id, b.id]
+    assert reciprocal_rank_fusion([[], []]) == []
+
+def test_in_memory_lexical_ranks_by_matched_terms():
+    repository = InMemoryChunkRepository(dimension=4)
+    both = make_chunk("vector search with postgres")
+    one = make_chunk("postgres tuning")
+    none = make_chunk("unrelated")
+    asyncio.run(repository.batch_create([both, one, none]))
+
+    results = asyncio.run(repository.find_lexical("postgres vector"))
+
+    assert [(chunk.id, score) for chunk, score in results] == [(both.id, 1.0), (one.id, 0.5)]
@@ -0,0 +1,96 @@
+import asyncio
+from uuid import uuid4
+
+import numpy as np
+
+from adapters.repositories.in_memory.repositories import InMemoryChunkRepository
+from domain.entities.chunk import Chunk
+from domain.value_objects.embedding import Embedding
+
+MODEL = "test-model"
+
+def make_chunks(count, dimension=8, seed=0):
+    rng = np.random.default_rng(seed)
+    content_id = uuid4()
+    return [
+        Chunk(
+            content_id=content_id,
+            sequence=i,
+            text=f"chunk {i}",
+            embedding=rng.standard_normal(dimension).astype(np.float32),
+            embedding_model=MODEL
+        )
+        for i in range(count)
+    ]
+
+def test_batch_create_then_find_similar_ranks_exact_match_first():
+    repository = InMemoryChunkRepository(dimension=8)
+    chunks = make_chunks(20)
+    asyncio.run(repository.batch_create(chunks))
+
+    target = chunks[7]
+    results = asyncio.run(repository.find_similar(
+        Embedding(vector=target.embedding, model=MODEL), limit=5, threshold=-1.0
+    ))
+
+    assert len(results) == 5
+    assert results[0][0].id == target.id
+    assert abs(results[0][1] - 1.0) < 1e-5
+    assert [score for _, score in results] == sorted((score for _, score in results), reverse=True)
+    # Reads leave the embedding out unless asked for
+    assert results[0][0].embedding is None
+
+def test_find_similar_applies_threshold():
+    repository = InMemoryChunkRepository(dimension=8)
+    chunks = make_chunks(10)
+    asyncio.run(repository.batch_create(chunks))
+
+    results = asyncio.run(repository.find_similar(
+        Embedding(vector=chunks[0].embedding, model=MODEL), limit=10, threshold=0.99
+    ))
+
+    assert [chunk.id for chunk, _ in results] == [chunks[0].id]
+
+def test_find_similar_unknown_model_returns_nothing():
+    repository = InMemoryChunkRepository(dimension=8)
+    asyncio.run(repository.batch_create(make_chunks(3)))
+
+    assert asyncio.run(repository.find_similar(Embedding(vector=np.ones(8), model="other"))) == []
+
+def test_persist_load_persist_round_trip(tmp_path):
+    path = str(tmp_path / "store")
+    repository = InMemoryChunkRepository(dimension=8)
+    chunks = make_chunks(50)
+    asyncio.run(repository.batch_create(chunks))
+    repository.persist(path)
+
+    # Loaded matrices are memory-mapped from the files persist rewrites
+    loaded = InMemoryChunkRepository.load(path)
+    loaded.persist(path)
+    reloaded = InMemoryChunkRepository.load(path)
+
+    query = Embedding(vector=chunks[3].embedding, model=MODEL)
+    expected = asyncio.run(repository.find_similar(query, limit=5, threshold=-1.0))
+    actual = asyncio.run(reloaded.find_similar(query, limit=5, threshold=-1.0))
+    assert [chunk.id for chunk, _ in actual] == [chunk.id for chunk, _ in expected]
+    assert np.allclose([score for _, score in actual], [score for _, score in expected])
+    assert len(reloaded.chunks) == 50
+    assert not list(tmp_path.glob("*.tmp"))
+
+def test_loaded_store_accepts_writes(tmp_path):
+    path = str(tmp_path / "store")
+    repository = InMemoryChunkRepository(dimension=8)
+    asyncio.run(repository.batch_create(make_chunks(5)))
+    repository.persist(path)
+
+    loaded = InMemoryChunkRepository.load(path)
+    extra = make_chunks(1, seed=1)[0]
+    asyncio.run(loaded.create(extra))
+    loaded.persist(path)
+
+    reloaded = InMemoryChunkRepository.load(path)
+    results = asyncio.run(reloaded.find_similar(
+        Embedding(vector=extra.embedding, model=MODEL), limit=1, threshold=-1.0
+    ))
+    assert results[0][0].id == extra.id
+    assert len(reloaded.chunks) == 6
@@ -0,0 +1,37 @@
+import asyncio
+from uuid import uuid4
+
+from adapters.repositories.in_memory.repositories import InMemoryContentRepository
+from domain.entities.content import Content
+
+def make_content(raw_content="<html>page</html>"):
+    return Content(url="https://example.com/a", url_hash="hash-a", source_id=uuid4(), raw_content=raw_content)
+
+def test_reads_leave_raw_content_out_unless_requested():
+    repository = InMemoryContentRepository()
+    content = asyncio.run(repository.save(make_content()))
+
+    assert asyncio.run(repository.get_by_id(content.id)).raw_content is None
+    assert asyncio.run(repository.get_by_url_hash("hash-a")).raw_content is None
+    assert asyncio.run(repository.get_by_source_id(content.source_id))[0].raw_content is None
+    assert asyncio.run(repository.get_by_id(content.id, with_raw_content=True)).raw_content == "<html>page</html>"
+
+def test_get_then_save_keeps_raw_content():
+    repository = InMemoryContentRepository()
+    content = asyncio.run(repository.save(make_content()))
+
+    loaded = asyncio.run(repository.get_by_id(content.id))
+    loaded.status = "processed"
+    asyncio.run(repository.save(loaded))
+
+    stored = asyncio.run(repository.get_by_id(content.id, with_raw_content=True))
+    assert stored.status == "processed"
+    assert stored.raw_content == "<html>page</html>"
+
+def test_save_replaces_raw_content_when_given():
+    repository = InMemoryContentRepository()
+    asyncio.run(repository.save(make_content()))
+    content = asyncio.run(repository.save(make_content("<html>new</html>")))
+
+    assert asyncio.run(repository.get_by_id(content.id, with_raw_content=True)).raw_content == "<html>new</html>"
+    assert len(repository.contents) == 1
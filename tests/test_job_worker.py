@@ -0,0 +1,177 @@
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from adapters.job_worker import JobWorkerPool
+from adapters.repositories.in_memory.repositories import InMemoryJobRepository
+from adapters.repositories.sqlalchemy.job_repository import SQLAlchemyJobRepository
+from domain.entities.job import IngestionJob
+
+@asynccontextmanager
+async def no_session():
+    yield None
+
+def make_pool(jobs, handler, **kwargs):
+    kwargs = {"concurrency": 1, "poll_interval": 0.01, "heartbeat_interval": 0.05, "stale_after": 0.2, **kwargs}
+    return JobWorkerPool(no_session, handler, repository=lambda session: jobs, **kwargs)
+
+async def run_until_finished(pool, jobs, timeout=2.0):
+    await pool.start()
+    try:
+        async with asyncio.timeout(timeout):
+            while any(job.status in ("queued", "running") for job in jobs.jobs.values()):
+                await asyncio.sleep(0.01)
+    finally:
+        await pool.stop()
+
+def queue(jobs, count):
+    start = datetime(2026, 1, 1)
+    return [
+        asyncio.run(jobs.create(IngestionJob(user="u", inputs={"n": i}, created_at=start + timedelta(seconds=i))))
+        for i in range(count)
+    ]
+
+def test_claim_takes_the_oldest_queued_job():
+    jobs = InMemoryJobRepository()
+    first, second = queue(jobs, 2)
+
+    claimed = [asyncio.run(jobs.claim_next()) for _ in range(3)]
+
+    assert [job and job.id for job in claimed] == [first.id, second.id, None]
+    assert first.status == "running" and first.started_at is not None
+
+def test_requeue_only_touches_jobs_without_a_recent_heartbeat():
+    jobs = InMemoryJobRepository()
+    live, dead, done = queue(jobs, 3)
+    for job in (live, dead, done):
+        asyncio.run(jobs.claim_next())
+    asyncio.run(jobs.finish(done.id, "succeeded"))
+    for job in (live, dead, done):
+        jobs.updated_at[job.id] -= timedelta(minutes=20)
+    asyncio.run(jobs.heartbeat(live.id))
+
+    assert asyncio.run(jobs.requeue_stale(600)) == 1
+    assert (live.status, dead.status, done.status) == ("running", "queued", "succeeded")
+    assert dead.started_at is None
+
+@pytest.mark.parametrize("outcome, status, error", [
+    (None, "succeeded", None),
+    ("one.example: boom", "completed_with_errors", "one.example: boom"),
+    (RuntimeError("all failed"), "failed", "all failed"),
+])
+def test_job_is_finished_with_the_handler_outcome(outcome, status, error):
+    jobs = InMemoryJobRepository()
+    [job] = queue(jobs, 1)
+
+    async def handler(job, report_progress):
+        await report_progress(3, 7)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    asyncio.run(run_until_finished(make_pool(jobs, handler), jobs))
+
+    assert (job.status, job.error) == (status, error)
+    assert (job.documents_processed, job.chunks_processed) == (3, 7)
+
+def test_worker_survives_a_failed_finish():
+    class FlakyFinish(InMemoryJobRepository):
+        async def finish(self, id, status, error=None):
+            if self.jobs[id].inputs["n"] == 0:
+                raise ConnectionResetError("connection reset")
+            await super().finish(id, status, error)
+
+    jobs = FlakyFinish()
+    first, second = queue(jobs, 2)
+
+    async def handler(job, report_progress):
+        return None
+
+    async def run():
+        pool = make_pool(jobs, handler, heartbeat_interval=60, stale_after=600)
+        await pool.start()
+        try:
+            async with asyncio.timeout(2):
+                while second.status != "succeeded":
+                    await asyncio.sleep(0.01)
+        finally:
+            await pool.stop()
+
+    asyncio.run(run())
+
+    # The single worker went on to the next job; the first awaits requeueing
+    assert first.status == "running"
+
+def test_heartbeat_keeps_a_long_job_from_being_requeued():
+    jobs = InMemoryJobRepository()
+    [job] = queue(jobs, 1)
+    runs = []
+
+    async def handler(job, report_progress):
+        runs.append(job.id)
+        # Several times stale_after, with no progress reported
+        await asyncio.sleep(0.6)
+
+    async def run():
+        pool = make_pool(jobs, handler)
+        other = make_pool(jobs, handler)
+        await pool.start()
+        await asyncio.sleep(0.4)
+        # A second worker process starting up must leave the live job alone
+        await other.start()
+        try:
+            await run_until_finished(pool, jobs)
+        finally:
+            await other.stop()
+
+    asyncio.run(run())
+
+    assert job.status == "succeeded"
+    assert runs == [job.id]
+
+def test_pool_rejects_a_stale_limit_within_the_heartbeat_interval():
+    with pytest.raises(ValueError):
+        make_pool(InMemoryJobRepository(), None, heartbeat_interval=60, stale_after=60)
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+
+        class Result:
+            rowcount = 0
+
+            def scalar_one_or_none(self):
+                return None
+        return Result()
+
+    async def commit(self):
+        self.commits += 1
+
+    async def rollback(self):
+        pass
+
+def test_sql_claim_skips_jobs_locked_by_other_workers():
+    session = RecordingSession()
+
+    assert asyncio.run(SQLAlchemyJobRepository(session).claim_next()) is None
+    assert "FOR UPDATE SKIP LOCKED" in session.statements[0]
+
+def test_sql_heartbeat_and_requeue_only_touch_running_jobs():
+    session = RecordingSession()
+    jobs = SQLAlchemyJobRepository(session)
+
+    asyncio.run(jobs.heartbeat(IngestionJob(user="u", inputs={}).id))
+    asyncio.run(jobs.requeue_stale(600))
+
+    heartbeat, requeue = session.statements
+    assert "ingestion_jobs.status = %(status_1)s" in heartbeat
+    assert "ingestion_jobs.updated_at < %(updated_at_1)s" in requeue
+    assert "ingestion_jobs.status = %(status_1)s" in requeue
+    assert session.commits == 2
@@ -0,0 +1,88 @@
+import asyncio
+import sys
+import types
+
+import numpy as np
+import pytest
+
+from adapters.services.local_vector_service import (
+    HashingVectorService, OnnxVectorService, _LocalVectorService, hash_embed
+)
+
+def test_hash_embed_is_deterministic():
+    texts = ["The quick brown fox", "jumps over the lazy dog"]
+
+    assert np.array_equal(hash_embed(texts, 256), hash_embed(texts, 256))
+    assert np.array_equal(hash_embed(texts[:1], 256)[0], hash_embed(texts, 256)[0])
+
+def test_hash_embed_rows_are_unit_length_or_zero():
+    matrix = hash_embed(["some words here", "more words", "", "!!!"], 128)
+
+    norms = np.linalg.norm(matrix, axis=1)
+    assert np.allclose(norms[:2], 1.0)
+    assert np.allclose(norms[2:], 0.0)
+    assert matrix.dtype == np.float32
+
+def test_hashing_service_uses_model_dimensions_and_keeps_order():
+    service = HashingVectorService("hashing@64", dimensions=1536, batch_size=2)
+    texts = ["a much longer text than the others", "short", "medium length text"]
+
+    embeddings = asyncio.run(service.batch_generate_embeddings(texts))
+
+    assert [embedding.vector.shape for embedding in embeddings] == [(64,)] * 3
+    assert all(embedding.model == "hashing@64" for embedding in embeddings)
+    for text, embedding in zip(texts, embeddings):
+        assert np.array_equal(embedding.vector, hash_embed([text], 64)[0])
+
+def test_hashing_similarity_follows_lexical_overlap():
+    service = HashingVectorService("hashing@512")
+    query, near, far = asyncio.run(service.batch_generate_embeddings(
+        ["postgres vector search", "vector search in postgres", "baking bread at home"]
+    ))
+
+    assert asyncio.run(service.compute_similarity(query, near)) > asyncio.run(service.compute_similarity(query, far))
+    assert asyncio.run(service.compute_similarity(query, query)) == pytest.approx(1.0)
+
+def test_local_service_without_encoder_cannot_be_built():
+    with pytest.raises(TypeError):
+        _LocalVectorService("incomplete")
+
+def fake_onnx_modules(monkeypatch, width):
+    class Session:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def get_inputs(self):
+            return [types.SimpleNamespace(name="input_ids"), types.SimpleNamespace(name="attention_mask")]
+
+        def run(self, outputs, inputs):
+            batch, length = inputs["input_ids"].shape
+            return [np.ones((batch, length, width), dtype=np.float32)]
+
+    class Tokenizer:
+        @classmethod
+        def from_file(cls, path):
+            return cls()
+
+        def enable_padding(self):
+            pass
+
+        def enable_truncation(self, max_length):
+            pass
+
+        def encode_batch(self, texts):
+            return [types.SimpleNamespace(ids=[1, 2, 3], attention_mask=[1, 1, 1]) for _ in texts]
+
+    monkeypatch.setitem(sys.modules, "onnxruntime", types.SimpleNamespace(SessionOptions=lambda: types.SimpleNamespace(), InferenceSession=Session))
+    monkeypatch.setitem(sys.modules, "tokenizers", types.SimpleNamespace(Tokenizer=Tokenizer))
+
+def test_onnx_model_width_is_checked_at_load(monkeypatch):
+    fake_onnx_modules(monkeypatch, width=384)
+
+    with pytest.raises(ValueError, match="384-dimensional"):
+        OnnxVectorService("minilm", "model.onnx", "tokenizer.json", dimensions=1536)
+
+    service = OnnxVectorService("minilm@384", "model.onnx", "tokenizer.json", dimensions=1536)
+    embedding = asyncio.run(service.generate_embedding("text"))
+    assert embedding.vector.shape == (384,)
+    assert np.linalg.norm(embedding.vector) == pytest.approx(1.0)
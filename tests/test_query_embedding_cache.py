@@ -0,0 +1,129 @@
+import asyncio
+from typing import List
+
+import numpy as np
+import pytest
+
+from adapters.services.query_embedding_cache import QueryEmbeddingCache
+from domain.value_objects.embedding import Embedding
+from ports.services.vector_service import VectorService
+
+class SlowVectorService(VectorService):
+    """Counts upstream calls; each one waits until ``release`` is set"""
+
+    def __init__(self, fail: bool = False):
+        self.calls: List[List[str]] = []
+        self.release = asyncio.Event()
+        self.fail = fail
+
+    @property
+    def model(self) -> str:
+        return "fake"
+
+    async def generate_embedding(self, text: str) -> Embedding:
+        return (await self.batch_generate_embeddings([text]))[0]
+
+    async def batch_generate_embeddings(self, texts: List[str]) -> List[Embedding]:
+        self.calls.append(list(texts))
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return [Embedding(vector=np.full(4, len(text), dtype=np.float32), model=self.model) for text in texts]
+
+    async def compute_similarity(self, embedding1: Embedding, embedding2: Embedding) -> float:
+        return 0.0
+
+def test_repeated_query_is_served_from_cache():
+    async def run():
+        inner = SlowVectorService()
+        inner.release.set()
+        cache = QueryEmbeddingCache(inner)
+        first = await cache.generate_embedding("hello")
+        second = await cache.generate_embedding("hello")
+        return inner, cache, first, second
+
+    inner, cache, first, second = asyncio.run(run())
+    assert len(inner.calls) == 1
+    assert second is first
+    assert cache.stats()["hits"] == 1
+
+def test_concurrent_misses_share_one_upstream_call():
+    async def run():
+        inner = SlowVectorService()
+        cache = QueryEmbeddingCache(inner)
+        tasks = [asyncio.create_task(cache.generate_embedding("hello")) for _ in range(5)]
+        await asyncio.sleep(0)
+        inner.release.set()
+        return inner, cache, await asyncio.gather(*tasks)
+
+    inner, cache, results = asyncio.run(run())
+    assert inner.calls == [["hello"]]
+    assert all(result is results[0] for result in results)
+    assert cache.stats()["coalesced"] == 4
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    async def run():
+        inner = SlowVectorService()
+        cache = QueryEmbeddingCache(inner)
+        leader = asyncio.create_task(cache.generate_embedding("hello"))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(cache.generate_embedding("hello"))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        inner.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return inner, await waiter
+
+    inner, embedding = asyncio.run(run())
+    assert len(inner.calls) == 1
+    assert embedding.vector[0] == 5
+
+def test_batch_coalesces_with_inflight_single_query():
+    async def run():
+        inner = SlowVectorService()
+        cache = QueryEmbeddingCache(inner)
+        single = asyncio.create_task(cache.generate_embedding("hello"))
+        await asyncio.sleep(0)
+        batch = asyncio.create_task(cache.batch_generate_embeddings(["hello", "world", "world"]))
+        await asyncio.sleep(0)
+        inner.release.set()
+        return inner, await single, await batch
+
+    inner, single, batch = asyncio.run(run())
+    assert inner.calls == [["hello"], ["world"]]
+    assert batch[0] is single
+    assert batch[1] is batch[2]
+
+def test_upstream_failure_reaches_every_waiter_and_is_not_cached():
+    async def run():
+        inner = SlowVectorService(fail=True)
+        cache = QueryEmbeddingCache(inner)
+        tasks = [asyncio.create_task(cache.generate_embedding("hello")) for _ in range(3)]
+        await asyncio.sleep(0)
+        inner.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        inner.fail = False
+        await cache.generate_embedding("hello")
+        return inner, results
+
+    inner, results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert len(inner.calls) == 2
+
+def test_batch_mixes_hits_and_sends_only_deduplicated_misses_upstream():
+    async def run():
+        inner = SlowVectorService()
+        inner.release.set()
+        cache = QueryEmbeddingCache(inner)
+        cached = await cache.generate_embedding("cached")
+        batch = await cache.batch_generate_embeddings(["new", "cached", "other", "new"])
+        return inner, cache, cached, batch
+
+    inner, cache, cached, batch = asyncio.run(run())
+    assert inner.calls == [["cached"], ["new", "other"]]
+    # Results line up with the request, duplicates included
+    assert [float(embedding.vector[0]) for embedding in batch] == [3.0, 6.0, 5.0, 3.0]
+    assert batch[1] is cached and batch[3] is batch[0]
+    assert (cache.hits, cache.misses) == (1, 3)
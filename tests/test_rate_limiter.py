@@ -0,0 +1,95 @@
+import asyncio
+import types
+
+import httpx
+import pytest
+from openai import RateLimitError
+
+from adapters.rate_limiter import AdaptiveConcurrency, RateLimiter, TokenBucket, retry_after_seconds
+from adapters.services.vector_service import OpenAIVectorService
+
+def test_token_bucket_delay_matches_refill_rate():
+    bucket = TokenBucket(per_minute=60)
+    bucket.take(60)
+
+    # One unit per second
+    assert bucket.delay(1) == pytest.approx(1.0, abs=0.05)
+    assert bucket.delay(10) == pytest.approx(10.0, abs=0.05)
+
+def test_token_bucket_caps_oversized_requests_and_follows_stricter_headers():
+    bucket = TokenBucket(per_minute=100)
+
+    assert bucket.delay(1_000) == 0.0
+    bucket.sync(limit=None, remaining=10)
+    assert bucket.level <= 10.5
+    assert bucket.delay(20) > 0
+
+def test_retry_after_prefers_milliseconds():
+    assert retry_after_seconds({"retry-after-ms": "1500", "retry-after": "9"}) == 1.5
+    assert retry_after_seconds({"retry-after": "2"}) == 2.0
+    assert retry_after_seconds({"retry-after": "soon"}) is None
+
+def test_concurrency_grows_on_success_and_halves_when_throttled():
+    async def run():
+        concurrency = AdaptiveConcurrency(initial=8, minimum=1, maximum=32)
+        await concurrency.acquire()
+        await concurrency.release()
+        grown = concurrency.limit
+        await concurrency.acquire()
+        await concurrency.release(throttled=True)
+        return grown, concurrency.limit
+
+    grown, throttled = asyncio.run(run())
+    assert grown == pytest.approx(8.125)
+    assert throttled == pytest.approx(grown / 2)
+
+def test_concurrency_limit_blocks_extra_callers():
+    async def run():
+        concurrency = AdaptiveConcurrency(initial=1, minimum=1, maximum=1)
+        await concurrency.acquire()
+        waiter = asyncio.create_task(concurrency.acquire())
+        await asyncio.sleep(0.01)
+        blocked = not waiter.done()
+        await concurrency.release()
+        await asyncio.wait_for(waiter, timeout=1.0)
+        return blocked
+
+    assert asyncio.run(run())
+
+def rate_limit_error(code):
+    request = httpx.Request("POST", "https://api.openai.com/v1/embeddings")
+    response = httpx.Response(429, request=request, headers={"retry-after": "0"})
+    return RateLimitError("429", response=response, body={"code": code, "type": code})
+
+def service_failing_with(error, limiter):
+    service = OpenAIVectorService(api_key="test", rate_limiter=limiter, throttle_retries=3)
+    calls = []
+
+    async def create(**request):
+        calls.append(request)
+        raise error
+
+    service.client = types.SimpleNamespace(
+        embeddings=types.SimpleNamespace(with_raw_response=types.SimpleNamespace(create=create))
+    )
+    return service, calls
+
+def test_insufficient_quota_fails_without_retrying():
+    limiter = RateLimiter()
+    service, calls = service_failing_with(rate_limit_error("insufficient_quota"), limiter)
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(service.generate_embedding("text"))
+
+    assert len(calls) == 1
+    assert limiter.throttled == 0
+
+def test_rate_limited_calls_are_retried_then_raised():
+    limiter = RateLimiter()
+    service, calls = service_failing_with(rate_limit_error("rate_limit_exceeded"), limiter)
+
+    with pytest.raises(RateLimitError):
+        asyncio.run(service.generate_embedding("text"))
+
+    assert len(calls) == 4
+    assert limiter.throttled == 4
@@ -0,0 +1,73 @@
+import asyncio
+import re
+
+import pytest
+
+from adapters.repositories.sqlalchemy import models  # noqa: F401  (registers the tables)
+from adapters.repositories.sqlalchemy.base import Base
+from adapters.repositories.sqlalchemy.schema_upgrades import UPGRADES, check_embedding_dimension
+
+MODEL_INDEXES = {index.name for table in Base.metadata.tables.values() for index in table.indexes}
+
+def test_every_upgrade_can_be_rerun():
+    for statement in UPGRADES:
+        assert re.search(r"\bIF (NOT )?EXISTS\b", statement), statement
+
+CREATED = {re.search(r"INDEX IF NOT EXISTS (\w+)", s).group(1) for s in UPGRADES if "CREATE INDEX" in s}
+DROPPED = {re.search(r"INDEX IF EXISTS (\w+)", s).group(1) for s in UPGRADES if "DROP INDEX" in s}
+
+# Tables that predate the upgrade step, and the indexes they were created with
+ORIGINAL_TABLES = ("sources", "contents", "chunks")
+ORIGINAL_INDEXES = {"ix_contents_url_hash"}
+
+def test_created_indexes_match_model_names():
+    assert CREATED <= MODEL_INDEXES
+    assert not DROPPED & MODEL_INDEXES
+
+def test_new_indexes_on_original_tables_are_upgraded():
+    for name in ORIGINAL_TABLES:
+        for index in Base.metadata.tables[name].indexes:
+            assert index.name in ORIGINAL_INDEXES | CREATED, index.name
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar(self):
+        return self.value
+
+class FakeConnection:
+    """Answers the column-type and has-vectors queries, records everything else"""
+
+    def __init__(self, column_type, has_vectors):
+        self.column_type = column_type
+        self.has_vectors = has_vectors
+        self.executed = []
+
+    async def execute(self, statement):
+        sql = str(statement)
+        self.executed.append(sql)
+        if "format_type" in sql:
+            return FakeResult(self.column_type)
+        if "EXISTS" in sql:
+            return FakeResult(self.has_vectors)
+        return FakeResult(None)
+
+def test_matching_embedding_column_is_left_alone():
+    connection = FakeConnection("vector(1536)", has_vectors=True)
+    asyncio.run(check_embedding_dimension(connection, 1536))
+
+    assert len(connection.executed) == 1
+
+def test_empty_embedding_column_is_resized():
+    connection = FakeConnection("vector(1536)", has_vectors=False)
+    asyncio.run(check_embedding_dimension(connection, 256))
+
+    assert connection.executed[-1] == "ALTER TABLE chunks ALTER COLUMN embedding TYPE vector(256)"
+
+def test_stored_vectors_of_another_size_fail_startup():
+    connection = FakeConnection("vector(1536)", has_vectors=True)
+
+    with pytest.raises(ValueError, match="VECTOR_DIMENSION is 256"):
+        asyncio.run(check_embedding_dimension(connection, 256))
+    assert not any(sql.startswith("ALTER") for sql in connection.executed)
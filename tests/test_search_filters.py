@@ -0,0 +1,131 @@
+import asyncio
+from uuid import uuid4
+
+import numpy as np
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from adapters.repositories.in_memory.repositories import InMemoryChunkRepository
+from adapters.repositories.sqlalchemy.chunk_repository import SQLAlchemyChunkRepository
+from adapters.repositories.sqlalchemy.models import ChunkModel
+from adapters.services.local_vector_service import HashingVectorService
+from core.config import settings
+from domain.value_objects.embedding import Embedding
+from domain.value_objects.search_filter import SearchFilter
+from ports.http.v1.routes import chunks
+from usecases.chunk_usecases import ChunkUseCases
+
+def compile(stmt):
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+def test_search_filter_truthiness():
+    assert not SearchFilter()
+    assert SearchFilter(embedding_model="m") and not SearchFilter(embedding_model="m").by_content
+    for field in ("source_ids", "domains", "statuses"):
+        search_filter = SearchFilter(**{field: ("x",)})
+        assert search_filter and search_filter.by_content
+
+def test_filter_conditions_semi_join_through_contents():
+    repository = SQLAlchemyChunkRepository(None)
+
+    [model] = repository._filter_conditions(SearchFilter(embedding_model="m"))
+    [by_content] = repository._filter_conditions(SearchFilter(source_ids=(uuid4(),), statuses=("processed",)))
+    [by_domain] = repository._filter_conditions(SearchFilter(domains=("a.example",)))
+
+    assert "chunks.embedding_model = " in compile(select(ChunkModel.id).where(model))
+    sql = compile(select(ChunkModel.id).where(by_content))
+    assert "chunks.content_id IN (SELECT contents.id" in sql
+    assert "contents.source_id IN" in sql and "contents.status IN" in sql
+    assert "JOIN sources" not in sql
+    assert "JOIN sources ON sources.id = contents.source_id" in compile(select(ChunkModel.id).where(by_domain))
+
+class SearchSession:
+    """Answers the prefilter count with ``matching`` rows and records the rest"""
+
+    def __init__(self, matching):
+        self.matching = matching
+        self.statements = []
+
+    async def execute(self, stmt):
+        sql = compile(stmt)
+        self.statements.append(sql)
+        matching = self.matching
+
+        class Result:
+            def scalar_one(self):
+                return matching
+
+            def all(self):
+                return []
+        return Result()
+
+@pytest.fixture(autouse=True)
+def hnsw_without_quantization(monkeypatch):
+    monkeypatch.setattr(settings, "VECTOR_INDEX_TYPE", "hnsw")
+    monkeypatch.setattr(settings, "VECTOR_QUANTIZATION", "none")
+    monkeypatch.setattr(settings, "VECTOR_PREFILTER_MAX_ROWS", 100)
+
+QUERY = Embedding(vector=np.ones(settings.VECTOR_DIMENSION, dtype=np.float32), model=settings.EMBEDDING_MODEL)
+NARROW = SearchFilter(source_ids=(uuid4(),))
+
+def search(session, many=False, **kwargs):
+    repository = SQLAlchemyChunkRepository(session)
+    if many:
+        return asyncio.run(repository.find_similar_many([QUERY, QUERY], **kwargs))
+    return asyncio.run(repository.find_similar(QUERY, **kwargs))
+
+@pytest.mark.parametrize("many", [False, True])
+def test_narrow_filter_scans_exactly_without_touching_planner_settings(many):
+    session = SearchSession(matching=5)
+
+    search(session, many, filters=NARROW)
+
+    count, query = session.statements
+    assert "count(*)" in count
+    assert "ORDER BY (chunks.embedding <=> " in query and ") + " in query
+    assert not any("SET " in sql or "RESET " in sql for sql in session.statements)
+
+@pytest.mark.parametrize("many", [False, True])
+def test_broad_filter_walks_the_index(many):
+    session = SearchSession(matching=101)
+
+    search(session, many, filters=NARROW)
+
+    count, ef_search, iterative, query = session.statements
+    assert "SET LOCAL hnsw.ef_search" in ef_search
+    assert "SET LOCAL hnsw.iterative_scan" in iterative
+    assert ") + " not in query
+
+def test_unfiltered_search_skips_the_prefilter_probe():
+    session = SearchSession(matching=0)
+
+    search(session)
+
+    assert not any("count(*)" in sql for sql in session.statements)
+
+def test_exact_search_scans_without_a_probe():
+    session = SearchSession(matching=0)
+
+    search(session, exact=True)
+
+    [query] = session.statements
+    assert ") + " in query
+
+@pytest.mark.parametrize("path, body", [
+    ("/chunks/search", {"text": "q"}),
+    ("/chunks/search", {"text": "q", "mode": "hybrid"}),
+    ("/chunks/search/batch", {"queries": ["q"]}),
+])
+def test_content_filters_on_the_in_memory_store_are_a_bad_request(path, body):
+    app = FastAPI()
+    app.include_router(chunks.router, prefix="/chunks")
+    usecases = ChunkUseCases(InMemoryChunkRepository(dimension=8), HashingVectorService("hashing@8"))
+    app.dependency_overrides[chunks.get_chunk_usecases] = lambda: usecases
+
+    response = TestClient(app).post(path, json={**body, "domains": ["a.example"]})
+
+    assert response.status_code == 400
+    assert "Postgres" in response.json()["detail"]
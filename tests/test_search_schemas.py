@@ -0,0 +1,32 @@
+import pytest
+from pydantic import ValidationError
+
+from ports.http.v1.schemas.chunks import BatchSimilaritySearch, SimilaritySearch
+
+@pytest.mark.parametrize("field", ["ef_search", "probes"])
+@pytest.mark.parametrize("value", [0, -1, 10**9])
+def test_ann_knobs_out_of_range_are_rejected(field, value):
+    with pytest.raises(ValidationError):
+        SimilaritySearch(text="query", **{field: value})
+    with pytest.raises(ValidationError):
+        BatchSimilaritySearch(queries=["query"], **{field: value})
+
+def test_ann_knobs_in_range_are_accepted():
+    search = SimilaritySearch(text="query", ef_search=200, probes=20)
+
+    assert (search.ef_search, search.probes) == (200, 20)
+
+@pytest.mark.parametrize("field, value", [
+    ("limit", None), ("limit", 0), ("limit", 10**6),
+    ("threshold", None), ("threshold", 1.5), ("threshold", -2),
+])
+def test_limit_and_threshold_out_of_range_are_rejected(field, value):
+    with pytest.raises(ValidationError):
+        SimilaritySearch(text="query", **{field: value})
+    with pytest.raises(ValidationError):
+        BatchSimilaritySearch(queries=["query"], **{field: value})
+
+def test_limit_and_threshold_defaults():
+    search = BatchSimilaritySearch(queries=["query"])
+
+    assert (search.limit, search.threshold) == (10, 0.7)
@@ -0,0 +1,72 @@
+import asyncio
+import re
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+
+from adapters.repositories.sqlalchemy.content_repository import SQLAlchemyContentRepository
+from adapters.repositories.sqlalchemy.models import ContentModel, SourceModel
+from adapters.repositories.sqlalchemy.source_repository import SQLAlchemySourceRepository
+from core.config import settings
+from domain.entities.content import Content
+from domain.entities.source import Source
+
+# asyncpg's limit on bind parameters per statement
+MAX_PARAMETERS = 32767
+
+class RecordingSession:
+    """Compiles each statement and echoes its VALUES rows back as RETURNING rows"""
+
+    def __init__(self, model):
+        self.model = model
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        params = stmt.compile(dialect=postgresql.dialect()).params
+        self.statements.append(params)
+        rows = {}
+        for name, value in params.items():
+            match = re.fullmatch(r"(\w+)_m(\d+)", name)
+            if match:
+                rows.setdefault(int(match.group(2)), {})[match.group(1)] = value
+        models = [self.model(**row) for _, row in sorted(rows.items())]
+
+        class Result:
+            def scalars(self):
+                class Scalars:
+                    def all(self):
+                        return models
+                return Scalars()
+        return Result()
+
+    async def commit(self):
+        self.commits += 1
+
+def test_source_upsert_many_splits_into_batches():
+    session = RecordingSession(SourceModel)
+    sources = [Source(domain=f"site{i}.example") for i in range(2 * settings.DB_UPSERT_BATCH_SIZE + 5)]
+
+    result = asyncio.run(SQLAlchemySourceRepository(session).upsert_many(sources))
+
+    assert [source.domain for source in result] == [source.domain for source in sources]
+    assert len(session.statements) == 3
+    assert all(len(params) <= MAX_PARAMETERS for params in session.statements)
+    assert session.commits == 1
+
+def test_content_upsert_many_splits_into_batches_and_keeps_order():
+    session = RecordingSession(ContentModel)
+    source_id = uuid4()
+    contents = [
+        Content(url=f"https://example.com/{i}", url_hash=f"hash-{i}", source_id=source_id)
+        for i in range(settings.DB_UPSERT_BATCH_SIZE + 1)
+    ]
+    # Duplicates collapse to one row but every input gets its result
+    contents.append(contents[0])
+
+    result = asyncio.run(SQLAlchemyContentRepository(session).upsert_many(contents))
+
+    assert [content.url_hash for content in result] == [content.url_hash for content in contents]
+    assert len(session.statements) == 2
+    assert all(len(params) <= MAX_PARAMETERS for params in session.statements)
+    assert session.commits == 1
@@ -0,0 +1,86 @@
+import pickle
+
+import pytest
+
+from adapters.services.text_chunkers import SentenceChunker, TokenCounter, get_chunker, get_token_counter
+
+# An encoding tiktoken rejects immediately, so counts fall back to the estimate
+OFFLINE_ENCODING = "no-such-encoding"
+
+def count_words(text):
+    return len(text.split())
+
+def test_sentence_chunker_packs_whole_sentences_within_budget():
+    text = "One two three. Four five six. Seven eight nine. Ten eleven twelve."
+    chunker = SentenceChunker(chunk_size=6, chunk_overlap=0, count_tokens=count_words, offload_min_chars=20_000)
+
+    chunks = chunker.split(text)
+
+    assert [chunk.text for chunk in chunks] == [
+        "One two three. Four five six.",
+        "Seven eight nine. Ten eleven twelve.",
+    ]
+    assert all(chunk.token_count <= 6 for chunk in chunks)
+    assert [chunk.char_count for chunk in chunks] == [len(chunk.text) for chunk in chunks]
+
+def test_sentence_chunker_carries_trailing_sentences_as_overlap():
+    text = "One two three. Four five six. Seven eight nine."
+    chunker = SentenceChunker(chunk_size=6, chunk_overlap=3, count_tokens=count_words, offload_min_chars=20_000)
+
+    chunks = chunker.split(text)
+
+    assert [chunk.text for chunk in chunks] == [
+        "One two three. Four five six.",
+        "Four five six. Seven eight nine.",
+    ]
+
+def test_chunks_carry_a_stable_text_hash():
+    chunker = SentenceChunker(chunk_size=6, chunk_overlap=0, count_tokens=count_words, offload_min_chars=20_000)
+
+    first, second = chunker.split("Same text here."), chunker.split("Same text here.")
+
+    assert first[0].text_hash and first[0].text_hash == second[0].text_hash
+
+@pytest.mark.parametrize("strategy", ["markdown", "token", "sentence"])
+def test_get_chunker_respects_token_budget(strategy):
+    chunker = get_chunker(strategy, 20, 0, OFFLINE_ENCODING)
+    text = "\n\n".join(f"# Section {i}\n" + "Some words in a sentence. " * 10 for i in range(5))
+
+    chunks = chunker.split(text)
+
+    assert len(chunks) > 1
+    assert all(chunk.token_count <= 20 for chunk in chunks)
+
+def test_get_chunker_is_cached_per_configuration():
+    assert get_chunker("sentence", 20, 0, OFFLINE_ENCODING) is get_chunker("sentence", 20, 0, OFFLINE_ENCODING)
+    assert get_chunker("sentence", 20, 0, OFFLINE_ENCODING) is not get_chunker("sentence", 30, 0, OFFLINE_ENCODING)
+
+def test_get_chunker_rejects_unknown_strategy():
+    with pytest.raises(ValueError):
+        get_chunker("paragraph", 20, 0, OFFLINE_ENCODING)
+
+def test_token_counter_pickles_to_the_cached_instance():
+    counter = get_token_counter(OFFLINE_ENCODING)
+
+    assert pickle.loads(pickle.dumps(counter)) is counter
+    assert isinstance(counter, TokenCounter)
+    assert counter("abcdefgh") == 3
+
+def test_sentence_longer_than_the_budget_is_split_by_tokens():
+    long_sentence = " ".join(f"w{i}" for i in range(20)) + "."
+    text = f"Short one here. {long_sentence} Another short one."
+    chunker = SentenceChunker(chunk_size=6, chunk_overlap=0, count_tokens=count_words, offload_min_chars=20_000)
+
+    chunks = chunker.split(text)
+
+    assert all(chunk.token_count <= 6 for chunk in chunks)
+    # Nothing is lost: the pieces put back together give the original words
+    assert " ".join(chunk.text for chunk in chunks).split() == text.split()
+    assert chunks[0].text == "Short one here."
+
+def test_unbroken_text_longer_than_the_budget_is_split():
+    chunker = SentenceChunker(chunk_size=5, chunk_overlap=0, count_tokens=len, offload_min_chars=20_000)
+
+    chunks = chunker.split("x" * 23)
+
+    assert [chunk.text for chunk in chunks] == ["xxxxx"] * 4 + ["xxx"]
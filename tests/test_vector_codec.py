@@ -0,0 +1,71 @@
+import struct
+
+import numpy as np
+import pytest
+from pgvector import Vector as PgVector
+
+from adapters.repositories.sqlalchemy.vector_codec import decode_vector, encode_vector, stack_vectors
+
+def test_encoding_matches_the_pgvector_binary_layout():
+    data = encode_vector(np.array([1.0, -2.5, 3.25], dtype=np.float32))
+
+    # uint16 dimensions, uint16 unused, then big-endian float32s
+    assert data[:4] == struct.pack(">HH", 3, 0)
+    assert data[4:] == struct.pack(">3f", 1.0, -2.5, 3.25)
+    assert data == PgVector([1.0, -2.5, 3.25]).to_binary()
+
+def test_round_trip_through_pgvector():
+    vector = np.random.default_rng(0).standard_normal(1536).astype(np.float32)
+
+    decoded = decode_vector(PgVector(vector).to_binary())
+
+    np.testing.assert_array_equal(decoded, vector)
+    np.testing.assert_array_equal(PgVector.from_binary(encode_vector(vector)).to_numpy(), vector)
+    # A view over the received bytes, not a copy
+    assert not decoded.flags.writeable
+
+def test_text_literals_and_lists_encode_like_arrays():
+    expected = encode_vector(np.array([1.0, 2.0], dtype=np.float32))
+
+    assert encode_vector("[1,2]") == expected
+    assert encode_vector([1, 2]) == expected
+
+def test_empty_vector_round_trips():
+    data = encode_vector(np.array([], dtype=np.float32))
+
+    assert data == struct.pack(">HH", 0, 0)
+    assert decode_vector(data).shape == (0,)
+
+@pytest.mark.parametrize("data", [
+    struct.pack(">HH", 3, 0) + struct.pack(">2f", 1.0, 2.0),
+    struct.pack(">HH", 1, 0) + struct.pack(">2f", 1.0, 2.0),
+])
+def test_header_and_payload_disagreeing_is_rejected(data):
+    with pytest.raises(ValueError):
+        decode_vector(data)
+
+def test_matrix_input_is_rejected():
+    with pytest.raises(ValueError):
+        encode_vector(np.ones((2, 2), dtype=np.float32))
+
+def test_stack_vectors_keeps_positions_and_nones():
+    first, second = decode_vector(encode_vector([1, 2])), decode_vector(encode_vector([3, 4]))
+
+    stacked = stack_vectors([first, None, second])
+
+    assert stacked[1] is None
+    np.testing.assert_array_equal(stacked[0], [1, 2])
+    np.testing.assert_array_equal(stacked[2], [3, 4])
+    # Native float32 rows of one contiguous matrix
+    assert stacked[0].dtype == np.float32 and stacked[0].dtype.isnative
+    assert stacked[0].base is stacked[2].base
+
+def test_stack_vectors_converts_mixed_lengths_one_by_one():
+    stacked = stack_vectors([decode_vector(encode_vector([1, 2, 3])), None, np.array([4.0, 5.0])])
+
+    assert [None if row is None else row.tolist() for row in stacked] == [[1, 2, 3], None, [4, 5]]
+    assert all(row.dtype == np.float32 for row in stacked if row is not None)
+
+def test_stack_vectors_passes_all_none_through():
+    assert stack_vectors([None, None]) == [None, None]
+    assert stack_vectors([]) == []